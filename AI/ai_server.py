@@ -2,15 +2,48 @@
 # FastAPI 기반 AI 예측 서버
 # SBERT 기반 유사도 검색 + coarse/fine 모델 분기 실행
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional
+import hmac
+import logging
+import os
+import threading
+import time
 import uvicorn
 
-from scripts.model_util import predict_coarse_fine
+from scripts.model_util import (
+    predict_coarse_fine_batch,
+    retrieve_similar_cases,
+    init_artifacts,
+    get_artifacts,
+    model_registry,
+    startup_state,
+    COARSE_MAP,
+)
+from scripts import metrics
+from scripts.batch_scheduler import MicroBatchScheduler, QueueFullError
+from scripts.model_registry import ReloadInProgressError
+from scripts.log_util import setup_logging, request_trace, trace, elapsed_ms
+
+# ✅ JSON 구조화 로그 (백그라운드 스레드에서 출력, LOG_LEVEL / LOG_SAMPLE_RATES)
+setup_logging("ai")
+logger = logging.getLogger("ai_server")
 
 app = FastAPI()
 
+# ✅ 마이크로 배칭 스케줄러 (AI_BATCH_WINDOW_MS / AI_BATCH_MAX_SIZE / AI_BATCH_QUEUE_DEPTH)
+scheduler = MicroBatchScheduler.from_env(predict_coarse_fine_batch)
+
+# ✅ 모델 핫 리로드
+# - AI_MODEL_WATCH_SECONDS: models/ 감시 주기(초), 0 이면 감시하지 않음 (POST /admin/reload 로만 교체)
+# - AI_ADMIN_TOKEN: /admin/* 요청에 같은 값의 X-Admin-Token 헤더 필요 (미설정이면 /admin/* 는 항상 403)
+# - AI_ADMIN_OPEN=1: 토큰 없이 /admin/* 허용 (로컬 개발 전용)
+MODEL_WATCH_SECONDS = float(os.getenv("AI_MODEL_WATCH_SECONDS", "0"))
+ADMIN_TOKEN = os.getenv("AI_ADMIN_TOKEN")
+ADMIN_OPEN = os.getenv("AI_ADMIN_OPEN", "0") == "1"
+
 # ✅ 요청 데이터 스키마
 class PredictRequest(BaseModel):
     gender: str = Field(..., alias="gender")
@@ -35,46 +68,232 @@ class PredictionItem(BaseModel):
 
 class PredictResponse(BaseModel):
     predictions: List[PredictionItem]
+    modelVersion: Optional[str] = None  # 이 응답을 계산한 모델 세트 버전
+
+# ✅ 배치 요청/응답 스키마
+class BatchPredictRequest(BaseModel):
+    items: List[PredictRequest]
+
+class BatchPredictResponse(BaseModel):
+    results: List[PredictResponse]
+
+# ✅ 유사 사례 검색 요청/응답 스키마
+class RetrieveRequest(BaseModel):
+    symptom_keywords: List[str] = Field(..., alias="symptomKeywords")
+    k: int = Field(5, ge=1, le=100)
+
+    class Config:
+        validate_by_name = True
+        populate_by_name = True
+
+class SimilarCase(BaseModel):
+    row: int
+    score: float
+    diseaseName: str
+    symptomKeywords: Optional[str]
+
+class RetrieveResponse(BaseModel):
+    cases: List[SimilarCase]
+
+# ✅ 요청 → predict_coarse_fine 인자 변환
+def to_model_input(request: PredictRequest) -> dict:
+    return {
+        "symptom_keywords": request.symptom_keywords,
+        "age": request.age,
+        "gender": 0 if request.gender == "남성" else 1,
+        "height": request.height,
+        "weight": request.weight,
+        "bmi": request.bmi,
+        "diseases": request.chronic_diseases,
+        "medications": request.medications,
+    }
+
+# ✅ 응답의 top-1 coarse 그룹 (메트릭 라벨)
+def top_group(result: dict) -> str:
+    predictions = result.get("predictions") or []
+    if not predictions:
+        return "none"
+    label = predictions[0]["coarseLabel"]
+    return COARSE_MAP.get(label, label.lower())
+
+# ✅ 기동 완료 전(또는 기동 실패 후)에는 모델을 쓰는 요청을 바로 503 으로 거절
+# - get_artifacts() 는 아티팩트가 없으면 init_artifacts() 로 동기 로드하므로, 요청 경로에서 부르면
+#   기동 중에는 병렬 로드가 끝날 때까지 막히고 기동 실패 후에는 요청마다 전체 로드를 다시 시도함
+def require_ready():
+    if not startup_state.ready:
+        raise HTTPException(status_code=503, detail="모델 로딩 중입니다")
+
 
 # ✅ 예측 API
+# - X-Debug-Trace: 1 헤더를 보낸 요청만 입력/변환값/결과 상세 로그 출력
 @app.post("/predict", response_model=PredictResponse)
-def predict(request: PredictRequest):
+def predict(request: PredictRequest, debug_trace: Optional[str] = Header(None, alias="X-Debug-Trace")):
+    require_ready()
+    start = time.perf_counter()
+    with request_trace(debug_trace == "1"):
+        try:
+            trace(logger, "🟥 예측 요청 수신됨", request=request.model_dump())
+
+            # 1. BMI 계산
+            # height_m = request.height / 100
+            # bmi = request.weight / (height_m ** 2)
+            model_input = to_model_input(request)
+            trace(logger, "👨‍⚕️ gender 변환값 (0=남성, 1=여성)", gender=model_input["gender"])
+
+            # 동시 요청과 묶어서 한 번의 배치로 추론
+            result = scheduler.submit(model_input).result()
+
+            trace(logger, "🟩 예측 결과 반환", result=result)
+            group = top_group(result)
+            metrics.observe_request("predict", group, time.perf_counter() - start)
+            logger.info("predict", extra={"group": group, "keywords": len(request.symptom_keywords), "model_version": result.get("modelVersion"), "latency_ms": elapsed_ms(start)})
+
+            return result  # {'predictions': [...]} 형태
+
+        except QueueFullError as e:
+            logger.warning("⚠️ 예측 대기열 초과", extra={"error": str(e)})
+            raise HTTPException(status_code=503, detail=str(e))
+
+        except Exception as e:
+            logger.exception("❌ 예측 중 오류")
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+# ✅ 배치 예측 API (기록 재채점 등 N건을 한 번의 요청으로 처리)
+@app.post("/predict/batch", response_model=BatchPredictResponse)
+def predict_batch(request: BatchPredictRequest, debug_trace: Optional[str] = Header(None, alias="X-Debug-Trace")):
+    require_ready()
+    start = time.perf_counter()
+    with request_trace(debug_trace == "1"):
+        try:
+            trace(logger, "🟥 배치 예측 요청 수신됨", items=len(request.items))
+            results = predict_coarse_fine_batch([to_model_input(item) for item in request.items])
+            group = metrics.group_label(map(top_group, results))
+            metrics.observe_request("predict_batch", group, time.perf_counter() - start)
+            trace(logger, "🟩 배치 예측 결과 반환", results=results)
+            logger.info("predict_batch", extra={
+                "group": group,
+                "items": len(results),
+                "model_version": results[0]["modelVersion"] if results else None,
+                "latency_ms": elapsed_ms(start),
+            })
+            return {"results": results}
+
+        except Exception as e:
+            logger.exception("❌ 배치 예측 중 오류")
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+# ✅ 유사 사례 Top-k 검색 API (학습 데이터 임베딩 기준)
+@app.post("/retrieve", response_model=RetrieveResponse)
+def retrieve(request: RetrieveRequest):
+    require_ready()
+    if get_artifacts().case_index is None:
+        raise HTTPException(status_code=503, detail="유사 사례 인덱스가 없습니다")
     try:
-        print("🟥 [AI 서버] 예측 요청 수신됨")
-        print("📥 요청 데이터:", request.model_dump())
-        print(f"➡️ symptom_keywords: {request.symptom_keywords}")
-        print(f"➡️ age: {request.age}, gender: {request.gender}, height: {request.height}, weight: {request.weight}")
-        print(f"➡️ diseases: {request.chronic_diseases}")
-        print(f"➡️ medications: {request.medications}")
-        print(f"➡️ bmi(from client): {request.bmi:.3f}")
-
-
-        # 1. BMI 계산
-        # height_m = request.height / 100
-        # bmi = request.weight / (height_m ** 2)
-        gender = 0 if request.gender == "남성" else 1
-        print(f"👨‍⚕️ gender 변환값: {gender} (0=남성, 1=여성)")
-
-        result = predict_coarse_fine(
-            symptom_keywords=request.symptom_keywords,
-            age=request.age,
-            gender=gender,
-            height=request.height,
-            weight=request.weight,
-            bmi=request.bmi,
-            diseases=request.chronic_diseases,
-            medications=request.medications
-        )
-
-        print("🟩 [AI 서버] 예측 결과 반환:", result)
-
-        return result  # {'predictions': [...]} 형태
+        cases = retrieve_similar_cases(request.symptom_keywords, request.k)
+        return {
+            "cases": [
+                {"row": c["row"], "score": c["score"], "diseaseName": c["label"], "symptomKeywords": c.get("text")}
+                for c in cases
+            ]
+        }
 
     except Exception as e:
-        print("❌ [AI 서버] 예측 중 오류:", str(e))
+        logger.exception("❌ 유사 사례 검색 중 오류")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ✅ Prometheus 메트릭
+@app.get("/metrics")
+def metrics_endpoint():
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+# ✅ 기동: 아티팩트 병렬 로드 + 워밍업을 백그라운드에서 수행 (완료 전까지 /health/ready = 503)
+def _load_artifacts_in_background():
+    try:
+        init_artifacts()
+    except Exception:
+        pass  # 실패 원인은 startup_state 에 기록되어 /health/ready 로 노출됨
+    model_registry.start_watcher(MODEL_WATCH_SECONDS)
+
+
+@app.on_event("startup")
+def start_loading_artifacts():
+    threading.Thread(target=_load_artifacts_in_background, name="artifact-loader", daemon=True).start()
+
+
+# ✅ liveness: 프로세스가 응답 가능한지
+@app.get("/health/live")
+def health_live():
+    return {"status": "alive"}
+
+
+# ✅ readiness: 아티팩트 로드 + 워밍업 완료 여부 (아티팩트별 로드 시간 포함)
+@app.get("/health/ready")
+def health_ready():
+    status_code = 200 if startup_state.ready else 503
+    return JSONResponse(status_code=status_code, content=startup_state.to_dict())
+
+
+# ✅ 마이크로 배칭 설정/통계 조회
+@app.get("/predict/scheduler")
+def scheduler_stats():
+    return scheduler.stats()
+
+
+# ✅ 임베딩 캐시 / fine 레지스트리 통계 조회
+@app.get("/predict/cache")
+def cache_stats():
+    require_ready()
+    artifacts = get_artifacts()
+    return {
+        "embedding_cache": artifacts.embedding_cache.stats(),
+        "fine_registry": artifacts.fine_registry.stats(),
+    }
+
+
+# ✅ 관리자: 모델 재로드 (재학습 후 서버 재시작 없이 교체)
+# - 기본: 백그라운드에서 로드 + 워밍업 후 교체, 202 반환 (진행 상황은 GET /admin/models)
+# - wait=true: 교체(또는 실패)까지 기다린 뒤 리로드 기록 반환
+def check_admin_token(token: Optional[str]):
+    if ADMIN_TOKEN:
+        if token is None or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+            raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다")
+        return
+    if not ADMIN_OPEN:
+        raise HTTPException(status_code=403, detail="관리자 API 비활성화 (AI_ADMIN_TOKEN 설정 필요, 로컬 개발은 AI_ADMIN_OPEN=1)")
+
+
+@app.post("/admin/reload")
+def admin_reload(wait: bool = False, admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    check_admin_token(admin_token)
+    if not wait:
+        if not model_registry.reload_async("manual"):
+            raise HTTPException(status_code=409, detail="다른 모델 로드가 진행 중입니다")
+        return JSONResponse(status_code=202, content={"status": "loading", "version": model_registry.version})
+    try:
+        record = model_registry.reload("manual")
+    except ReloadInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return JSONResponse(status_code=200 if record["status"] == "ok" else 500, content=record)
+
+
+# ✅ 관리자: 현재 모델 버전 / 로드 중 여부 / 최근 리로드 기록
+@app.get("/admin/models")
+def admin_models(admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    check_admin_token(admin_token)
+    return model_registry.stats()
+
+
+@app.on_event("shutdown")
+def stop_scheduler():
+    model_registry.stop_watcher(timeout=5)
+    scheduler.stop(timeout=5)
+
+
 # ✅ 서버 실행
 if __name__ == "__main__":
     uvicorn.run("ai_server:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,298 @@
+# 📄 artifact_bundle.py
+# 서빙용 통합 아티팩트 번들 (버전 관리 + mmap)
+# - models/bundle/<버전>/arrays.bin : 모든 가중치 / scaler 배열을 64바이트 정렬로 이어 붙인 원시 바이너리
+# - models/bundle/<버전>/manifest.json : 배열 위치(offset, dtype, shape) + sha256, 모델 그래프,
+#   scaler 평균/표준편차, MultiLabelBinarizer 클래스 목록, 라벨 인코더 클래스 목록, 원본 파일 체크섬
+# - models/bundle/LATEST : 현재 버전 이름 (번들을 다 쓴 뒤 원자적으로 교체)
+# - 로드 시 arrays.bin 을 mmap 하고 배열은 그 위의 뷰 → 역직렬화 / pickle 없음,
+#   fork 된 uvicorn 워커들은 같은 페이지 캐시를 공유
+#   (가중치 mmap 이득은 AI_INFERENCE_BACKEND=numpy 에만 해당. keras 백엔드는 전처리기만 번들에서 읽고 .h5 는 Keras 로 로드)
+# - 기동 시에는 배열 sha256 을 확인하지 않음 (모든 페이지를 읽게 되므로). 배열 검증은 배포 단계에서 verify 명령으로
+# - 키는 기존 파일의 models/ 기준 상대 경로 ("model_coarse.h5", "fine/fine_label_encoder_cold.pkl" 등)
+#
+# 실행: python scripts/artifact_bundle.py [write|verify|info]
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+from typing import Dict, List, Optional
+
+try:
+    from scripts.numpy_engine import (
+        BASE_DIR, FUSED_NAME, NumpyModel, default_fused_sources, file_sha256, fold_batch_norm, fuse_graphs,
+        read_fused_manifest, read_keras_h5,
+    )
+except ModuleNotFoundError:  # scripts/ 에서 직접 실행 (학습 스크립트 / CLI)
+    from numpy_engine import (
+        BASE_DIR, FUSED_NAME, NumpyModel, default_fused_sources, file_sha256, fold_batch_norm, fuse_graphs,
+        read_fused_manifest, read_keras_h5,
+    )
+
+BUNDLE_FORMAT = 1
+ALIGNMENT = 64
+ARRAYS_FILE = "arrays.bin"
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+DEFAULT_MODELS_DIR = f"{BASE_DIR}/models"
+DEFAULT_BUNDLE_ROOT = f"{DEFAULT_MODELS_DIR}/bundle"
+
+
+class BundleError(RuntimeError):
+    pass
+
+
+# ✅ pickle 대체 전처리기 (scikit-learn 과 같은 계산)
+class BundleScaler:
+    """StandardScaler.transform: (X - mean) / scale"""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray, feature_names: Optional[List[str]] = None):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object) if feature_names else None
+
+    def transform(self, X) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+
+class BundleMultiLabelBinarizer:
+    """MultiLabelBinarizer.transform: 라벨 목록 → 0/1 행렬 (모르는 라벨은 무시)"""
+
+    def __init__(self, classes: List[str]):
+        self.classes_ = np.asarray(classes, dtype=object)
+        self._index = {label: i for i, label in enumerate(classes)}
+
+    def transform(self, y) -> np.ndarray:
+        out = np.zeros((len(y), len(self.classes_)), dtype=np.int64)
+        for row, labels in enumerate(y):
+            for label in labels:
+                col = self._index.get(label)
+                if col is not None:
+                    out[row, col] = 1
+        return out
+
+
+class BundleLabelEncoder:
+    """LabelEncoder 의 classes_ / transform / inverse_transform"""
+
+    def __init__(self, classes: List[str]):
+        self.classes_ = np.asarray(classes, dtype=object)
+        self._index = {label: i for i, label in enumerate(classes)}
+
+    def transform(self, y) -> np.ndarray:
+        return np.asarray([self._index[label] for label in y], dtype=np.int64)
+
+    def inverse_transform(self, y) -> np.ndarray:
+        return self.classes_[np.asarray(y, dtype=np.int64)]
+
+
+# ✅ 번들 쓰기
+def _preprocessor_entry(obj, key: str, arrays: Dict[str, np.ndarray]) -> dict:
+    kind = type(obj).__name__
+    if kind == "StandardScaler":
+        arrays[f"{key}/mean"] = np.asarray(obj.mean_, dtype=np.float64)
+        arrays[f"{key}/scale"] = np.asarray(obj.scale_, dtype=np.float64)
+        names = getattr(obj, "feature_names_in_", None)
+        return {"type": "standard_scaler", "mean": f"{key}/mean", "scale": f"{key}/scale",
+                "feature_names": [str(n) for n in names] if names is not None else None}
+    if kind == "MultiLabelBinarizer":
+        return {"type": "multilabel_binarizer", "classes": [str(c) for c in obj.classes_]}
+    if kind == "LabelEncoder":
+        return {"type": "label_encoder", "classes": [str(c) for c in obj.classes_]}
+    raise BundleError(f"번들에 넣을 수 없는 전처리기: {kind} ({key})")
+
+
+def _collect(models_dir: str):
+    """models/ 의 .h5 / .pkl → (모델 그래프, 전처리기 항목, 배열, 원본 체크섬)"""
+    import joblib
+
+    sources = default_fused_sources(models_dir)  # coarse + fine .h5
+    graphs = {rel: fold_batch_norm(read_keras_h5(os.path.join(models_dir, rel))) for rel in sources.values()}
+
+    models, arrays = {}, {}
+    model_graphs = dict(graphs)
+    if read_fused_manifest(models_dir) is not None:
+        # 통합 모델도 같은 원본 그래프로 다시 구성 (번들 안에서 항상 서로 일치)
+        heads = {head: graphs[rel] for head, rel in sources.items()}
+        model_graphs[f"{FUSED_NAME}.h5"] = fuse_graphs(heads, merge_heads=list(heads)[1:])
+
+    for rel, graph in model_graphs.items():
+        spec = {key: graph[key] for key in ("inputs", "outputs", "ops", "dims", "heads") if key in graph}
+        spec["arrays"] = {}
+        for name, value in graph["arrays"].items():
+            key = f"models/{rel}/{name}"
+            arrays[key] = np.asarray(value, dtype=np.float32)
+            spec["arrays"][name] = key
+        models[rel] = spec
+
+    pickles = ["scaler.pkl", "mlb_chronic.pkl", "mlb_meds.pkl", "coarse_label_encoder.pkl"]
+    pickles += [f"fine/{name}" for name in sorted(os.listdir(os.path.join(models_dir, "fine"))) if name.endswith(".pkl")]
+    preprocessors = {rel: _preprocessor_entry(joblib.load(os.path.join(models_dir, rel)), f"preprocessors/{rel}", arrays) for rel in pickles}
+
+    checksums = {rel: file_sha256(os.path.join(models_dir, rel)) for rel in list(sources.values()) + pickles}
+    return models, preprocessors, arrays, checksums
+
+
+def source_stat(path: str) -> List[int]:
+    """[크기, mtime_ns] — 기동 시 원본 변경 여부를 해시 없이 확인하는 용도"""
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def write_bundle(models_dir: str = DEFAULT_MODELS_DIR, bundle_root: Optional[str] = None, keep: int = 3) -> str:
+    """models/ 의 현재 .h5 / .pkl 로 새 버전 번들을 쓰고 LATEST 갱신. 버전 디렉터리 경로 반환"""
+    bundle_root = bundle_root or os.path.join(models_dir, "bundle")
+    models, preprocessors, arrays, checksums = _collect(models_dir)
+
+    # 배열 배치 (64바이트 정렬)
+    layout, offset = {}, 0
+    for key, value in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[key] = {
+            "dtype": value.dtype.str,
+            "shape": list(value.shape),
+            "offset": offset,
+            "nbytes": int(value.nbytes),
+            "sha256": hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest(),
+        }
+        offset += value.nbytes
+
+    content = hashlib.sha256(json.dumps([layout, models, preprocessors], sort_keys=True).encode("utf-8")).hexdigest()
+    version = f"{time.strftime('%Y%m%d-%H%M%S')}-{content[:8]}"
+
+    os.makedirs(bundle_root, exist_ok=True)
+    tmp_dir = os.path.join(bundle_root, f".{version}.tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    with open(os.path.join(tmp_dir, ARRAYS_FILE), "wb") as f:
+        for key, value in arrays.items():
+            f.write(b"\0" * (layout[key]["offset"] - f.tell()))
+            f.write(np.ascontiguousarray(value).tobytes())
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "arrays_file": ARRAYS_FILE,
+        "arrays_sha256": file_sha256(os.path.join(tmp_dir, ARRAYS_FILE)),
+        "arrays": layout,
+        "models": models,
+        "preprocessors": preprocessors,
+        "sources": checksums,
+        "source_stats": {rel: source_stat(os.path.join(models_dir, rel)) for rel in checksums},
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    version_dir = os.path.join(bundle_root, version)
+    os.replace(tmp_dir, version_dir)
+    tmp_latest = os.path.join(bundle_root, f".{LATEST_FILE}.tmp")
+    with open(tmp_latest, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+    os.replace(tmp_latest, os.path.join(bundle_root, LATEST_FILE))
+
+    # 오래된 버전 정리 (최근 keep 개 유지)
+    versions = sorted(name for name in os.listdir(bundle_root) if not name.startswith(".") and name != LATEST_FILE)
+    for old in versions[:-keep]:
+        shutil.rmtree(os.path.join(bundle_root, old), ignore_errors=True)
+    return version_dir
+
+
+# ✅ 번들 읽기
+class ArtifactBundle:
+    def __init__(self, path: str, verify: bool = False):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != BUNDLE_FORMAT:
+            raise BundleError(f"지원하지 않는 번들 형식: {self.manifest.get('format')}")
+
+        arrays_path = os.path.join(path, self.manifest["arrays_file"])
+        self._buffer = np.memmap(arrays_path, dtype=np.uint8, mode="r")
+        self.arrays: Dict[str, np.ndarray] = {}
+        for key, entry in self.manifest["arrays"].items():
+            dtype = np.dtype(entry["dtype"])
+            self.arrays[key] = np.frombuffer(
+                self._buffer, dtype=dtype, count=entry["nbytes"] // dtype.itemsize, offset=entry["offset"]
+            ).reshape(entry["shape"])
+        if verify:
+            self.verify()
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    def verify(self) -> None:
+        """배열별 sha256 확인 (arrays.bin 전체를 읽음 → 배포 단계 / CLI 용). 손상 시 BundleError"""
+        for key, entry in self.manifest["arrays"].items():
+            if hashlib.sha256(self.arrays[key].tobytes()).hexdigest() != entry["sha256"]:
+                raise BundleError(f"체크섬 불일치: {key} ({self.path})")
+
+    def matches_sources(self, models_dir: str, full: bool = False) -> bool:
+        """
+        models/ 에 원본 파일이 남아 있다면 번들을 만든 이후 바뀌지 않았는지 확인.
+        기본은 크기 / mtime 비교만 하고, 다른 파일만 sha256 으로 다시 확인 (복사로 mtime 만 바뀐 경우).
+        full=True 면 모든 원본을 sha256 으로 비교
+        """
+        stats = self.manifest.get("source_stats", {})
+        for rel, digest in self.manifest["sources"].items():
+            path = os.path.join(models_dir, rel)
+            if not os.path.exists(path):
+                continue
+            if not full and stats.get(rel) == source_stat(path):
+                continue
+            if file_sha256(path) != digest:
+                return False
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.manifest["models"] or key in self.manifest["preprocessors"]
+
+    def model(self, key: str) -> NumpyModel:
+        spec = self.manifest["models"][key]
+        return NumpyModel(spec, {name: self.arrays[array_key] for name, array_key in spec["arrays"].items()})
+
+    def preprocessor(self, key: str):
+        entry = self.manifest["preprocessors"][key]
+        if entry["type"] == "standard_scaler":
+            return BundleScaler(self.arrays[entry["mean"]], self.arrays[entry["scale"]], entry.get("feature_names"))
+        if entry["type"] == "multilabel_binarizer":
+            return BundleMultiLabelBinarizer(entry["classes"])
+        if entry["type"] == "label_encoder":
+            return BundleLabelEncoder(entry["classes"])
+        raise BundleError(f"알 수 없는 전처리기 형식: {entry['type']}")
+
+
+def latest_bundle_path(bundle_root: str = DEFAULT_BUNDLE_ROOT) -> Optional[str]:
+    latest = os.path.join(bundle_root, LATEST_FILE)
+    if not os.path.exists(latest):
+        return None
+    with open(latest, encoding="utf-8") as f:
+        path = os.path.join(bundle_root, f.read().strip())
+    return path if os.path.isdir(path) else None
+
+
+def load_latest_bundle(bundle_root: str = DEFAULT_BUNDLE_ROOT, verify: bool = False) -> Optional[ArtifactBundle]:
+    path = latest_bundle_path(bundle_root)
+    return ArtifactBundle(path, verify=verify) if path else None
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "write"
+    if command == "write":
+        print(f"✅ 아티팩트 번들 저장 완료: {write_bundle()}")
+    elif command in ("verify", "info"):
+        bundle = load_latest_bundle(verify=command == "verify")
+        if bundle is None:
+            sys.exit("❌ 번들이 없습니다 (models/bundle/LATEST)")
+        print(f"📦 {bundle.version}: 모델 {len(bundle.manifest['models'])}개, 전처리기 {len(bundle.manifest['preprocessors'])}개, "
+              f"배열 {len(bundle.arrays)}개 ({bundle._buffer.nbytes / 2**20:.1f}MB)")
+        if command == "verify":
+            print("✅ 체크섬 일치" if bundle.matches_sources(DEFAULT_MODELS_DIR, full=True) else "⚠️ models/ 원본이 번들 이후 변경됨")
+    else:
+        sys.exit(f"알 수 없는 명령: {command}")
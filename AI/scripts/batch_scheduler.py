@@ -0,0 +1,155 @@
+# 📄 batch_scheduler.py
+# 동적 마이크로 배칭 스케줄러
+# - 동시에 들어온 /predict 요청을 window_ms 동안 또는 max_batch_size 까지 모아서
+#   predict_coarse_fine_batch 한 번으로 처리 (SBERT 인코딩 + Keras forward 1회)
+# - 요청별 Future 로 결과/예외 전달
+# - 배치 호출이 예외를 내면 요청별로 다시 실행 → 문제 있는 요청만 실패 (같은 배치의 다른 요청은 정상 결과)
+# - queue_depth 초과 시 즉시 거절 (QueueFullError)
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+
+class QueueFullError(RuntimeError):
+    """대기열이 가득 차 요청을 받을 수 없음"""
+
+
+class MicroBatchScheduler:
+    def __init__(
+        self,
+        batch_fn: Callable[[List[dict]], List[dict]],
+        window_ms: float = 5.0,
+        max_batch_size: int = 32,
+        queue_depth: int = 1024,
+    ):
+        self.batch_fn = batch_fn
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.queue_depth = queue_depth
+
+        self._queue: "queue.Queue[Optional[Tuple[dict, Future]]]" = queue.Queue(maxsize=queue_depth)
+        self._worker: Optional[threading.Thread] = None
+        self._stop_event: Optional[threading.Event] = None  # 현재 워커의 중지 신호
+        self._lock = threading.Lock()
+
+        # 통계
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.fallbacks = 0  # 배치 실패 → 요청별 재실행 횟수
+
+    @classmethod
+    def from_env(cls, batch_fn: Callable[[List[dict]], List[dict]]) -> "MicroBatchScheduler":
+        """환경 변수(AI_BATCH_WINDOW_MS / AI_BATCH_MAX_SIZE / AI_BATCH_QUEUE_DEPTH)로 생성"""
+        return cls(
+            batch_fn,
+            window_ms=float(os.getenv("AI_BATCH_WINDOW_MS", "5")),
+            max_batch_size=int(os.getenv("AI_BATCH_MAX_SIZE", "32")),
+            queue_depth=int(os.getenv("AI_BATCH_QUEUE_DEPTH", "1024")),
+        )
+
+    def start(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop_event = threading.Event()
+                self._worker = threading.Thread(target=self._run, args=(self._stop_event,), name="micro-batch", daemon=True)
+                self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """워커 중지. 대기열이 가득 차 있어도 막히지 않음 (남은 요청은 처리 후 종료)"""
+        with self._lock:
+            worker, stop_event = self._worker, self._stop_event
+            self._worker = self._stop_event = None
+        if worker is not None:
+            stop_event.set()
+            try:
+                self._queue.put_nowait(None)  # 비어 있는 대기열에서 기다리는 워커 깨우기
+            except queue.Full:
+                pass  # 워커가 처리 중 → 배치마다 stop_event 확인
+            worker.join(timeout)
+
+    def submit(self, item: dict) -> Future:
+        """요청 1건을 대기열에 넣고 결과 Future 반환"""
+        self.start()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFullError(f"예측 대기열이 가득 찼습니다 (queue_depth={self.queue_depth})")
+        return future
+
+    def _collect(self, first: Tuple[dict, Future]) -> List[Tuple[dict, Future]]:
+        """첫 요청 도착 후 window_ms 동안 또는 max_batch_size 까지 모은다"""
+        batch = [first]
+        deadline = time.perf_counter() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is not None:  # None 은 stop() 의 깨우기 표시 → 중지 여부는 stop_event 로 판단
+                batch.append(entry)
+        return batch
+
+    def _run(self, stop_event: threading.Event) -> None:
+        while True:
+            # 중지 요청 후에는 기다리지 않고 남은 요청만 처리한 뒤 종료
+            first = self._get_nowait() if stop_event.is_set() else self._queue.get()
+            if first is None:
+                if stop_event.is_set() and self._queue.empty():
+                    return
+                continue  # 깨우기 표시 (또는 이전 워커용으로 늦게 도착한 표시)
+
+            batch = self._collect(first)
+            # 이미 취소된 요청은 제외
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+
+            if batch:
+                self._run_batch(batch)
+                self.batches += 1
+                self.items += len(batch)
+
+    def _get_nowait(self) -> Optional[Tuple[dict, Future]]:
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _run_batch(self, batch: List[Tuple[dict, Future]]) -> None:
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # 어느 요청 때문인지 모르므로 요청별로 다시 실행 → 실패한 요청에만 예외 전달
+            self.fallbacks += 1
+            for item, future in batch:
+                try:
+                    future.set_result(self.batch_fn([item])[0])
+                except Exception as item_error:
+                    future.set_exception(item_error)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self.queue_depth,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "rejected": self.rejected,
+            "fallbacks": self.fallbacks,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
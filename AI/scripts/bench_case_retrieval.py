@@ -0,0 +1,102 @@
+# bench_case_retrieval.py
+"""
+⏱️ 유사 사례 Top-k 검색 벤치마크
+- 합성 임베딩(군집 구조, 768차원)으로 16k → 1M 행까지 확장하며 측정
+- 방식별 비교: flat float32 / flat float16 / IVF(float16)
+- 측정 항목: 인덱스 생성 시간, 행렬 메모리, 질의 지연 p50 / p99
+
+실행: python scripts/bench_case_retrieval.py [--sizes 16000,100000,1000000] [--queries 200] [--json out.json]
+"""
+
+import time
+import json
+import argparse
+import numpy as np
+
+from case_retrieval import CaseIndex
+
+
+def synthetic_vectors(rows: int, dim: int, clusters: int = 32, seed: int = 0) -> np.ndarray:
+    """질병군처럼 몇 개의 중심 주변에 모인 합성 임베딩"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = np.empty((rows, dim), dtype=np.float32)
+    for start in range(0, rows, 65536):
+        end = min(start + 65536, rows)
+        assign = rng.integers(0, clusters, size=end - start)
+        vectors[start:end] = centers[assign] + 0.6 * rng.normal(size=(end - start, dim)).astype(np.float32)
+    return vectors
+
+
+def measure(index: CaseIndex, queries: np.ndarray, k: int) -> dict:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.asarray(latencies)
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+    }
+
+
+def recall(index: CaseIndex, exact: CaseIndex, queries: np.ndarray, k: int) -> float:
+    hits = 0
+    for query in queries:
+        expected = {r["row"] for r in exact.search(query, k)}
+        hits += len(expected & {r["row"] for r in index.search(query, k)})
+    return round(hits / (len(queries) * k), 4)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="16000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--probes", type=int, default=8)
+    parser.add_argument("--json", default=None, help="결과 저장 경로")
+    args = parser.parse_args()
+
+    report = []
+    for rows in [int(size) for size in args.sizes.split(",")]:
+        vectors = synthetic_vectors(rows, args.dim)
+        labels = np.zeros(rows, dtype=np.int8)
+        queries = synthetic_vectors(args.queries, args.dim, seed=1)
+        partitions = max(2, int(np.sqrt(rows)))
+
+        variants = {
+            "flat_f32": dict(dtype=np.float32),
+            "flat_f16": dict(dtype=np.float16),
+            f"ivf{partitions}_f16": dict(dtype=np.float16, n_partitions=partitions, n_probe=args.probes),
+        }
+
+        exact = None
+        for name, options in variants.items():
+            start = time.perf_counter()
+            index = CaseIndex(vectors, labels, **options)
+            build_s = round(time.perf_counter() - start, 3)
+
+            result = {"rows": rows, "variant": name, "build_s": build_s, "matrix_mb": round(index.nbytes / 2**20, 1)}
+            result.update(measure(index, queries, args.k))
+            if exact is None:
+                exact = index
+            result["recall@k"] = recall(index, exact, queries[:50], args.k)
+            report.append(result)
+            print(
+                f"{rows:>9,} {name:<14} build={build_s:>7.3f}s mem={result['matrix_mb']:>8.1f}MB "
+                f"p50={result['p50_ms']:>8.3f}ms p99={result['p99_ms']:>8.3f}ms recall@{args.k}={result['recall@k']}"
+            )
+            if index is not exact:
+                del index
+        del vectors, exact
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
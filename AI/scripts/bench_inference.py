@@ -0,0 +1,238 @@
+# bench_inference.py
+"""
+⏱️ 추론 경로 마이크로 벤치마크
+- 측정 대상 (각각 따로 측정)
+  · sbert_encode         : SBERT 문장 인코딩 (캐시 미사용)
+  · feature_build        : MLP 입력 구성 (scaler + MLB)
+  · predict_coarse_fine  : 서버 예측 경로 전체 (batch=1 은 predict_coarse_fine 과 동일, 임베딩 캐시 미사용)
+  · predict_disease      : predict_demo.py 경로 (SBERT 인코딩 + predict_disease, 1건씩 호출)
+- 배치 크기(--batch-sizes) × 스레드 수(--threads) 조합별 mean / p50 / p99 지연, 처리량(건/초)
+- 입력: leaned_train_dataset.csv 행 (증상 조합 / 인구통계 분포 그대로)
+- 결과를 JSON 기준선으로 저장(--save)하고, 기준선 대비 --threshold 이상 느려지면 종료 코드 1(--baseline)
+- --offline: 네트워크 / 학습 가중치 없이 실행 (HashingEncoder + 실제 구조의 랜덤 초기화 NumPy 모델)
+
+※ 스레드 수는 BLAS(NumPy / scikit-learn) 와 PyTorch(SBERT) 스레드 풀에 적용된다.
+  Keras 백엔드의 TensorFlow 스레드 풀은 프로세스 시작 후 바꿀 수 없으므로 TF_NUM_INTRAOP_THREADS 로 실행마다 지정.
+
+실행:
+  python scripts/bench_inference.py --offline --save benchmarks/offline.json
+  python scripts/bench_inference.py --offline --baseline benchmarks/offline.json --threshold 0.2
+  python scripts/bench_inference.py --batch-sizes 1,8,32 --threads 1,4 --cases predict_coarse_fine
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from threadpoolctl import threadpool_limits
+
+from scripts.embedding_cache import EmbeddingCache, key_to_sentence, normalize_keywords
+from scripts.model_util import (
+    COARSE_MAP,
+    INFERENCE_BACKEND,
+    TRAIN_CSV_PATH,
+    build_mlp_inputs,
+    items_from_frame,
+    load_artifacts,
+    predict_coarse_fine_batch,
+)
+from scripts.predict_disease import predict_disease
+
+# predict_disease 경로의 scikit-learn 피처 이름 / 미등록 클래스 경고는 측정과 무관
+warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
+
+CASES = ("sbert_encode", "feature_build", "predict_coarse_fine", "predict_disease")
+
+
+# ✅ CSV 행 → predict_coarse_fine 입력 dict
+def load_items(rows: int, seed: int = 0) -> list:
+    df = pd.read_csv(TRAIN_CSV_PATH, encoding="utf-8-sig")
+    return items_from_frame(df.sample(n=min(rows, len(df)), random_state=seed))
+
+
+# ✅ predict_coarse_fine 입력 → predict_disease 입력 (predict_demo.py 형식)
+def to_demo_sample(item: dict) -> dict:
+    return {
+        "symptom_keywords": ", ".join(item["symptom_keywords"]),
+        "Age": item["age"],
+        "Gender": "남성" if item["gender"] == 0 else "여성",
+        "Height_cm": item["height"],
+        "Weight_kg": item["weight"],
+        "BMI": item["bmi"],
+        "chronic_diseases": item["diseases"] or ["없음"],
+        "medications": item["medications"] or ["없음"],
+    }
+
+
+def make_case(name: str, artifacts):
+    """batch(list of items) → None 을 실행하는 함수"""
+    encoder = artifacts.sbert_model
+
+    if name == "sbert_encode":
+        return lambda batch: encoder.encode([key_to_sentence(normalize_keywords(i["symptom_keywords"])) for i in batch])
+
+    if name == "feature_build":
+        return lambda batch: build_mlp_inputs(batch, artifacts)
+
+    if name == "predict_coarse_fine":
+        return lambda batch: predict_coarse_fine_batch(batch, artifacts, observe=False)
+
+    if name == "predict_disease":
+        groups = list(artifacts.coarse_encoder.classes_)
+        fine = {g: artifacts.fine_registry.get(COARSE_MAP[g]) for g in groups}
+        fine_models = {g: entry[0] for g, entry in fine.items()}
+        fine_encoders = {g: entry[1] for g, entry in fine.items()}
+
+        def run(batch):
+            for item in batch:
+                sample = to_demo_sample(item)
+                predict_disease(
+                    sample,
+                    artifacts.model_coarse,
+                    fine_models,
+                    artifacts.coarse_encoder,
+                    fine_encoders,
+                    artifacts.scaler,
+                    artifacts.mlb_chronic,
+                    artifacts.mlb_meds,
+                    encoder.encode([sample["symptom_keywords"].replace(",", " ")]),
+                )
+        return run
+
+    raise ValueError(f"알 수 없는 측정 대상: {name}")
+
+
+def set_threads(threads: int):
+    """BLAS + PyTorch 스레드 수 제한 (컨텍스트 매니저)"""
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+    return threadpool_limits(limits=threads)
+
+
+def measure(fn, items: list, batch_size: int, iterations: int, warmup: int) -> dict:
+    # 입력 행을 순환하며 배치 구성 (반복마다 다른 행)
+    batches = [
+        [items[(i * batch_size + j) % len(items)] for j in range(batch_size)]
+        for i in range(iterations + warmup)
+    ]
+
+    for batch in batches[:warmup]:
+        fn(batch)
+
+    latencies = []
+    for batch in batches[warmup:]:
+        start = time.perf_counter()
+        fn(batch)
+        latencies.append(time.perf_counter() - start)
+
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "mean_ms": round(float(latencies.mean()), 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "throughput": round(batch_size * 1000 / float(latencies.mean()), 1),  # 건/초
+    }
+
+
+# ✅ 기준선 비교: metric 이 (1 + threshold) 배를 넘으면 회귀
+def compare(results: dict, baseline: dict, metric: str, threshold: float) -> list:
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get("results", {}).get(key)
+        if not base or not base.get(metric):
+            continue
+        ratio = current[metric] / base[metric]
+        mark = "❌" if ratio > 1 + threshold else "✅"
+        print(f"{mark} {key:<36} {metric} {base[metric]:>9.3f} → {current[metric]:>9.3f}ms ({ratio - 1:+.1%})")
+        if ratio > 1 + threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--threads", default="1,4")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=2048, help="CSV 에서 뽑을 입력 행 수")
+    parser.add_argument("--offline", action="store_true", help="HashingEncoder + 랜덤 초기화 모델 사용")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", default=None, help="결과를 기준선 JSON 으로 저장")
+    parser.add_argument("--baseline", default=None, help="비교할 기준선 JSON")
+    parser.add_argument("--metric", default="p50_ms", choices=["mean_ms", "p50_ms", "p99_ms"])
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 지연 증가 비율 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    cases = [c for c in args.cases.split(",") if c]
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    thread_counts = [int(t) for t in args.threads.split(",")]
+
+    print("📦 아티팩트 로딩 중..." + (" (offline)" if args.offline else ""))
+    if args.offline:
+        from scripts.offline_artifacts import build_offline_artifacts
+        artifacts = build_offline_artifacts(seed=args.seed)
+    else:
+        artifacts = load_artifacts()
+    # 예측 경로는 매번 SBERT 인코딩까지 측정 (캐시 hit 로 가려지지 않도록)
+    artifacts.embedding_cache = EmbeddingCache(0)
+
+    items = load_items(args.rows, args.seed)
+
+    results = {}
+    for case in cases:
+        fn = make_case(case, artifacts)
+        for threads in thread_counts:
+            with set_threads(threads):
+                for batch_size in batch_sizes:
+                    key = f"{case}/b{batch_size}/t{threads}"
+                    results[key] = measure(fn, items, batch_size, args.iterations, args.warmup)
+                    r = results[key]
+                    print(
+                        f"{key:<36} mean={r['mean_ms']:>9.3f}ms p50={r['p50_ms']:>9.3f}ms "
+                        f"p99={r['p99_ms']:>9.3f}ms {r['throughput']:>9.1f}건/s"
+                    )
+
+    report = {
+        "meta": {
+            "offline": args.offline,
+            "backend": "numpy" if args.offline else INFERENCE_BACKEND,
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 기준선 저장: {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n📊 기준선 비교 ({args.baseline}, 허용 +{args.threshold:.0%})")
+        regressions = compare(results, baseline, args.metric, args.threshold)
+        if regressions:
+            print(f"❌ 성능 회귀 {len(regressions)}건: {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
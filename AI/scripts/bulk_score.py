@@ -0,0 +1,227 @@
+# bulk_score.py
+"""
+📦 대용량 환자 파일 일괄 예측 (스트리밍)
+- 입력: leaned_train_dataset.csv 와 같은 컬럼의 CSV / Parquet (Parquet 은 pyarrow 필요)
+- --chunk-size 행씩 읽어서 predict_coarse_fine_batch 로 배치 예측 (청크 안 같은 증상 조합은 SBERT 1회 인코딩)
+- 결과를 청크마다 출력 파일(.csv / .jsonl)에 바로 이어 씀 → 입력 크기와 무관하게 메모리 일정
+- 청크를 쓸 때마다 체크포인트(<출력>.ckpt.json: 처리한 행 수 + 출력 바이트 수) 갱신
+  --resume: 체크포인트 이후 행부터 재개 (체크포인트 뒤에 쓰다 만 출력은 잘라냄)
+  --start-row: 체크포인트 없이 지정 행부터 시작
+- --workers N: 워커 프로세스 N개가 각자 아티팩트를 로드해 청크를 나눠 처리 (출력 순서는 입력 순서 그대로)
+
+- 값이 없거나(NaN) 잘못된 행은 예측하지 않고 예측 컬럼을 비운 채 error 컬럼에 사유 기록 (거부 행 수는 진행 로그 / 체크포인트에 누적)
+
+출력 컬럼: row, coarse_1, fine_1, score_1, ..., coarse_3, fine_3, score_3, model_version, error
+
+실행:
+  python scripts/bulk_score.py data/raw/leaned_train_dataset.csv --output results/scores.csv
+  python scripts/bulk_score.py exports/history.parquet --output results/history.jsonl --workers 4
+  python scripts/bulk_score.py exports/history.parquet --output results/history.jsonl --resume
+  python scripts/bulk_score.py data/samples/bulk_score_smoke.csv --output /tmp/smoke.csv --offline   # 동작 확인 (잘못된 행 포함)
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from typing import Iterator, List, Tuple
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+INPUT_COLUMNS = ["symptom_keywords", "Age", "Gender", "Height_cm", "Weight_kg", "chronic_diseases", "medications", "BMI"]
+TOP_K = 3
+OUTPUT_COLUMNS = ["row"] + [f"{name}_{k}" for k in range(1, TOP_K + 1) for name in ("coarse", "fine", "score")] + ["model_version", "error"]
+
+
+# ✅ 입력 스트리밍: (시작 행 번호, DataFrame 청크)
+def iter_chunks(path: str, chunk_size: int, start_row: int = 0) -> Iterator[Tuple[int, pd.DataFrame]]:
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        row = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=INPUT_COLUMNS):
+            if row + batch.num_rows > start_row:
+                df = batch.to_pandas()
+                skip = max(start_row - row, 0)
+                yield row + skip, df.iloc[skip:].reset_index(drop=True)
+            row += batch.num_rows
+        return
+
+    reader = pd.read_csv(
+        path,
+        encoding="utf-8-sig",
+        usecols=INPUT_COLUMNS,
+        chunksize=chunk_size,
+        skiprows=range(1, start_row + 1),  # 헤더는 남기고 이미 처리한 행만 건너뜀
+    )
+    row = start_row
+    for df in reader:
+        yield row, df
+        row += len(df)
+
+
+# ✅ 청크 예측 → 출력 행 리스트 (워커 프로세스에서도 호출)
+_artifacts = None
+
+def init_worker(offline: bool, threads: int) -> None:
+    global _artifacts
+    from scripts.model_util import load_artifacts
+
+    if threads:
+        # 워커끼리 코어를 나눠 쓰도록 BLAS / PyTorch 스레드 수 제한 (프로세스 수명 동안 유지)
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=threads)
+        if "torch" in sys.modules:
+            sys.modules["torch"].set_num_threads(threads)
+    if offline:
+        from scripts.offline_artifacts import build_offline_artifacts
+        _artifacts = build_offline_artifacts()
+    else:
+        _artifacts = load_artifacts()
+
+
+def score_chunk(start_row: int, df: pd.DataFrame) -> List[list]:
+    from scripts.model_util import predict_coarse_fine_batch, validate_frame
+
+    items, positions, rejected = validate_frame(df)
+    results = predict_coarse_fine_batch(items, _artifacts, observe=False) if items else []
+    rows = [None] * len(df)
+    for position, result in zip(positions, results):
+        row = [start_row + position]
+        for k in range(TOP_K):
+            if k < len(result["predictions"]):
+                p = result["predictions"][k]
+                row += [p["coarseLabel"], p["fineLabel"], round(p["riskScore"], 6)]
+            else:
+                row += [None, None, None]
+        rows[position] = row + [result["modelVersion"], None]
+    for position, reason in rejected:
+        rows[position] = [start_row + position] + [None] * (TOP_K * 3 + 1) + [reason]
+    return rows
+
+
+# ✅ 출력 + 체크포인트
+class ResultWriter:
+    def __init__(self, path: str, resume_bytes: int = None):
+        self.path = path
+        self.jsonl = path.endswith(".jsonl")
+        os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+
+        if resume_bytes is not None and os.path.exists(path):
+            self.file = open(path, "r+", encoding="utf-8", newline="")
+            self.file.truncate(resume_bytes)  # 마지막 체크포인트 이후에 쓰다 만 부분 제거
+            self.file.seek(resume_bytes)
+        else:
+            self.file = open(path, "w", encoding="utf-8", newline="")
+            if not self.jsonl:
+                csv.writer(self.file).writerow(OUTPUT_COLUMNS)
+        self.csv = csv.writer(self.file)
+
+    def write(self, rows: List[list]) -> int:
+        """행 기록 후 flush + fsync. 현재 출력 바이트 수 반환"""
+        if self.jsonl:
+            self.file.writelines(json.dumps(dict(zip(OUTPUT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows)
+        else:
+            self.csv.writerows(rows)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def checkpoint_path(output: str) -> str:
+    return output + ".ckpt.json"
+
+
+def save_checkpoint(output: str, state: dict) -> None:
+    tmp = checkpoint_path(output) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, checkpoint_path(output))
+
+
+def load_checkpoint(output: str, input_path: str) -> dict:
+    with open(checkpoint_path(output), encoding="utf-8") as f:
+        state = json.load(f)
+    if state["input"] != os.path.abspath(input_path):
+        raise SystemExit(f"❌ 체크포인트의 입력 파일이 다릅니다: {state['input']}")
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="CSV 또는 Parquet 입력 파일")
+    parser.add_argument("--output", required=True, help="출력 파일 (.csv 또는 .jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    parser.add_argument("--workers", type=int, default=1, help="워커 프로세스 수 (1 이면 현재 프로세스에서 처리)")
+    parser.add_argument("--threads", type=int, default=0, help="워커별 BLAS/PyTorch 스레드 수 (0 = 기본값)")
+    parser.add_argument("--resume", action="store_true", help="체크포인트 이후부터 재개")
+    parser.add_argument("--start-row", type=int, default=0, help="이 행부터 처리 (0부터, 체크포인트 미사용 시)")
+    parser.add_argument("--offline", action="store_true", help="HashingEncoder + 랜덤 초기화 모델 사용 (동작 확인용)")
+    args = parser.parse_args()
+
+    start_row, resume_bytes, rows_rejected = args.start_row, None, 0
+    if args.resume and os.path.exists(checkpoint_path(args.output)):
+        state = load_checkpoint(args.output, args.input)
+        start_row, resume_bytes = state["rows_done"], state["output_bytes"]
+        rows_rejected = state.get("rows_rejected", 0)
+        print(f"↩️ 체크포인트에서 재개: {start_row}행부터")
+
+    writer = ResultWriter(args.output, resume_bytes)
+    threads = args.threads or (max(1, (os.cpu_count() or 1) // args.workers) if args.workers > 1 else 0)
+    chunks = iter_chunks(args.input, args.chunk_size, start_row)
+
+    print("📦 아티팩트 로딩 중..." + (f" (워커 {args.workers}개)" if args.workers > 1 else ""))
+    started = time.perf_counter()
+    rows_done, scored = start_row, 0
+
+    def commit(rows: List[list]) -> None:
+        nonlocal rows_done, scored, rows_rejected
+        output_bytes = writer.write(rows)
+        rows_done += len(rows)
+        scored += len(rows)
+        rows_rejected += sum(1 for row in rows if row[-1] is not None)
+        save_checkpoint(args.output, {
+            "input": os.path.abspath(args.input),
+            "rows_done": rows_done,
+            "rows_rejected": rows_rejected,
+            "output_bytes": output_bytes,
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        elapsed = time.perf_counter() - started
+        print(f"✅ {rows_done:>10,}행 완료 ({scored / elapsed:,.0f}행/s, 거부 {rows_rejected:,}행)")
+
+    try:
+        if args.workers <= 1:
+            init_worker(args.offline, threads)
+            for chunk_start, df in chunks:
+                commit(score_chunk(chunk_start, df))
+        else:
+            # TensorFlow / PyTorch 는 fork 후 안전하지 않으므로 spawn
+            # 대기 중인 청크를 워커 수의 2배로 제한 → 입력을 미리 다 읽지 않음
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(args.workers, initializer=init_worker, initargs=(args.offline, threads)) as pool:
+                pending = deque()
+                for chunk_start, df in chunks:
+                    pending.append(pool.apply_async(score_chunk, (chunk_start, df)))
+                    if len(pending) >= args.workers * 2:
+                        commit(pending.popleft().get())
+                while pending:
+                    commit(pending.popleft().get())
+    finally:
+        writer.close()
+
+    print(f"🏁 총 {scored:,}행 처리 ({time.perf_counter() - started:.1f}s, 거부 누적 {rows_rejected:,}행) → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# 📄 case_retrieval.py
+# 학습 데이터 SBERT 임베딩 기반 유사 사례 Top-k 검색
+# - 행 단위 L2 정규화 후 float32 / float16 행렬로 보관 (float16 은 메모리 절반)
+# - 선택: IVF 방식 분할 인덱스 (k-means 중심 → 가까운 n_probe 개 파티션만 검색)
+#   ※ float16 → float32 변환 비용이 커서 float16 전체 검색(flat)은 느리다. float16 은 IVF 와 함께 사용
+# - 검색 결과: 행 번호, 코사인 유사도, 질병명
+
+import os
+import numpy as np
+from typing import List, Optional, Sequence
+
+# float16 행렬은 블록 단위로 float32 로 올려 곱한다 (NumPy float16 matmul 은 느림)
+SEARCH_BLOCK_ROWS = 65536
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, sample_size: int = 65536, seed: int = 42) -> np.ndarray:
+    """정규화된 벡터에 대한 구면 k-means (샘플로 학습) → 중심 (n_clusters, D)"""
+    rng = np.random.default_rng(seed)
+    sample_idx = rng.choice(len(vectors), size=min(sample_size, len(vectors)), replace=False)
+    sample = np.asarray(vectors[np.sort(sample_idx)], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), size=n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(n_clusters):
+            members = sample[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+    return centroids
+
+
+class CaseIndex:
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        labels: Sequence[str],
+        dtype=np.float32,
+        n_partitions: int = 0,
+        n_probe: int = 8,
+        texts: Optional[Sequence[str]] = None,
+    ):
+        self.dtype = np.dtype(dtype)
+        self.labels = np.asarray(labels)
+        self.texts = np.asarray(texts) if texts is not None else None
+        self.n_probe = n_probe
+
+        # 정규화 행렬 (블록 단위로 변환해 float32 전체 사본을 만들지 않음)
+        matrix = np.empty(vectors.shape, dtype=self.dtype)
+        for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+            matrix[start:start + SEARCH_BLOCK_ROWS] = _normalize(vectors[start:start + SEARCH_BLOCK_ROWS])
+
+        self.centroids: Optional[np.ndarray] = None
+        self.offsets: Optional[np.ndarray] = None
+        self.row_ids = np.arange(len(matrix))
+
+        if n_partitions > 1:
+            # ✅ IVF: 파티션 순서로 행을 재배치하고 파티션별 시작 위치 기록
+            self.centroids = _kmeans(matrix, n_partitions)
+            assign = np.empty(len(matrix), dtype=np.int32)
+            for start in range(0, len(matrix), SEARCH_BLOCK_ROWS):
+                block = matrix[start:start + SEARCH_BLOCK_ROWS].astype(np.float32)
+                assign[start:start + SEARCH_BLOCK_ROWS] = np.argmax(block @ self.centroids.T, axis=1)
+            order = np.argsort(assign, kind="stable")
+            matrix = matrix[order]
+            self.row_ids = order
+            self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_partitions))])
+
+        self.matrix = matrix
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.matrix.nbytes)
+
+    @classmethod
+    def from_files(cls, npy_path: str, csv_path: str, **kwargs) -> "CaseIndex":
+        """leaned_sbert_text_features_final.npy + leaned_train_dataset.csv → 인덱스"""
+        import pandas as pd
+
+        df = pd.read_csv(csv_path, encoding="utf-8-sig", usecols=["symptom_keywords", "disease_name"])
+        vectors = np.load(npy_path, mmap_mode="r")[:len(df)]
+        return cls(vectors, df["disease_name"].tolist()[:len(vectors)], texts=df["symptom_keywords"].tolist()[:len(vectors)], **kwargs)
+
+    def _scores(self, rows: slice, query: np.ndarray) -> np.ndarray:
+        block = self.matrix[rows]
+        if block.dtype != np.float32:
+            block = block.astype(np.float32)
+        return block @ query
+
+    def search(self, query: np.ndarray, k: int = 5) -> List[dict]:
+        """질의 벡터와 코사인 유사도가 가장 높은 학습 사례 k개"""
+        query = _normalize(np.asarray(query).reshape(-1))
+
+        if self.centroids is not None:
+            probes = np.argsort(self.centroids @ query)[::-1][: self.n_probe]
+            segments = [slice(int(self.offsets[p]), int(self.offsets[p + 1])) for p in probes]
+        else:
+            segments = [slice(start, start + SEARCH_BLOCK_ROWS) for start in range(0, len(self.matrix), SEARCH_BLOCK_ROWS)]
+
+        best_rows, best_scores = [], []
+        for segment in segments:
+            scores = self._scores(segment, query)
+            if not len(scores):
+                continue
+            top = np.argpartition(scores, -min(k, len(scores)))[-k:]
+            best_rows.append(top + segment.start)
+            best_scores.append(scores[top])
+
+        if not best_rows:
+            return []
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        order = np.argsort(scores)[::-1][:k]
+
+        results = []
+        for position in order:
+            row = int(self.row_ids[rows[position]])
+            result = {"row": row, "score": float(scores[position]), "label": str(self.labels[row])}
+            if self.texts is not None:
+                result["text"] = str(self.texts[row])
+            results.append(result)
+        return results
+
+
+def load_case_index(npy_path: str, csv_path: str) -> Optional[CaseIndex]:
+    """임베딩 파일이 있을 때만 인덱스 생성 (AI_CASE_INDEX_DTYPE / AI_CASE_INDEX_PARTITIONS)"""
+    if not os.path.exists(npy_path):
+        return None
+    return CaseIndex.from_files(
+        npy_path,
+        csv_path,
+        dtype=os.getenv("AI_CASE_INDEX_DTYPE", "float32"),
+        n_partitions=int(os.getenv("AI_CASE_INDEX_PARTITIONS", "0")),
+        n_probe=int(os.getenv("AI_CASE_INDEX_PROBES", "8")),
+    )
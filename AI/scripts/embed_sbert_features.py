@@ -3,40 +3,47 @@
 💡 SBERT 임베딩 전용 스크립트
 입력 데이터셋에서 symptom_keywords를 SBERT 임베딩하여
 numpy 파일(.npy)로 저장하는 전처리 스크립트입니다.
+- 행 대부분이 같은 증상 조합의 반복이므로 서로 다른 문장만 인코딩
+- 인코딩 결과는 내용 주소 저장소(data/processed/sbert_store/)에 누적 → CSV 에 행이 추가돼도 처음 보는 문장만 인코딩
+- 저장소에 모두 있으면 SBERT 모델도 로드하지 않음
 """
 
+import os
+import sys
+import time
 import pandas as pd
-import numpy as np
-from sentence_transformers import SentenceTransformer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from embedding_store import EmbeddingStore
 
 # ✅ 경로 설정
 INPUT_PATH = "./data/raw/leaned_train_dataset.csv"
 OUTPUT_PATH = "./data/processed/leaned_sbert_text_features_final.npy"
+STORE_DIR = "./data/processed/sbert_store"
 MODEL_NAME = "snunlp/KR-SBERT-V40K-klueNLI-augSTS"
 
-# ✅ 데이터 로딩 및 전처리
+
+def load_model():
+    print("🧠 SBERT 모델 로딩 중...")
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+
+# ✅ 데이터 로딩
 print("📦 데이터 로딩 중...")
-df = pd.read_csv(INPUT_PATH, encoding="utf-8-sig")
-df["symptom_keywords_cleaned"] = df["symptom_keywords"].apply(
-    lambda x: x.replace(",", " ") if isinstance(x, str) else ""
-)
-texts = df["symptom_keywords_cleaned"].tolist()
-assert len(texts) == len(df), "❌ 텍스트 수와 df 길이가 불일치합니다."
-
-# ✅ SBERT 모델 로딩
-print("🧠 SBERT 모델 로딩 중...")
-model = SentenceTransformer(MODEL_NAME)
-
-# ✅ 임베딩 수행
-print("🔄 임베딩 수행 중...")
-embeddings = model.encode(
-    texts,
-    convert_to_tensor=False,
-    batch_size=64,
-    show_progress_bar=True
-)
-
-# ✅ 저장
+df = pd.read_csv(INPUT_PATH, encoding="utf-8-sig", usecols=["symptom_keywords"])
+texts = df["symptom_keywords"].tolist()
+
+# ✅ 처음 보는 문장만 임베딩
+store = EmbeddingStore(STORE_DIR, MODEL_NAME)
+missing = len(store.missing(texts))
+print(f"🔄 임베딩 수행 중... (행 {len(texts):,}, 저장소 {len(store):,}문장, 새 문장 {missing:,})")
+start = time.perf_counter()
+encoded = store.encode_missing(texts, load_model, batch_size=64)
+print(f"   - {encoded:,}문장 인코딩 ({time.perf_counter() - start:.1f}s)")
+
+# ✅ 저장 (행 순서로 펼쳐서 .npy 에 청크 단위 기록)
 print(f"💾 임베딩 결과 저장: {OUTPUT_PATH}")
-np.save(OUTPUT_PATH, embeddings)
-print("✅ 완료!", embeddings.shape)
\ No newline at end of file
+embeddings = store.expand(texts, OUTPUT_PATH)
+assert len(embeddings) == len(df), "❌ 임베딩 수와 df 길이가 불일치합니다."
+print("✅ 완료!", embeddings.shape)
@@ -0,0 +1,109 @@
+# 📄 embedding_cache.py
+# 사용자 증상 키워드 SBERT 임베딩 LRU 캐시
+# - 키: 앞뒤 공백 / 빈 값만 정리한 키워드 튜플 (입력 순서 유지)
+#   SBERT 문장은 키워드를 입력 순서대로 이어 붙인 것이라 순서·중복이 바뀌면 임베딩도 바뀜
+#   → 정렬/중복 제거한 키를 쓰면 먼저 들어온 순서의 벡터가 다른 순서 요청에 재사용되므로 키에 순서를 그대로 둠
+# - 크기 상한 초과 시 가장 오래 사용하지 않은 항목부터 제거
+# - hit / miss / hit rate 통계
+# - leaned_train_dataset.csv 의 symptom_keywords 조합으로 미리 채우기(warm start) 지원
+
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+KeywordKey = Tuple[str, ...]
+
+
+def normalize_keywords(keywords: Iterable[str]) -> KeywordKey:
+    """['기침 ', '', '가래'] → ('기침', '가래'). " ".join 결과가 원래 문장과 같은 토큰열이 되도록 순서·중복은 그대로"""
+    return tuple(kw.strip() for kw in keywords if kw and kw.strip())
+
+
+def key_to_sentence(key: KeywordKey) -> str:
+    return " ".join(key)
+
+
+class EmbeddingCache:
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._entries: "OrderedDict[KeywordKey, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(self, key: KeywordKey, vector: np.ndarray) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def encode(self, keyword_lists: List[List[str]], encoder) -> np.ndarray:
+        """키워드 리스트들 → (N, 임베딩 차원). 캐시에 없는 조합만 한 번에 인코딩"""
+        keys = [normalize_keywords(keywords) for keywords in keyword_lists]
+
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+                else:
+                    self.misses += 1
+
+        # 배치 내 중복 조합은 한 번만 인코딩
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            vectors = np.asarray(encoder.encode([key_to_sentence(key) for key in missing]), dtype=np.float32)
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    self._put(key, vector)
+                    found[key] = vector
+
+        return np.stack([found[key] for key in keys])
+
+    def put_many(self, keys: List[KeywordKey], vectors: np.ndarray) -> None:
+        """미리 계산해 둔 (정규화 키, 벡터) 채우기 (평가 스크립트의 디스크 캐시 등)"""
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._put(key, vector)
+
+    def warm_from_csv(self, csv_path: str, encoder, batch_size: int = 256, limit: Optional[int] = None) -> int:
+        """CSV symptom_keywords 의 서로 다른 조합을 미리 인코딩. 추가된 항목 수 반환"""
+        import pandas as pd
+
+        column = pd.read_csv(csv_path, encoding="utf-8-sig", usecols=["symptom_keywords"])["symptom_keywords"]
+        keys = list(dict.fromkeys(
+            normalize_keywords(str(value).split(",")) for value in column.dropna().unique()
+        ))
+        keys = [key for key in keys if key][: min(limit or self.max_size, self.max_size)]
+
+        with self._lock:
+            keys = [key for key in keys if key not in self._entries]
+
+        for start in range(0, len(keys), batch_size):
+            chunk = keys[start:start + batch_size]
+            vectors = np.asarray(encoder.encode([key_to_sentence(key) for key in chunk]), dtype=np.float32)
+            with self._lock:
+                for key, vector in zip(chunk, vectors):
+                    self._put(key, vector)
+        return len(keys)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
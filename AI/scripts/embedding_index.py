@@ -0,0 +1,105 @@
+# 📄 embedding_index.py
+# symptom_map.json 질병 문장 SBERT 임베딩 인덱스
+# - 질병별 증상 문장을 서버 시작 시 한 번만 임베딩하여 디스크에 저장
+# - 저장 키: symptom_map.json 내용 해시 + SBERT 모델명 (둘 중 하나라도 바뀌면 자동 재생성)
+# - 저장 형식: .npy (mmap 로드 가능) + 라벨 메타데이터 .json
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+from typing import Callable, List
+
+
+def compute_index_key(symptom_map_path: str, model_name: str) -> str:
+    """symptom_map.json 바이트와 모델명을 합쳐 인덱스 키(해시)를 만든다."""
+    digest = hashlib.sha256()
+    with open(symptom_map_path, "rb") as f:
+        digest.update(f.read())
+    digest.update(b"\0")
+    digest.update(model_name.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _atomic_write(path: str, mode: str, write: Callable) -> None:
+    """같은 디렉터리의 고유 임시 파일(.<이름>.<랜덤>.tmp)에 쓴 뒤 os.replace 로 교체. 실패 시 임시 파일 삭제"""
+    directory, name = os.path.split(path)
+    encoding = None if "b" in mode else "utf-8"
+    with tempfile.NamedTemporaryFile(mode, dir=directory, prefix=f".{name}.", suffix=".tmp", encoding=encoding, delete=False) as f:
+        tmp_path = f.name
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+
+
+class DiseaseEmbeddingIndex:
+    """질병 문장 임베딩 행렬 + 코사인 유사도 검색"""
+
+    def __init__(self, labels: List[str], vectors: np.ndarray, key: str = ""):
+        self.labels = labels
+        self.vectors = vectors  # (질병 수, 임베딩 차원) 원본 SBERT 벡터
+        self.key = key
+
+        # ✅ 정규화 행렬을 미리 계산 → 요청마다 행렬-벡터 곱 한 번
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.unit_vectors = np.asarray(vectors / np.maximum(norms, 1e-12), dtype=np.float32)
+
+    @classmethod
+    def load_or_build(cls, symptom_map_path: str, model_name: str, encoder, cache_dir: str) -> "DiseaseEmbeddingIndex":
+        """캐시된 인덱스를 mmap으로 로드하고, 없거나 키가 다르면 새로 만든다."""
+        key = compute_index_key(symptom_map_path, model_name)
+        vectors_path = os.path.join(cache_dir, f"{key}.npy")
+        meta_path = os.path.join(cache_dir, f"{key}.json")
+
+        if os.path.exists(vectors_path) and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            vectors = np.load(vectors_path, mmap_mode="r")
+            return cls(meta["labels"], vectors, key)
+
+        with open(symptom_map_path, "r", encoding="utf-8") as f:
+            symptom_map: dict[str, list[str]] = json.load(f)
+
+        labels = list(symptom_map.keys())
+        sentences = [" ".join(symptom_map[d]) for d in labels]
+        vectors = np.asarray(encoder.encode(sentences), dtype=np.float32)
+
+        cls._save(cache_dir, key, vectors, {"labels": labels, "model_name": model_name})
+        return cls(labels, np.load(vectors_path, mmap_mode="r"), key)
+
+    @staticmethod
+    def _save(cache_dir: str, key: str, vectors: np.ndarray, meta: dict) -> None:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # ✅ 임시 파일에 쓴 뒤 교체 (동시에 뜨는 워커가 반쯤 쓰인 파일을 읽지 않도록)
+        # 임시 파일 이름은 호출마다 고유 → 여러 워커가 같은 키를 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않음
+        _atomic_write(os.path.join(cache_dir, f"{key}.npy"), "wb", lambda f: np.save(f, vectors))
+        _atomic_write(
+            os.path.join(cache_dir, f"{key}.json"), "w",
+            lambda f: json.dump(meta, f, ensure_ascii=False, indent=2),
+        )
+
+        # 이전 키의 인덱스 파일 정리
+        for name in os.listdir(cache_dir):
+            stem = name.split(".", 1)[0]
+            if stem != key and (name.endswith(".npy") or name.endswith(".json")):
+                os.remove(os.path.join(cache_dir, name))
+
+    def best_index(self, user_vec: np.ndarray) -> int:
+        """사용자 문장 벡터와 코사인 유사도가 가장 높은 질병 인덱스"""
+        scores = self.unit_vectors @ np.asarray(user_vec, dtype=np.float32).reshape(-1)
+        return int(np.argmax(scores))
+
+    def best_vector(self, user_vec: np.ndarray) -> np.ndarray:
+        """가장 유사한 질병 문장의 SBERT 벡터 반환"""
+        return np.asarray(self.vectors[self.best_index(user_vec)])
+
+    def best_vectors(self, user_vecs: np.ndarray) -> np.ndarray:
+        """(N, D) 사용자 벡터 행렬 → 행별 최고 유사 질병 벡터 (N, D)"""
+        scores = np.asarray(user_vecs, dtype=np.float32) @ self.unit_vectors.T
+        return np.asarray(self.vectors[np.argmax(scores, axis=1)])
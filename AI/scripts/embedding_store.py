@@ -0,0 +1,144 @@
+# 📄 embedding_store.py
+# 내용 주소 기반 SBERT 임베딩 저장소 (학습 코퍼스용, 증분 + 중복 제거)
+# - 키: 정규화한 문장 + 모델명 해시 → 같은 문장은 한 번만 인코딩
+# - 저장 형식: <root>/<모델 해시>/vectors.f32 (float32 원시 배열, 추가만 함) + keys.jsonl (행 순서 = 벡터 순서)
+# - 처음 보는 문장만 배치 인코딩해 뒤에 추가 (배치마다 기록 → 중단돼도 이미 인코딩한 부분은 유지)
+# - expand(): 원본 행 순서의 (행 수, 차원) .npy 를 메모리에 올리지 않고 청크 단위로 memmap 에 채움
+
+import os
+import json
+import hashlib
+import numpy as np
+from typing import Dict, List, Sequence
+
+
+def normalize_text(text) -> str:
+    """쉼표 → 공백, 연속 공백 정리 (토크나이저 입장에서 같은 문장은 같은 키). 키워드 순서는 유지"""
+    if not isinstance(text, str):
+        return ""
+    return " ".join(text.replace(",", " ").split())
+
+
+def text_key(text: str, model_name: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()[:24]
+
+
+class EmbeddingStore:
+    def __init__(self, root: str, model_name: str):
+        self.model_name = model_name
+        self.path = os.path.join(root, hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:12])
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self.keys_path = os.path.join(self.path, "keys.jsonl")
+        self.meta_path = os.path.join(self.path, "meta.json")
+        os.makedirs(self.path, exist_ok=True)
+
+        self.dim = None
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+
+        self._index: Dict[str, int] = {}
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.endswith("\n"):  # 마지막 줄이 잘린 경우(기록 중 중단) 무시
+                        self._index[json.loads(line)["key"]] = len(self._index)
+        self._recover()
+
+    def _recover(self) -> None:
+        """기록 중 중단된 경우: 잘린 마지막 키 줄, 키 없이 남은 벡터를 잘라냄"""
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "r+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                tail = b""
+                if size:
+                    f.seek(max(size - 65536, 0))
+                    tail = f.read()
+                if tail and not tail.endswith(b"\n"):
+                    f.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return
+        expected = len(self._index) * self.dim * 4
+        if os.path.getsize(self.vectors_path) > expected:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(expected)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, text: str) -> bool:
+        return text_key(normalize_text(text), self.model_name) in self._index
+
+    def missing(self, texts: Sequence[str]) -> List[str]:
+        """저장소에 없는 정규화 문장 (중복 제거, 처음 나온 순서)"""
+        seen = set()
+        result = []
+        for text in map(normalize_text, texts):
+            if text in seen:
+                continue
+            seen.add(text)
+            if text_key(text, self.model_name) not in self._index:
+                result.append(text)
+        return result
+
+    def add(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """정규화 문장 + 벡터 추가 (벡터 먼저, 키 나중에 기록)"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model_name": self.model_name, "dim": self.dim}, f, ensure_ascii=False)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"임베딩 차원이 다릅니다: {vectors.shape[1]} != {self.dim}")
+
+        # 이미 있거나 중복된 문장은 건너뜀 (벡터 행 번호 = 키 순서 유지)
+        new_rows, new_keys = [], {}
+        for row, text in enumerate(texts):
+            key = text_key(text, self.model_name)
+            if key not in self._index and key not in new_keys:
+                new_keys[key] = text
+                new_rows.append(row)
+        if not new_rows:
+            return
+
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors[new_rows].tobytes())
+        with open(self.keys_path, "a", encoding="utf-8") as f:
+            for key, text in new_keys.items():
+                f.write(json.dumps({"key": key, "text": text}, ensure_ascii=False) + "\n")
+                self._index[key] = len(self._index)
+
+    def encode_missing(self, texts: Sequence[str], encoder_factory, batch_size: int = 64) -> int:
+        """처음 보는 문장만 배치 인코딩해 추가. 인코딩한 문장 수 반환 (없으면 인코더도 만들지 않음)"""
+        missing = self.missing(texts)
+        if not missing:
+            return 0
+        encoder = encoder_factory()
+        chunk = batch_size * 16
+        for start in range(0, len(missing), chunk):
+            part = missing[start:start + chunk]
+            self.add(part, encoder.encode(part, batch_size=batch_size, convert_to_tensor=False))
+        return len(missing)
+
+    def vectors(self) -> np.ndarray:
+        """(저장된 문장 수, 차원) 읽기 전용 memmap"""
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self._index), self.dim))
+
+    def row_ids(self, texts: Sequence[str]) -> np.ndarray:
+        """각 행 문장의 저장소 인덱스 (모두 저장돼 있어야 함)"""
+        return np.fromiter(
+            (self._index[text_key(normalize_text(t), self.model_name)] for t in texts), dtype=np.int64, count=len(texts)
+        )
+
+    def expand(self, texts: Sequence[str], out_path: str, chunk_rows: int = 8192) -> np.ndarray:
+        """행 순서 임베딩 .npy 를 청크 단위로 기록 (임시 파일 → 교체). (행 수, 차원) memmap 반환"""
+        ids = self.row_ids(texts)
+        stored = self.vectors()
+        tmp_path = out_path + ".tmp.npy"
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(len(ids), self.dim))
+        for start in range(0, len(ids), chunk_rows):
+            out[start:start + chunk_rows] = stored[ids[start:start + chunk_rows]]
+        out.flush()
+        del out
+        os.replace(tmp_path, out_path)
+        return np.load(out_path, mmap_mode="r")
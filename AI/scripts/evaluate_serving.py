@@ -0,0 +1,220 @@
+# evaluate_serving.py
+"""
+📊 서빙 경로 오프라인 평가
+- 학습 그래프가 아니라 서버와 같은 model_util.predict_coarse_fine_batch 로 leaned_train_dataset.csv 전체를 배치 평가
+- 지표
+  · coarse 정확도 (top-1), coarse top-3 적중률
+  · fine 정확도 (top-1 예측의 fineLabel == disease_name), fine top-3 적중률 (top-3 중 하나의 fineLabel 일치)
+  · coarse 가 맞은 행만의 fine 정확도
+  · coarse / fine 혼동 행렬 (--save JSON 에 포함, coarse 는 화면에도 출력)
+  · 행당 지연 (배치 처리 시간 ÷ 배치 크기, mean / p50 / p99) — --batch-size 1 이면 실제 단건 지연
+- 중간 임베딩 캐시: 사용자 증상 조합의 SBERT 벡터를 data/processed/eval_cache/ 에 저장
+  (키: CSV 내용 해시 + 인코더 이름) → 모델만 바꾼 뒤 재실행하면 SBERT 인코딩 없이 forward 만 다시 수행
+  --no-cache: 캐시 없이 SBERT 인코딩까지 요청 경로 그대로 측정
+
+※ 정답 coarse 그룹은 fine 라벨 인코더의 클래스 목록(disease_name 이 속한 그룹)으로 정한다.
+
+실행:
+  python scripts/evaluate_serving.py
+  python scripts/evaluate_serving.py --batch-size 256 --save results/eval.json
+  python scripts/evaluate_serving.py --offline --limit 2000
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from sklearn.metrics import confusion_matrix
+
+from scripts.embedding_cache import EmbeddingCache, key_to_sentence, normalize_keywords
+from scripts.model_util import (
+    COARSE_MAP,
+    SBERT_MODEL_NAME,
+    TRAIN_CSV_PATH,
+    items_from_frame,
+    load_artifacts,
+    predict_coarse_fine_batch,
+)
+
+EVAL_CACHE_DIR = f"{BASE_DIR}/data/processed/eval_cache"
+
+
+# ✅ 정답: disease_name → coarse 라벨 (fine 라벨 인코더 기준)
+def disease_to_coarse(artifacts) -> dict:
+    mapping = {}
+    for coarse_label in artifacts.coarse_encoder.classes_:
+        key = COARSE_MAP.get(coarse_label, coarse_label.lower())
+        if key in artifacts.fine_registry:
+            _, fine_encoder = artifacts.fine_registry.get(key)
+            mapping.update({disease: coarse_label for disease in fine_encoder.classes_})
+    return mapping
+
+
+# ✅ 사용자 증상 조합 SBERT 벡터 디스크 캐시
+def cache_key(csv_path: str, encoder_name: str) -> str:
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        digest.update(f.read())
+    digest.update(b"\0")
+    digest.update(encoder_name.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def load_or_encode_embeddings(items: list, encoder, encoder_name: str, csv_path: str, batch_size: int = 256):
+    """(키 목록, 벡터 행렬, 캐시 hit 여부, 인코딩 시간). 캐시가 없으면 서로 다른 조합만 인코딩해 저장"""
+    key = cache_key(csv_path, encoder_name)
+    vectors_path = os.path.join(EVAL_CACHE_DIR, f"{key}.npy")
+    keys_path = os.path.join(EVAL_CACHE_DIR, f"{key}.json")
+    keys = list(dict.fromkeys(normalize_keywords(item["symptom_keywords"]) for item in items))
+
+    if os.path.exists(vectors_path) and os.path.exists(keys_path):
+        with open(keys_path, encoding="utf-8") as f:
+            cached = [tuple(k) for k in json.load(f)]
+        if set(keys) <= set(cached):
+            return cached, np.load(vectors_path, mmap_mode="r"), True, 0.0
+
+    start = time.perf_counter()
+    vectors = np.concatenate([
+        np.asarray(encoder.encode([key_to_sentence(k) for k in keys[i:i + batch_size]]), dtype=np.float32)
+        for i in range(0, len(keys), batch_size)
+    ])
+    seconds = time.perf_counter() - start
+
+    os.makedirs(EVAL_CACHE_DIR, exist_ok=True)
+    np.save(vectors_path, vectors)
+    with open(keys_path, "w", encoding="utf-8") as f:
+        json.dump([list(k) for k in keys], f, ensure_ascii=False)
+    return keys, vectors, False, seconds
+
+
+def top3_arrays(results: list):
+    """결과 dict 리스트 → (N, 3) coarse 라벨 / fine 라벨 배열"""
+    coarse = np.array([[p["coarseLabel"] for p in r["predictions"]] + [""] * (3 - len(r["predictions"])) for r in results])
+    fine = np.array([[p["fineLabel"] or "" for p in r["predictions"]] + [""] * (3 - len(r["predictions"])) for r in results])
+    return coarse, fine
+
+
+def latency_stats(per_row_ms: np.ndarray) -> dict:
+    return {
+        "mean_ms": round(float(per_row_ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(per_row_ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(per_row_ms, 99)), 4),
+    }
+
+
+def matrix_dict(truth: np.ndarray, predicted: np.ndarray, labels: list) -> dict:
+    return {"labels": labels, "matrix": confusion_matrix(truth, predicted, labels=labels).tolist()}
+
+
+def print_matrix(title: str, cm: dict) -> None:
+    labels = cm["labels"]
+    width = max(6, *(len(l) * 2 for l in labels))
+    print(f"\n{title} (행: 정답, 열: 예측)")
+    print(" " * width + "".join(f"{l:>{width}}" for l in labels))
+    for label, row in zip(labels, cm["matrix"]):
+        print(f"{label:>{width}}" + "".join(f"{v:>{width}}" for v in row))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=TRAIN_CSV_PATH)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--limit", type=int, default=None, help="앞에서부터 이 행 수만 평가")
+    parser.add_argument("--no-cache", action="store_true", help="임베딩 디스크 캐시 미사용 (SBERT 인코딩까지 측정)")
+    parser.add_argument("--offline", action="store_true", help="HashingEncoder + 랜덤 초기화 모델 사용 (동작 확인용)")
+    parser.add_argument("--save", default=None, help="지표 + 혼동 행렬 JSON 저장 경로")
+    args = parser.parse_args()
+
+    print("📦 아티팩트 로딩 중..." + (" (offline)" if args.offline else ""))
+    if args.offline:
+        from scripts.offline_artifacts import OFFLINE_ENCODER_NAME, build_offline_artifacts
+        artifacts, encoder_name = build_offline_artifacts(), OFFLINE_ENCODER_NAME
+    else:
+        artifacts, encoder_name = load_artifacts(), SBERT_MODEL_NAME
+
+    df = pd.read_csv(args.csv, encoding="utf-8-sig")
+    if args.limit:
+        df = df.head(args.limit)
+    mapping = disease_to_coarse(artifacts)
+    df = df[df["disease_name"].isin(mapping)].reset_index(drop=True)
+    items = items_from_frame(df)
+    truth_fine = df["disease_name"].to_numpy()
+    truth_coarse = np.array([mapping[d] for d in truth_fine])
+    print(f"📄 평가 행: {len(df):,} (모델 버전 {artifacts.version})")
+
+    # 사용자 증상 벡터: 디스크 캐시로 예측 경로의 임베딩 캐시를 전부 채워 SBERT 인코딩 생략
+    encode_seconds = None
+    if not args.no_cache:
+        keys, vectors, hit, encode_seconds = load_or_encode_embeddings(items, artifacts.sbert_model, encoder_name, args.csv)
+        artifacts.embedding_cache = EmbeddingCache(len(keys))
+        artifacts.embedding_cache.put_many(keys, vectors)
+        print(f"💾 임베딩 캐시 {'hit' if hit else f'생성 ({encode_seconds:.1f}s, 조합 {len(keys):,}개)'}")
+    else:
+        artifacts.embedding_cache = EmbeddingCache(0)
+
+    results, per_row_ms = [], []
+    started = time.perf_counter()
+    for i in range(0, len(items), args.batch_size):
+        batch = items[i:i + args.batch_size]
+        start = time.perf_counter()
+        results.extend(predict_coarse_fine_batch(batch, artifacts, observe=False))
+        per_row_ms.extend([(time.perf_counter() - start) * 1000 / len(batch)] * len(batch))
+    total_seconds = time.perf_counter() - started
+
+    coarse_top3, fine_top3 = top3_arrays(results)
+    coarse_hit = coarse_top3[:, 0] == truth_coarse
+    fine_hit = fine_top3[:, 0] == truth_fine
+    report = {
+        "meta": {
+            "csv": os.path.abspath(args.csv),
+            "rows": len(df),
+            "model_version": artifacts.version,
+            "offline": args.offline,
+            "batch_size": args.batch_size,
+            "embedding_cache": not args.no_cache,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "metrics": {
+            "coarse_accuracy": round(float(coarse_hit.mean()), 4),
+            "coarse_top3_hit_rate": round(float((coarse_top3 == truth_coarse[:, None]).any(axis=1).mean()), 4),
+            "fine_accuracy": round(float(fine_hit.mean()), 4),
+            "fine_top3_hit_rate": round(float((fine_top3 == truth_fine[:, None]).any(axis=1).mean()), 4),
+            "fine_accuracy_given_coarse": round(float(fine_hit[coarse_hit].mean()), 4) if coarse_hit.any() else 0.0,
+        },
+        "latency": {
+            "per_row": latency_stats(np.asarray(per_row_ms)),
+            "total_seconds": round(total_seconds, 3),
+            "rows_per_second": round(len(df) / total_seconds, 1),
+            "embedding_encode_seconds": encode_seconds,
+        },
+        "confusion": {
+            "coarse": matrix_dict(truth_coarse, coarse_top3[:, 0], list(artifacts.coarse_encoder.classes_)),
+            "fine": matrix_dict(truth_fine, fine_top3[:, 0], sorted(mapping)),
+        },
+    }
+
+    print("\n📊 평가 결과")
+    for name, value in report["metrics"].items():
+        print(f"   - {name:<28} {value:.4f}")
+    lat = report["latency"]["per_row"]
+    print(f"   - 행당 지연 mean={lat['mean_ms']:.3f}ms p50={lat['p50_ms']:.3f}ms p99={lat['p99_ms']:.3f}ms "
+          f"({report['latency']['rows_per_second']:,.0f}행/s)")
+    print_matrix("🧮 coarse 혼동 행렬", report["confusion"]["coarse"])
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 저장: {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# feature_cache.py
+"""
+🧱 coarse / fine 학습 공용 전처리 피처 캐시
+- CSV 를 한 번 읽어 벡터화 파싱 (chronic_diseases / medications → str.get_dummies)
+- scaler / MLB / coarse 라벨 인코더를 한 번만 학습
+- MLP 피처 행렬, coarse / 질병 라벨, 학습·검증·테스트 분할 인덱스(coarse + 그룹별 fine)를
+  data/processed/feature_cache/<키>/ 에 .npy(mmap 로드) + 전처리기 .pkl 로 저장
+- 키: CSV 내용 해시 + 전처리 버전 (CSV 나 전처리 코드가 바뀌면 새로 생성)
+
+두 학습 스크립트가 load_or_build_features() 로 바로 불러 쓰며, 직접 실행하면 캐시만 만든다.
+  python scripts/feature_cache.py
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler, MultiLabelBinarizer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = f"{BASE_DIR}/data/raw/leaned_train_dataset.csv"
+FEATURE_CACHE_DIR = f"{BASE_DIR}/data/processed/feature_cache"
+
+# 피처 구성 / 분할 방식을 바꾸면 올려서 기존 캐시를 무효화
+FEATURE_CACHE_VERSION = 1
+
+# ✅ coarse 라벨 (질병명 → coarse 그룹)
+COARSE_GROUPS = {
+    "감기": ["급성 기관지염", "급성 비인두염", "급성 인두염", "상기도 감염"],
+    "감염": ["급성 장염", "간염", "요로감염"],
+    "소화기": ["위염", "위식도역류질환(GERD)", "소화성 궤양", "췌장염", "과민성 대장증후군"],
+    "호흡기": ["폐렴", "천식", "만성 폐쇄성 폐질환(COPD)"],
+    "심혈관": ["심부전", "협심증", "빈혈"]
+}
+
+NUMERIC_COLS = ["Age", "Height_cm", "Weight_kg", "BMI"]
+PREPROCESSORS = ("scaler", "mlb_chronic", "mlb_meds", "coarse_label_encoder")
+
+# 분할 설정 (coarse: 70 / 15 / 15, fine: 그룹별 85 / 15)
+TEST_SIZE = 0.15
+VAL_SIZE = 0.1765
+FINE_VAL_SIZE = 0.15
+RANDOM_STATE = 42
+
+
+def compute_feature_key(csv_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        digest.update(f.read())
+    digest.update(f"\0v{FEATURE_CACHE_VERSION}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def multi_hot(column: pd.Series):
+    """'a,b' / '없음' 문자열 컬럼 → (멀티핫 행렬, 학습된 MultiLabelBinarizer). 클래스 순서는 MLB 와 같은 정렬 순"""
+    dummies = column.where(column != "없음").str.get_dummies(sep=",")
+    mlb = MultiLabelBinarizer(classes=list(dummies.columns))
+    mlb.fit([])
+    return dummies.to_numpy(dtype=np.int64), mlb
+
+
+class TrainingFeatures:
+    """캐시 디렉터리 하나 (배열은 mmap)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.key = os.path.basename(path)
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        def array(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.X_mlp = array("X_mlp")
+        self.rows = array("rows")  # 원본 CSV 행 번호 (SBERT 임베딩 행과 맞출 때 사용)
+        self.coarse_encoded = array("coarse_encoded")
+        self.coarse_labels = np.asarray(self.meta["coarse_classes"])[self.coarse_encoded]
+        self.disease_names = np.asarray(self.meta["disease_classes"])[array("disease_encoded")]
+        self.coarse_split = tuple(array(f"coarse_{part}_idx") for part in ("train", "val", "test"))
+        self._array = array
+        for name in PREPROCESSORS:
+            setattr(self, name, joblib.load(os.path.join(path, f"{name}.pkl")))
+
+    def group_rows(self, group: str) -> np.ndarray:
+        """coarse 그룹에 속한 행 인덱스 (피처 행렬 기준)"""
+        return np.flatnonzero(self.coarse_labels == group)
+
+    def fine_split(self, group: str):
+        """(train 인덱스, val 인덱스) — 피처 행렬 기준"""
+        i = self.meta["coarse_classes"].index(group)
+        return self._array(f"fine_{i}_train_idx"), self._array(f"fine_{i}_val_idx")
+
+
+def build_features(csv_path: str, target_dir: str) -> None:
+    df = pd.read_csv(csv_path, encoding="utf-8-sig")
+    df["coarse_label"] = df["disease_name"].map({d: g for g, ds in COARSE_GROUPS.items() for d in ds})
+    df = df[df["coarse_label"].notna()]
+    rows = df.index.to_numpy()
+    df = df.reset_index(drop=True)
+
+    scaler = StandardScaler()
+    numeric = scaler.fit_transform(df[NUMERIC_COLS])
+    # 기존 학습과 동일한 인코딩 (CSV 의 Gender 는 0/1 숫자라 이 매핑 결과는 모두 0)
+    gender = df["Gender"].map({"남성": 1, "여성": 0}).fillna(0).to_numpy().reshape(-1, 1)
+    chronic, mlb_chronic = multi_hot(df["chronic_diseases"])
+    meds, mlb_meds = multi_hot(df["medications"])
+    X_mlp = np.concatenate([numeric, gender, chronic, meds], axis=1)
+
+    coarse_label_encoder = LabelEncoder()
+    coarse_encoded = coarse_label_encoder.fit_transform(df["coarse_label"])
+    disease_encoder = LabelEncoder()
+    disease_encoded = disease_encoder.fit_transform(df["disease_name"])
+
+    # coarse 분할: (train+val) / test → train / val, 둘 다 coarse 라벨 층화
+    index = np.arange(len(df))
+    train_val_idx, test_idx = train_test_split(index, test_size=TEST_SIZE, stratify=coarse_encoded, random_state=RANDOM_STATE)
+    train_idx, val_idx = train_test_split(
+        train_val_idx, test_size=VAL_SIZE, stratify=coarse_encoded[train_val_idx], random_state=RANDOM_STATE
+    )
+    arrays = {
+        "X_mlp": X_mlp,
+        "rows": rows,
+        "coarse_encoded": coarse_encoded,
+        "disease_encoded": disease_encoded,
+        "coarse_train_idx": train_idx,
+        "coarse_val_idx": val_idx,
+        "coarse_test_idx": test_idx,
+    }
+    # fine 분할: 그룹 안에서 질병 라벨 층화
+    for i, group in enumerate(coarse_label_encoder.classes_):
+        group_idx = np.flatnonzero(coarse_encoded == i)
+        arrays[f"fine_{i}_train_idx"], arrays[f"fine_{i}_val_idx"] = train_test_split(
+            group_idx, test_size=FINE_VAL_SIZE, stratify=disease_encoded[group_idx], random_state=RANDOM_STATE
+        )
+
+    # 임시 디렉터리에 다 쓴 뒤 이름 변경 → 쓰다 만 캐시를 읽지 않음
+    tmp_dir = f"{target_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    for name, value in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), value)
+    preprocessors = {
+        "scaler": scaler,
+        "mlb_chronic": mlb_chronic,
+        "mlb_meds": mlb_meds,
+        "coarse_label_encoder": coarse_label_encoder,
+    }
+    for name, obj in preprocessors.items():
+        joblib.dump(obj, os.path.join(tmp_dir, f"{name}.pkl"))
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "csv": os.path.abspath(csv_path),
+            "version": FEATURE_CACHE_VERSION,
+            "rows": len(df),
+            "mlp_dim": int(X_mlp.shape[1]),
+            "coarse_classes": list(coarse_label_encoder.classes_),
+            "disease_classes": list(disease_encoder.classes_),
+        }, f, ensure_ascii=False, indent=2)
+    try:
+        os.rename(tmp_dir, target_dir)
+    except OSError:  # 다른 프로세스가 먼저 만든 경우
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_or_build_features(csv_path: str = CSV_PATH, cache_dir: str = FEATURE_CACHE_DIR) -> TrainingFeatures:
+    """CSV 내용 해시가 같은 캐시가 있으면 mmap 로드, 없으면 만든 뒤 로드"""
+    target_dir = os.path.join(cache_dir, compute_feature_key(csv_path))
+    if not os.path.exists(os.path.join(target_dir, "meta.json")):
+        os.makedirs(cache_dir, exist_ok=True)
+        build_features(csv_path, target_dir)
+    return TrainingFeatures(target_dir)
+
+
+if __name__ == "__main__":
+    features = load_or_build_features()
+    print(f"✅ 피처 캐시: {features.path}")
+    print(f"   - 행 {features.meta['rows']:,}, MLP 차원 {features.meta['mlp_dim']}")
+    print(f"   - coarse 분할 train/val/test = {'/'.join(str(len(s)) for s in features.coarse_split)}")
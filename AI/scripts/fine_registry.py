@@ -0,0 +1,110 @@
+# 📄 fine_registry.py
+# coarse 그룹별 fine 모델 + 라벨 인코더 레지스트리
+# - 서버 시작 시 FINE_MODEL_MAP 전체를 한 번만 로드 (요청 경로에서 디스크 I/O 제거)
+# - max_models 지정 시 LRU 방식으로 메모리 상한 유지
+# - 로드 시간 / hit / miss 통계 기록
+# - 디스크 로드는 레지스트리 락 밖에서 실행 (키별 Future): 다른 키 요청은 기다리지 않고, 같은 키 동시 요청은 로드 1회 결과를 공유
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class FineModelRegistry:
+    def __init__(
+        self,
+        model_map: Dict[str, Tuple[str, str]],
+        model_dir: str,
+        model_loader: Callable[[str], Any],
+        encoder_loader: Callable[[str], Any],
+        max_models: Optional[int] = None,
+        preload: bool = True,
+    ):
+        self.model_map = model_map
+        self.model_dir = model_dir
+        self.model_loader = model_loader
+        self.encoder_loader = encoder_loader
+        self.max_models = max_models
+
+        self._entries: "OrderedDict[str, Tuple[Any, Any]]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}  # 로드 중인 키 → 결과 Future
+        self._lock = threading.Lock()  # _entries / _loading / 카운터만 보호 (로드 중에는 잡지 않음)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds: Dict[str, float] = {}
+
+        if preload:
+            keys = list(model_map.keys())
+            if max_models is not None:
+                keys = keys[:max_models]
+            for key in keys:
+                self._entries[key] = self.load_entry(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.model_map
+
+    def load_entry(self, key: str) -> Tuple[Any, Any]:
+        """디스크에서 (fine 모델, 라벨 인코더) 로드 (레지스트리에는 넣지 않음)"""
+        model_file, encoder_file = self.model_map[key]
+        start = time.perf_counter()
+        model = self.model_loader(os.path.join(self.model_dir, model_file))
+        encoder = self.encoder_loader(os.path.join(self.model_dir, encoder_file))
+        self.load_seconds[key] = round(time.perf_counter() - start, 4)
+        return model, encoder
+
+    def get(self, key: str) -> Tuple[Any, Any]:
+        """(fine 모델, 라벨 인코더) 반환. 메모리에 없으면 로드 후 LRU 갱신"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+
+            self.misses += 1
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = self._loading[key] = Future()
+
+        if not owner:
+            return future.result()  # 다른 스레드가 로드 중 → 그 결과 (실패면 같은 예외)
+
+        try:
+            entry = self.load_entry(key)
+        except BaseException as exc:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._put(key, entry)
+            del self._loading[key]
+        future.set_result(entry)
+        return entry
+
+    def put(self, key: str, entry: Tuple[Any, Any]) -> None:
+        """외부(병렬 로더 등)에서 load_entry 로 로드한 항목 등록"""
+        with self._lock:
+            self._put(key, entry)
+
+    def _put(self, key: str, entry: Tuple[Any, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if self.max_models is not None:
+            while len(self._entries) > self.max_models:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "loaded": list(self._entries.keys()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "load_seconds": dict(self.load_seconds),
+        }
@@ -0,0 +1,289 @@
+# load_test.py
+"""
+🚦 AI 서버(/predict) · 증상 추출 서버(/extract) 부하 테스트
+- 요청 생성
+  · /predict : symptom_map.json 질병별 증상 조합 일부 + leaned_train_dataset.csv 행의 인구통계(나이/성별/키/체중/BMI/지병/복용약)
+  · /extract : extract/utils/symptom_mapping.py 의 한글 표현을 이어 붙인 문장 (시간 표현 포함)
+- 실행 방식
+  · --url 지정 시 실행 중인 서버(localhost 등)로 HTTP 요청, 없으면 같은 프로세스에서 ASGI 앱 직접 호출
+  · --concurrency N : N개 작업자가 응답을 받는 즉시 다음 요청 (closed loop)
+  · --rate R        : 응답과 무관하게 초당 R건 도착 (open loop, 지연은 예정 도착 시각부터 측정)
+  · --sweep 1,4,16  : 동시성 단계별 측정 → 오류율 1% 미만인 최대 처리량(포화 처리량) 보고
+- 보고: 처리량(건/초), 오류율, 상태 코드 분포, p50 / p90 / p99 / max 지연
+  · 지연 백분위는 성공(2xx) 응답만으로 계산 (빠르게 거절된 오류 응답이 지연을 낮춰 보이게 하지 않도록)
+  · open loop 에서 --max-in-flight 초과로 보내지 못한 요청은 지연/오류율에 넣지 않고 dropped / drop_rate 로만 보고
+
+실행 (AI/ 에서):
+  python scripts/load_test.py --target predict --offline --concurrency 16 --duration 20
+  python scripts/load_test.py --target predict --url http://localhost:8000 --rate 50
+  python scripts/load_test.py --target extract --url http://localhost:8002 --sweep 1,2,4,8,16,32
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import importlib.util
+from collections import Counter
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXTRACT_DIR = os.path.join(os.path.dirname(BASE_DIR), "extract")
+SYMPTOM_MAP_PATH = f"{BASE_DIR}/data/processed/symptom_map.json"
+TRAIN_CSV_PATH = f"{BASE_DIR}/data/raw/leaned_train_dataset.csv"
+
+TIME_PREFIXES = ["", "", "", "아침에 ", "오전에 ", "점심 먹고 ", "오후에 ", "저녁에 ", "밤에 ", "어제부터 ", "며칠 전부터 "]
+ENDINGS = ["", "요", " 것 같아요", " 증상이 있어요", " 너무 힘들어요"]
+
+
+def split_list(value) -> list:
+    return [v.strip() for v in value.split(",")] if isinstance(value, str) and value != "없음" else []
+
+
+# ✅ /predict 요청 생성기
+class PredictPayloads:
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        with open(SYMPTOM_MAP_PATH, encoding="utf-8") as f:
+            self.symptom_map = {d: s for d, s in json.load(f).items() if s}
+        self.all_symptoms = sorted({s for symptoms in self.symptom_map.values() for s in symptoms})
+        self.diseases = list(self.symptom_map)
+
+        df = pd.read_csv(TRAIN_CSV_PATH, encoding="utf-8-sig")
+        self.rows = df[["Age", "Gender", "Height_cm", "Weight_kg", "BMI", "chronic_diseases", "medications"]].to_dict("records")
+
+    def __call__(self) -> dict:
+        symptoms = self.symptom_map[self.rng.choice(self.diseases)]
+        keywords = self.rng.sample(symptoms, self.rng.randint(min(2, len(symptoms)), len(symptoms)))
+        if self.rng.random() < 0.2:  # 다른 질병의 증상 하나가 섞인 입력
+            keywords.append(self.rng.choice(self.all_symptoms))
+
+        row = self.rng.choice(self.rows)  # 인구통계는 한 행에서 함께 뽑아 상관관계 유지
+        return {
+            "gender": "남성" if int(row["Gender"]) == 0 else "여성",
+            "age": int(row["Age"]),
+            "height": float(row["Height_cm"]),
+            "weight": float(row["Weight_kg"]),
+            "bmi": round(float(row["BMI"]), 2),
+            "chronicDiseases": split_list(row["chronic_diseases"]),
+            "medications": split_list(row["medications"]),
+            "symptomKeywords": keywords,
+        }
+
+
+# ✅ /extract 요청 생성기
+class ExtractPayloads:
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        spec = importlib.util.spec_from_file_location("symptom_mapping", os.path.join(EXTRACT_DIR, "utils", "symptom_mapping.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        self.phrases = [mapping["ko"] for mapping in module.SYMPTOM_MAPPING.values() if mapping.get("ko")]
+
+    def __call__(self) -> dict:
+        picked = [self.rng.choice(phrases) for phrases in self.rng.sample(self.phrases, self.rng.randint(1, 3))]
+        # 이미 문장으로 끝나는 표현(~요)에는 어미를 붙이지 않음
+        ending = "" if picked[-1].endswith(("요", "다")) else self.rng.choice(ENDINGS)
+        sentence = self.rng.choice(TIME_PREFIXES) + ", ".join(picked) + ending
+        return {"text": sentence}
+
+
+TARGETS = {
+    "predict": ("/predict", PredictPayloads),
+    "extract": ("/extract", ExtractPayloads),
+}
+
+
+# ✅ 같은 프로세스에서 띄운 ASGI 앱
+def in_process_app(target: str, offline: bool, seed: int):
+    os.environ.setdefault("LOG_LEVEL", "WARNING")  # 요청별 INFO 로그가 측정에 섞이지 않도록
+    if target == "predict":
+        sys.path.insert(0, BASE_DIR)
+        from scripts import model_util
+        if offline:
+            from scripts.offline_artifacts import build_offline_artifacts
+            model_util.install_artifacts(build_offline_artifacts(seed=seed))
+        else:
+            model_util.init_artifacts()
+        import ai_server
+        return ai_server.app
+
+    sys.path.insert(0, EXTRACT_DIR)
+    import server
+    return server.app
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: List[float] = []  # 성공(2xx) 응답 지연만
+        self.statuses: Counter = Counter()
+        self.requests = 0
+        self.errors = 0
+        self.dropped = 0
+
+    def record(self, latency: float, status) -> None:
+        self.requests += 1
+        self.statuses[str(status)] += 1
+        if isinstance(status, int) and 200 <= status < 300:
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+
+    def record_drop(self) -> None:
+        """보내지 않은 요청 (클라이언트 측 동시 요청 상한 초과)"""
+        self.dropped += 1
+
+    def summary(self, elapsed: float) -> dict:
+        total = self.requests
+        offered = total + self.dropped
+        latencies = np.asarray(self.latencies) * 1000
+
+        def percentile(q: float):
+            return round(float(np.percentile(latencies, q)), 2) if len(latencies) else None
+
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "error_rate": round(self.errors / total, 4) if total else 0.0,
+            "dropped": self.dropped,
+            "drop_rate": round(self.dropped / offered, 4) if offered else 0.0,
+            "throughput": round((total - self.errors) / elapsed, 1) if elapsed else 0.0,  # 성공 건/초
+            "p50_ms": percentile(50),
+            "p90_ms": percentile(90),
+            "p99_ms": percentile(99),
+            "max_ms": percentile(100),
+            "statuses": dict(self.statuses),
+        }
+
+
+async def send(client: httpx.AsyncClient, path: str, payload: dict, recorder: Recorder, started: float) -> None:
+    try:
+        response = await client.post(path, json=payload)
+        status = response.status_code
+    except Exception as e:
+        status = type(e).__name__
+    recorder.record(time.perf_counter() - started, status)
+
+
+# ✅ closed loop: 작업자 N개가 응답 직후 다음 요청
+async def run_closed(client, path: str, make_payload: Callable[[], dict], concurrency: int, duration: float) -> dict:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await send(client, path, make_payload(), recorder, time.perf_counter())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return recorder.summary(time.perf_counter() - start)
+
+
+# ✅ open loop: 포아송 도착, 응답을 기다리지 않고 예정 시각에 발송
+async def run_open(client, path: str, make_payload: Callable[[], dict], rate: float, duration: float, max_in_flight: int, seed: int) -> dict:
+    recorder = Recorder()
+    rng = random.Random(seed)
+    in_flight = set()
+
+    start = time.perf_counter()
+    scheduled = start
+    while scheduled < start + duration:
+        scheduled += rng.expovariate(rate)
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        if len(in_flight) >= max_in_flight:
+            recorder.record_drop()  # 클라이언트 측 상한 초과 → 지연/오류율에서 제외, drop 으로만 집계
+            continue
+        task = asyncio.create_task(send(client, path, make_payload(), recorder, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    summary = recorder.summary(time.perf_counter() - start)
+    summary["offered_rate"] = rate
+    return summary
+
+
+def print_summary(label: str, summary: dict) -> None:
+    def ms(key: str) -> str:
+        return f"{summary[key]:>8.2f}ms" if summary[key] is not None else f"{'-':>8}ms"
+
+    dropped = f" drop={summary['dropped']}건({summary['drop_rate']:.2%})" if summary["dropped"] else ""
+    print(
+        f"{label:<18} {summary['requests']:>7}건 {summary['throughput']:>8.1f}건/s 오류율={summary['error_rate']:>6.2%} "
+        f"p50={ms('p50_ms')} p90={ms('p90_ms')} p99={ms('p99_ms')} max={ms('max_ms')}{dropped} {summary['statuses']}"
+    )
+
+
+async def main_async(args) -> dict:
+    path, payload_cls = TARGETS[args.target]
+    make_payload = payload_cls(args.seed)
+
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        print("📦 서버 앱 로딩 중 (in-process)...")
+        transport, base_url = httpx.ASGITransport(app=in_process_app(args.target, args.offline, args.seed)), "http://loadtest"
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        # 워밍업 (측정 제외)
+        for _ in range(args.warmup):
+            await client.post(path, json=make_payload())
+
+        report = {"target": args.target, "url": args.url or "in-process", "runs": []}
+        if args.rate:
+            summary = await run_open(client, path, make_payload, args.rate, args.duration, args.max_in_flight, args.seed)
+            print_summary(f"rate={args.rate:g}/s", summary)
+            report["runs"].append(summary)
+        else:
+            levels = [int(c) for c in args.sweep.split(",")] if args.sweep else [args.concurrency]
+            for concurrency in levels:
+                summary = await run_closed(client, path, make_payload, concurrency, args.duration)
+                summary["concurrency"] = concurrency
+                print_summary(f"concurrency={concurrency}", summary)
+                report["runs"].append(summary)
+
+            # 포화 처리량: 오류율이 허용치 미만인 단계 중 최대 처리량
+            healthy = [r for r in report["runs"] if r["error_rate"] < args.max_error_rate and r["p99_ms"] is not None]
+            if healthy:
+                best = max(healthy, key=lambda r: r["throughput"])
+                report["saturation"] = {"throughput": best["throughput"], "concurrency": best["concurrency"], "p99_ms": best["p99_ms"]}
+                print(f"\n📈 포화 처리량: {best['throughput']:.1f}건/s (동시성 {best['concurrency']}, p99 {best['p99_ms']:.1f}ms)")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", choices=list(TARGETS), default="predict")
+    parser.add_argument("--url", default=None, help="예: http://localhost:8000 (없으면 in-process)")
+    parser.add_argument("--offline", action="store_true", help="in-process /predict 에 오프라인 대체 아티팩트 사용")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sweep", default=None, help="동시성 단계 목록, 예: 1,2,4,8,16,32")
+    parser.add_argument("--rate", type=float, default=None, help="open loop 초당 도착 건수")
+    parser.add_argument("--max-in-flight", type=int, default=1024)
+    parser.add_argument("--duration", type=float, default=10.0, help="단계별 측정 시간(초)")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="결과 저장 경로")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# 📄 log_util.py
+# 요청 경로용 비동기 구조화 로깅
+# - JSON 한 줄 로그를 QueueHandler → 백그라운드 QueueListener 로 출력 (요청 스레드에서 stdout I/O 없음)
+# - 레벨별 샘플링: LOG_SAMPLE_RATES="DEBUG=0.01,INFO=1" (기본 전부 1)
+# - 상세 추적 로그(trace)는 요청 단위로 명시적으로 켠 경우에만 출력 (X-Debug-Trace 헤더)
+# ⚠️ 원본 파일: extract/utils/log_util.py 는 이 파일의 복사본 → 이 파일만 수정 후 extract/ 에서 python scripts/sync_log_util.py
+
+import os
+import sys
+import json
+import time
+import atexit
+import queue
+import random
+import logging
+import logging.handlers
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# 요청 단위 상세 추적 여부
+debug_trace: ContextVar[bool] = ContextVar("debug_trace", default=False)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_RESERVED = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, service: str):
+        super().__init__()
+        self.service = service
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "service": self.service,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        # logger.info(..., extra={...}) 로 넘긴 필드
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """레벨별 비율만큼만 통과. trace 로그와 WARNING 이상은 항상 통과"""
+
+    def __init__(self, rates: Dict[int, float], seed: Optional[int] = None):
+        super().__init__()
+        self.rates = rates
+        self._random = random.Random(seed)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "trace", False) or record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or self._random.random() < rate
+
+
+def parse_sample_rates(spec: str) -> Dict[int, float]:
+    """'DEBUG=0.01,INFO=0.5' → {10: 0.01, 20: 0.5}"""
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        level, _, rate = part.partition("=")
+        rates[logging.getLevelName(level.strip().upper())] = float(rate)
+    return rates
+
+
+def setup_logging(service: str, level: Optional[str] = None, sample_rates: Optional[str] = None) -> None:
+    """루트 로거에 큐 핸들러를 붙이고 백그라운드 리스너 시작 (여러 번 호출해도 한 번만 설정)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(sample_rates or os.getenv("LOG_SAMPLE_RATES", ""))))
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter(service))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """남은 로그를 모두 출력하고 리스너 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+@contextmanager
+def request_trace(enabled: bool):
+    """with request_trace(True): 블록 안에서만 trace() 로그 출력"""
+    token = debug_trace.set(enabled)
+    try:
+        yield
+    finally:
+        debug_trace.reset(token)
+
+
+def trace(logger: logging.Logger, msg: str, **fields) -> None:
+    """요청 단위 상세 추적 로그 (debug_trace 가 켜진 경우에만, 로그 레벨/샘플링과 무관하게 출력)"""
+    if not debug_trace.get():
+        return
+    record = logger.makeRecord(logger.name, logging.DEBUG, "(trace)", 0, msg, None, None, extra={**fields, "trace": True})
+    for handler in logging.getLogger().handlers:
+        if handler.filter(record):
+            handler.handle(record)
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
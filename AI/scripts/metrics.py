@@ -0,0 +1,90 @@
+# 📄 metrics.py
+# 예측 파이프라인 단계별 지연 시간 메트릭 (Prometheus 텍스트 포맷, /metrics)
+# - ai_stage_seconds{stage, group}: SBERT 인코딩 / 유사도 검색 / 피처 구성 / coarse / fine / 통합 모델(coarse+fine)
+# - ai_request_seconds{endpoint, group}: 요청 전체 처리 시간
+# - ai_model_reloads_total{trigger, result}: 모델 핫 리로드 횟수 (manual / watch, ok / failed)
+# - group: coarse 그룹 키 (cold, infection, ...). 배치에 여러 그룹이 섞이면 "mixed"
+
+import time
+from typing import Dict, Iterable
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+REGISTRY = CollectorRegistry()
+
+# 수백 µs(캐시 hit) ~ 수 초(콜드 스타트) 구간
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STAGE_SECONDS = Histogram(
+    "ai_stage_seconds",
+    "예측 파이프라인 단계별 처리 시간(초)",
+    ["stage", "group"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+REQUEST_SECONDS = Histogram(
+    "ai_request_seconds",
+    "예측 요청 전체 처리 시간(초)",
+    ["endpoint", "group"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+MODEL_RELOADS = Counter(
+    "ai_model_reloads_total",
+    "모델 아티팩트 리로드 횟수",
+    ["trigger", "result"],
+    registry=REGISTRY,
+)
+
+STAGES = ("sbert_encode", "similarity_search", "feature_build", "coarse_forward", "fine_forward", "fused_forward")
+
+
+class StageTimer:
+    """with timer.stage("sbert_encode"): ... 형태로 단계 시간을 모아 둔다"""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self._name = None
+        self._start = 0.0
+
+    def stage(self, name: str) -> "StageTimer":
+        self._name = name
+        return self
+
+    def __enter__(self) -> "StageTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.durations[self._name] = self.durations.get(self._name, 0.0) + time.perf_counter() - self._start
+
+
+def group_label(groups: Iterable[str]) -> str:
+    groups = set(groups)
+    if len(groups) == 1:
+        return next(iter(groups))
+    return "mixed" if groups else "none"
+
+
+def observe_stages(durations: Dict[str, float], group: str) -> None:
+    for stage, seconds in durations.items():
+        STAGE_SECONDS.labels(stage=stage, group=group).observe(seconds)
+
+
+def observe_fine(group: str, seconds: float) -> None:
+    STAGE_SECONDS.labels(stage="fine_forward", group=group).observe(seconds)
+
+
+def observe_request(endpoint: str, group: str, seconds: float) -> None:
+    REQUEST_SECONDS.labels(endpoint=endpoint, group=group).observe(seconds)
+
+
+def observe_reload(trigger: str, result: str) -> None:
+    MODEL_RELOADS.labels(trigger=trigger, result=result).inc()
+
+
+def render_latest():
+    """(본문 bytes, Content-Type)"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
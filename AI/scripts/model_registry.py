@@ -0,0 +1,211 @@
+# 📄 model_registry.py
+# 버전이 붙은 모델 아티팩트 레지스트리 (무중단 핫 리로드)
+# - 새 아티팩트 세트를 백그라운드에서 로드 + 워밍업한 뒤 현재 세트 참조 하나만 교체
+# - 진행 중인 요청은 시작할 때 잡은 이전 세트로 끝까지 처리 (참조가 모두 사라지면 GC)
+# - 트리거: 관리자 API(reload / reload_async) 또는 models/ 감시 스레드(start_watcher)
+# - 로드 실패 시 기존 세트로 계속 서비스하고 실패 내역만 기록
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Optional
+
+from scripts import metrics
+from scripts.startup import StartupState
+
+logger = logging.getLogger(__name__)
+
+# 지문 계산 대상 (모델 / 변환 번들 / 전처리기 / 통합 모델 매니페스트 / 번들 포인터)
+# .npz 는 .h5 에서 만드는 파생 파일 (서버가 로드 시 만들 수도 있음) → .h5 변경으로 감지
+WATCH_SUFFIXES = (".h5", ".pkl", ".json", "LATEST")
+
+
+def models_fingerprint(models_dir: str) -> str:
+    """models/ 아래 감시 대상 파일의 (경로, 크기, 수정 시각) 해시. 번들 버전 디렉터리 내부는 LATEST 로 대신한다"""
+    h = hashlib.sha1()
+    for root, dirs, files in os.walk(models_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.basename(root) != "bundle")
+        for name in sorted(files):
+            if not name.endswith(WATCH_SUFFIXES):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # 학습 스크립트가 쓰는 중 교체된 파일
+                continue
+            h.update(f"{os.path.relpath(path, models_dir)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()[:12]
+
+
+class ReloadInProgressError(RuntimeError):
+    """다른 모델 로드가 진행 중이라 리로드를 시작할 수 없음"""
+
+
+class ModelRegistry:
+    """
+    loader(previous) → 새 아티팩트 (previous: 현재 세트, 재사용할 SBERT / 캐시 등을 꺼내 쓸 수 있음)
+    warmer(artifacts) → 교체 전 워밍업
+    아티팩트 객체는 version 속성을 가진다.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Optional[Any]], Any],
+        warmer: Callable[[Any], None],
+        models_dir: str,
+        state: Optional[StartupState] = None,
+        history_size: int = 10,
+    ):
+        self.loader = loader
+        self.warmer = warmer
+        self.models_dir = models_dir
+        self.state = state or StartupState()
+
+        self._current: Optional[Any] = None
+        self._fingerprint: Optional[str] = None  # 현재 세트를 로드하기 직전의 models/ 지문
+        self._failed_fingerprint: Optional[str] = None
+        self._reload_lock = threading.Lock()  # 로드는 한 번에 하나만
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.loading = False
+        self.history: "deque[dict]" = deque(maxlen=history_size)
+
+    @property
+    def current(self) -> Optional[Any]:
+        return self._current
+
+    @property
+    def version(self) -> Optional[str]:
+        current = self._current
+        return getattr(current, "version", None) if current is not None else None
+
+    # ✅ 최초 로드 (서버 기동 시 백그라운드). 실패하면 StartupState 에 기록하고 예외 전파
+    def init(self) -> Any:
+        with self._reload_lock:
+            if self._current is not None:
+                return self._current
+            try:
+                self._load("startup")
+            except Exception as e:
+                self.state.mark_failed(e)
+                logger.error("❌ 아티팩트 로드 실패", extra={"error": self.state.error})
+                raise
+            logger.info(self.state.report(), extra={"timings": self.state.timings, "model_version": self.version})
+            return self._current
+
+    def install(self, artifacts: Any) -> Any:
+        """이미 만들어진 아티팩트를 현재 세트로 지정 (부하 테스트의 오프라인 아티팩트 등)"""
+        with self._reload_lock:
+            self._swap(artifacts, self._fingerprint)
+            self.state.mark_ready(getattr(artifacts, "timings", {}))
+            return artifacts
+
+    # ✅ 새 세트 로드 + 워밍업 → 교체. 결과 기록(dict) 반환, 실패해도 기존 세트 유지
+    def reload(self, trigger: str = "manual") -> dict:
+        if not self._reload_lock.acquire(blocking=False):
+            raise ReloadInProgressError("다른 모델 로드가 진행 중입니다")
+        try:
+            self._load(trigger)
+        except Exception:
+            pass  # 실패 내역은 history / 로그에 기록됨
+        finally:
+            self._reload_lock.release()
+        return self.history[-1]
+
+    def reload_async(self, trigger: str = "manual") -> bool:
+        """백그라운드 스레드에서 reload. 이미 로드 중이면 False"""
+        if self.loading:
+            return False
+        threading.Thread(target=self._reload_quietly, args=(trigger,), name="model-reload", daemon=True).start()
+        return True
+
+    def _reload_quietly(self, trigger: str) -> None:
+        try:
+            self.reload(trigger)
+        except ReloadInProgressError:
+            pass
+
+    def _load(self, trigger: str) -> None:
+        """_reload_lock 을 잡은 상태에서 호출"""
+        self.loading = True
+        previous = self._current
+        record = {
+            "trigger": trigger,
+            "previousVersion": getattr(previous, "version", None),
+            "startedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        start = time.perf_counter()
+        # 로드 도중 파일이 또 바뀌면 감시 스레드가 다음 지문 차이로 다시 리로드한다
+        fingerprint = models_fingerprint(self.models_dir)
+        try:
+            artifacts = self.loader(previous)
+            timings = dict(getattr(artifacts, "timings", {}))
+            warm_start = time.perf_counter()
+            self.warmer(artifacts)
+            timings["warmup"] = round(time.perf_counter() - warm_start, 4)
+
+            self._swap(artifacts, fingerprint)
+            if previous is None:
+                self.state.mark_ready(timings)
+            record.update(status="ok", version=artifacts.version, timings=timings)
+            metrics.observe_reload(trigger, "ok")
+            if previous is not None:
+                logger.info(
+                    "🔄 모델 교체 완료",
+                    extra={"model_version": artifacts.version, "previous_version": record["previousVersion"], "trigger": trigger},
+                )
+        except Exception as e:
+            self._failed_fingerprint = fingerprint  # 같은 파일로 감시 스레드가 재시도하지 않도록
+            record.update(status="failed", error=f"{type(e).__name__}: {e}")
+            metrics.observe_reload(trigger, "failed")
+            if previous is not None:
+                logger.exception("❌ 모델 리로드 실패 (기존 버전 유지)", extra={"model_version": record["previousVersion"]})
+            raise
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 3)
+            self.history.append(record)
+            self.loading = False
+
+    def _swap(self, artifacts: Any, fingerprint: Optional[str]) -> None:
+        # 참조 대입 한 번 → 이후 요청부터 새 세트, 이미 세트를 잡은 요청은 그대로
+        self._current = artifacts
+        self._fingerprint = fingerprint
+
+    # ✅ models/ 감시: 지문이 바뀌고 한 주기 동안 그대로면(학습 스크립트가 쓰기를 끝냄) 리로드
+    def start_watcher(self, interval: float) -> None:
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout)
+
+    def _watch(self, interval: float) -> None:
+        pending = None
+        while not self._stop.wait(interval):
+            if self._current is None or self.loading:
+                continue
+            fingerprint = models_fingerprint(self.models_dir)
+            if fingerprint in (self._fingerprint, self._failed_fingerprint):
+                pending = None
+            elif fingerprint != pending:
+                pending = fingerprint  # 아직 쓰는 중일 수 있으므로 다음 주기에 다시 확인
+            else:
+                pending = None
+                self._reload_quietly("watch")
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "loading": self.loading,
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+            "history": list(self.history),
+        }
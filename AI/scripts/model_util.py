@@ -2,27 +2,54 @@
 # coarse + fine 예측 모델 유틸리티 (SBERT 기반 + 다중입력)
 # - SBERT 유사도 기반 증상 임베딩
 # - 수치/카테고리형 피처 처리 후 coarse/fine 예측
+# - 무거운 아티팩트(TensorFlow, SBERT 등)는 import 시점이 아니라 load_artifacts() 에서 병렬 로드
 
 import os
-import json
+import math
+import time
+import logging
+import threading
 import joblib
 import numpy as np
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from tensorflow.keras.models import load_model
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
 
+from scripts.artifact_bundle import ArtifactBundle, load_latest_bundle
+from scripts.case_retrieval import CaseIndex, load_case_index
+from scripts.embedding_cache import EmbeddingCache
+from scripts.embedding_index import DiseaseEmbeddingIndex
+from scripts.fine_registry import FineModelRegistry
+from scripts.model_registry import ModelRegistry, models_fingerprint
+from scripts import metrics
+from scripts.numpy_engine import FUSED_NAME, export_h5, file_sha256, load_numpy_model, read_fused_manifest
+from scripts.startup import ParallelLoader, StartupState
+
+logger = logging.getLogger(__name__)
+
 # ✅ 기본 경로 설정
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
-# ✅ 모델 및 도구 불러오기
-model_coarse = load_model(f"{BASE_DIR}/models/model_coarse.h5", compile=False)
-coarse_encoder = joblib.load(f"{BASE_DIR}/models/coarse_label_encoder.pkl")
-scaler = joblib.load(f"{BASE_DIR}/models/scaler.pkl")
-mlb_chronic = joblib.load(f"{BASE_DIR}/models/mlb_chronic.pkl")
-mlb_meds = joblib.load(f"{BASE_DIR}/models/mlb_meds.pkl")
+# ✅ 추론 백엔드 선택
+# - keras (기본): .h5 를 TensorFlow 로 로드
+# - numpy: scripts/numpy_engine.py 로 변환한 .npz 번들 사용 (TensorFlow 미사용)
+#   .npz 는 .h5 에서 만드는 파생 파일 (저장소에 없음) → 없거나 .h5 보다 오래되면 로드 시 바로 변환
+INFERENCE_BACKEND = os.getenv("AI_INFERENCE_BACKEND", "keras")
+
+# Keras load_model 은 전역 레이어 이름 상태를 건드리므로 동시에 호출하지 않는다
+_keras_load_lock = threading.Lock()
+
+def load_inference_model(h5_path: str):
+    if INFERENCE_BACKEND == "numpy":
+        npz_path = os.path.splitext(h5_path)[0] + ".npz"
+        if os.path.exists(h5_path) and (
+            not os.path.exists(npz_path) or os.path.getmtime(npz_path) < os.path.getmtime(h5_path)
+        ):
+            export_h5(h5_path, npz_path)
+        return load_numpy_model(npz_path)
+    from tensorflow.keras.models import load_model
+    with _keras_load_lock:
+        return load_model(h5_path, compile=False)
 
 # ✅ fine 모델 경로 설정
 FINE_MODEL_MAP = {
@@ -42,26 +69,374 @@ COARSE_MAP = {
     "심혈관": "cardio"
 }
 
-# ✅ symptomMap 로드
-with open(f"{BASE_DIR}/data/processed/symptom_map.json", "r", encoding="utf-8") as f:
-    symptom_map: dict[str, list[str]] = json.load(f)
+# ✅ SBERT / symptomMap 경로
+SBERT_MODEL_NAME = "snunlp/KR-SBERT-V40K-klueNLI-augSTS"
+SYMPTOM_MAP_PATH = f"{BASE_DIR}/data/processed/symptom_map.json"
+DISEASE_INDEX_DIR = f"{BASE_DIR}/data/processed/disease_index"
+TRAIN_CSV_PATH = f"{BASE_DIR}/data/raw/leaned_train_dataset.csv"
+TRAIN_SBERT_PATH = f"{BASE_DIR}/data/processed/leaned_sbert_text_features_final.npy"
+
+# ✅ 사용자 키워드 임베딩 캐시 설정
+# - AI_EMBEDDING_CACHE_SIZE: 최대 항목 수
+# - AI_EMBEDDING_CACHE_WARM=1: 기동 시 학습 CSV 의 증상 조합으로 미리 채움
+EMBEDDING_CACHE_SIZE = int(os.getenv("AI_EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CACHE_WARM = os.getenv("AI_EMBEDDING_CACHE_WARM", "0") == "1"
+
+# ✅ 통합 아티팩트 번들 (models/bundle/LATEST, scripts/artifact_bundle.py)
+# - 전처리기(scaler / MLB / 라벨 인코더)는 pickle 대신 번들에서 로드
+# - 모델 가중치 mmap (기동 시 필요한 페이지만 읽음) 은 AI_INFERENCE_BACKEND=numpy 에서만 적용.
+#   keras 백엔드는 .h5 를 Keras 로 로드하므로 번들에서 얻는 것은 전처리기뿐
+# - 원본 .h5 / .pkl 변경 여부는 크기 / mtime 으로만 확인 (달라진 파일만 sha256)
+# - AI_ARTIFACT_BUNDLE=0: 번들 미사용 (.h5 / .pkl 직접 로드)
+# - AI_BUNDLE_VERIFY=1: 기동 시 배열별 sha256 확인 (arrays.bin 전체를 읽음, 기본 끔 → 배포 단계에서 `artifact_bundle.py verify`)
+USE_ARTIFACT_BUNDLE = os.getenv("AI_ARTIFACT_BUNDLE", "1") == "1"
+VERIFY_ARTIFACT_BUNDLE = os.getenv("AI_BUNDLE_VERIFY", "0") == "1"
+
+# ✅ coarse + fine 통합 모델 사용 여부 (models/model_fused.* 가 있고 원본 .h5 와 체크섬이 맞을 때만)
+USE_FUSED_MODEL = os.getenv("AI_FUSED_MODEL", "1") == "1"
+
+
+# ✅ 추론에 필요한 아티팩트 묶음
+class ModelArtifacts:
+    def __init__(
+        self,
+        model_coarse,
+        coarse_encoder,
+        scaler,
+        mlb_chronic,
+        mlb_meds,
+        fine_registry: FineModelRegistry,
+        sbert_model,
+        disease_index: DiseaseEmbeddingIndex,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        case_index: Optional[CaseIndex] = None,
+        timings: Optional[Dict[str, float]] = None,
+        fused: Optional[Tuple[object, List[str]]] = None,
+        version: str = "unversioned",
+    ):
+        self.model_coarse = model_coarse
+        self.coarse_encoder = coarse_encoder
+        self.scaler = scaler
+        self.mlb_chronic = mlb_chronic
+        self.mlb_meds = mlb_meds
+        self.fine_registry = fine_registry
+        self.sbert_model = sbert_model
+        self.disease_index = disease_index
+        self.embedding_cache = embedding_cache if embedding_cache is not None else EmbeddingCache(EMBEDDING_CACHE_SIZE)
+        self.case_index = case_index  # 학습 임베딩 파일이 없으면 None
+        self.timings = timings or {}
+        # 통합 모델 (출력 순서 = fused_heads: "coarse" + fine 키들). 없으면 coarse → fine 순차 실행
+        self.fused_model, self.fused_heads = fused if fused else (None, [])
+        # 응답에 실어 보내는 모델 버전 (번들 버전 또는 models/ 파일 지문)
+        self.version = version
+
+
+def load_sbert_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(SBERT_MODEL_NAME)
+
+
+def load_bundle() -> Optional[ArtifactBundle]:
+    """최신 번들. 사용 안 함 / 없음 / 번들 이후 models/ 원본이 바뀐 경우 None (원본 파일 사용)"""
+    if not USE_ARTIFACT_BUNDLE:
+        return None
+    bundle = load_latest_bundle(f"{BASE_DIR}/models/bundle", verify=VERIFY_ARTIFACT_BUNDLE)
+    if bundle is not None and not bundle.matches_sources(f"{BASE_DIR}/models"):
+        logger.warning("⚠️ 번들 생성 이후 models/ 원본이 바뀌어 번들을 사용하지 않습니다", extra={"bundle": bundle.version})
+        return None
+    return bundle
+
+
+def load_model_file(rel_path: str, bundle: Optional[ArtifactBundle] = None):
+    """models/ 기준 상대 경로의 모델. NumPy 백엔드 + 번들이면 mmap 가중치로 바로 구성"""
+    if bundle is not None and INFERENCE_BACKEND == "numpy" and rel_path in bundle:
+        return bundle.model(rel_path)
+    return load_inference_model(f"{BASE_DIR}/models/{rel_path}")
+
+
+def load_preprocessor(rel_path: str, bundle: Optional[ArtifactBundle] = None):
+    """models/ 기준 상대 경로의 scaler / MLB / 라벨 인코더 (번들에 있으면 pickle 대신 번들)"""
+    if bundle is not None and rel_path in bundle:
+        return bundle.preprocessor(rel_path)
+    return joblib.load(f"{BASE_DIR}/models/{rel_path}")
+
+
+def load_fused_model(bundle: Optional[ArtifactBundle] = None) -> Optional[Tuple[object, List[str]]]:
+    """
+    (통합 모델, 헤드 순서). 사용 안 함 / 파일 없음 / 원본 모델과 불일치 / 로드 실패면 None → coarse → fine 순차 실행
+    - 번들 밖에서는 백엔드별 파일(model_fused.npz / .h5)을 그대로 로드, model_fused.json 의 체크섬으로만 확인
+      (.npz 와 .h5 는 같은 export 에서 연달아 쓰므로 mtime 비교로 다시 변환하지 않음 → 통합 .h5 는 NumPy 변환 대상이 아님)
+    """
+    if not USE_FUSED_MODEL:
+        return None
+    fused_key = f"{FUSED_NAME}.h5"
+    try:
+        if bundle is not None and INFERENCE_BACKEND == "numpy" and fused_key in bundle:
+            model = bundle.model(fused_key)  # 번들 안의 통합 모델은 같은 번들의 원본 그래프로 만든 것
+            return model, model.heads
+
+        models_dir = f"{BASE_DIR}/models"
+        manifest = read_fused_manifest(models_dir)
+        file_name = f"{FUSED_NAME}.npz" if INFERENCE_BACKEND == "numpy" else fused_key
+        path = os.path.join(models_dir, file_name)
+        if manifest is None or not os.path.exists(path):
+            return None
+        expected = manifest.get("outputs", {}).get(file_name)
+        if expected is not None and file_sha256(path) != expected:
+            logger.warning("⚠️ 통합 모델 파일이 매니페스트 체크섬과 달라 사용하지 않습니다", extra={"path": file_name})
+            return None
+
+        if INFERENCE_BACKEND == "numpy":
+            model = load_numpy_model(path)
+            if model.heads != manifest["heads"]:
+                logger.warning("⚠️ 통합 모델 헤드가 매니페스트와 달라 사용하지 않습니다", extra={"heads": model.heads})
+                return None
+            return model, manifest["heads"]
+        return load_inference_model(path), manifest["heads"]
+    except Exception:
+        logger.exception("⚠️ 통합 모델 로드 실패 → coarse / fine 순차 실행")
+        return None
+
+
+def import_heavy_modules() -> None:
+    """
+    무거운 라이브러리를 한 스레드에서 먼저 import 한다.
+    (여러 로더 스레드가 같은 패키지를 동시에 import 하면 모듈 락 교착이 생길 수 있음)
+    """
+    import sklearn.preprocessing  # noqa: F401  (pickle 로더가 사용)
+    import sentence_transformers  # noqa: F401
+    if INFERENCE_BACKEND != "numpy":
+        import tensorflow.keras.models  # noqa: F401
+
+
+def load_artifacts(previous: Optional[ModelArtifacts] = None) -> ModelArtifacts:
+    """
+    독립적인 아티팩트를 동시에 로드하고 아티팩트별 로드 시간을 기록한다.
+    previous(핫 리로드 시 현재 세트)가 있으면 재학습과 무관한 SBERT 모델 / 임베딩 캐시는 그대로 재사용
+    """
+    # 번들은 mmap + 매니페스트 / 원본 stat 확인뿐이라 먼저 동기로 연다
+    start = time.perf_counter()
+    bundle = load_bundle()
+    bundle_seconds = round(time.perf_counter() - start, 4)
+    models_dir = f"{BASE_DIR}/models"
+    version = bundle.version if bundle is not None else f"files-{models_fingerprint(models_dir)}"
+
+    # fine 모델 레지스트리 (FINE_MODEL_CACHE_SIZE 지정 시 LRU 상한)
+    fine_cache_size = os.getenv("FINE_MODEL_CACHE_SIZE")
+    fine_registry = FineModelRegistry(
+        FINE_MODEL_MAP,
+        model_dir=f"{BASE_DIR}/models/fine",
+        model_loader=lambda path: load_model_file(os.path.relpath(path, models_dir), bundle),
+        encoder_loader=lambda path: load_preprocessor(os.path.relpath(path, models_dir), bundle),
+        max_models=int(fine_cache_size) if fine_cache_size else None,
+        preload=False,
+    )
+    fine_keys = list(FINE_MODEL_MAP.keys())[:fine_registry.max_models]
+
+    loader = ParallelLoader()
+    loader.add("imports", import_heavy_modules)
+    imports = ["imports"]
+    if previous is not None:
+        loader.add("sbert_model", lambda: previous.sbert_model)
+    else:
+        loader.add("sbert_model", load_sbert_model, after=imports)
+    loader.add("model_coarse", lambda: load_model_file("model_coarse.h5", bundle), after=imports)
+    loader.add("model_fused", lambda: load_fused_model(bundle), after=imports)
+    loader.add("coarse_encoder", lambda: load_preprocessor("coarse_label_encoder.pkl", bundle), after=imports)
+    loader.add("scaler", lambda: load_preprocessor("scaler.pkl", bundle), after=imports)
+    loader.add("mlb_chronic", lambda: load_preprocessor("mlb_chronic.pkl", bundle), after=imports)
+    loader.add("mlb_meds", lambda: load_preprocessor("mlb_meds.pkl", bundle), after=imports)
+    for key in fine_keys:
+        loader.add(f"fine:{key}", lambda key=key: fine_registry.load_entry(key), after=imports)
+    # symptomMap 질병 문장 임베딩 인덱스 (symptom_map.json 해시 + 모델명 기준 캐시)
+    loader.add(
+        "disease_index",
+        lambda sbert_model: DiseaseEmbeddingIndex.load_or_build(
+            SYMPTOM_MAP_PATH, SBERT_MODEL_NAME, sbert_model, cache_dir=DISEASE_INDEX_DIR
+        ),
+        depends_on=["sbert_model"],
+    )
+
+    def build_embedding_cache(sbert_model) -> EmbeddingCache:
+        cache = EmbeddingCache(EMBEDDING_CACHE_SIZE)
+        if EMBEDDING_CACHE_WARM:
+            cache.warm_from_csv(TRAIN_CSV_PATH, sbert_model)
+        return cache
+
+    if previous is not None:
+        loader.add("embedding_cache", lambda: previous.embedding_cache)  # warm 상태 유지
+    else:
+        loader.add("embedding_cache", build_embedding_cache, depends_on=["sbert_model"])
+    # 학습 데이터 임베딩 기반 유사 사례 검색 인덱스 (선택)
+    loader.add("case_index", lambda: load_case_index(TRAIN_SBERT_PATH, TRAIN_CSV_PATH), after=imports)
+
+    loaded, timings = loader.run()
+    timings["bundle"] = bundle_seconds
+    for key in fine_keys:
+        fine_registry.put(key, loaded[f"fine:{key}"])
+
+    return ModelArtifacts(
+        model_coarse=loaded["model_coarse"],
+        coarse_encoder=loaded["coarse_encoder"],
+        scaler=loaded["scaler"],
+        mlb_chronic=loaded["mlb_chronic"],
+        mlb_meds=loaded["mlb_meds"],
+        fine_registry=fine_registry,
+        sbert_model=loaded["sbert_model"],
+        disease_index=loaded["disease_index"],
+        embedding_cache=loaded["embedding_cache"],
+        case_index=loaded["case_index"],
+        timings=timings,
+        fused=loaded["model_fused"],
+        version=version,
+    )
+
+
+# ✅ 워밍업: 그래프 트레이싱 / 토크나이저 초기화를 첫 실제 요청 전에 끝낸다
+WARMUP_ITEM = {
+    "symptom_keywords": ["기침", "가래", "미열"],
+    "age": 40,
+    "gender": 0,
+    "height": 170.0,
+    "weight": 65.0,
+    "bmi": 22.5,
+    "diseases": [],
+    "medications": [],
+}
+
+def warmup(artifacts: ModelArtifacts) -> None:
+    predict_coarse_fine_batch([WARMUP_ITEM], artifacts, observe=False)
+
+    # top-3 에 들지 않은 fine 모델까지 모두 한 번씩 실행
+    mlp_inputs = build_mlp_inputs([WARMUP_ITEM], artifacts)
+    sbert_vectors = get_best_matching_vectors([WARMUP_ITEM["symptom_keywords"]], artifacts)
+    for key in list(artifacts.fine_registry.stats()["loaded"]):
+        fine_model, _ = artifacts.fine_registry.get(key)
+        fine_model.predict([mlp_inputs, sbert_vectors], verbose=0)
+
+
+# ✅ 프로세스 전역 아티팩트 (최초 사용 시 또는 init_artifacts() 에서 로드, reload_artifacts() 로 무중단 교체)
+startup_state = StartupState()
+model_registry = ModelRegistry(load_artifacts, warmup, f"{BASE_DIR}/models", startup_state)
 
-# ✅ SBERT 모델 로드
-sbert_model = SentenceTransformer("snunlp/KR-SBERT-V40K-klueNLI-augSTS")
+def init_artifacts() -> ModelArtifacts:
+    """아티팩트 병렬 로드 → 워밍업 → ready 표시. 서버 기동 시 백그라운드에서 호출"""
+    return model_registry.init()
+
+def install_artifacts(artifacts: ModelArtifacts) -> ModelArtifacts:
+    """이미 만들어진 아티팩트를 프로세스 전역으로 지정 (부하 테스트의 오프라인 아티팩트 등)"""
+    return model_registry.install(artifacts)
+
+def reload_artifacts(trigger: str = "manual") -> dict:
+    """새 아티팩트 세트를 로드 + 워밍업한 뒤 교체 (진행 중인 요청은 이전 세트로 끝남). 리로드 기록 반환"""
+    return model_registry.reload(trigger)
+
+def get_artifacts() -> ModelArtifacts:
+    artifacts = model_registry.current
+    if artifacts is not None:
+        return artifacts
+    return init_artifacts()
 
 # ✅ 유사도 기반 증상 벡터 추출 함수
-def get_best_matching_vector(user_keywords: List[str]) -> np.ndarray:
-    user_sentence = " ".join(user_keywords)
-    user_vec = sbert_model.encode([user_sentence])
+def get_best_matching_vector(user_keywords: List[str], artifacts: Optional[ModelArtifacts] = None) -> np.ndarray:
+    return get_best_matching_vectors([user_keywords], artifacts)[0]  # ✅ SBERT 벡터 반환
+
+# ✅ 여러 사용자 입력을 한 번에 인코딩 → (N, 임베딩 차원) 행렬
+def get_best_matching_vectors(keyword_lists: List[List[str]], artifacts: Optional[ModelArtifacts] = None) -> np.ndarray:
+    artifacts = artifacts or get_artifacts()
+    # 키워드 조합(입력 순서 유지) 기준 LRU 캐시 → 처음 보는 조합만 SBERT 인코딩
+    user_vecs = artifacts.embedding_cache.encode(keyword_lists, artifacts.sbert_model)
+
+    # 질병 문장 임베딩은 인덱스에서 재사용 → 사용자 문장만 인코딩
+    return artifacts.disease_index.best_vectors(user_vecs)
+
+# ✅ leaned_train_dataset.csv 형식 DataFrame → predict_coarse_fine_batch 입력 dict 리스트
+# - 쉼표 구분 문자열 컬럼은 리스트로, "없음" / 빈 값은 빈 리스트로
+# - Gender 는 0/1 또는 "남성"/"여성"
+# - 값이 없거나(NaN) 잘못된 행은 validate_frame 이 사유와 함께 따로 돌려줌 (한 행 때문에 전체가 실패하지 않음)
+def split_csv_list(value) -> List[str]:
+    if not isinstance(value, str) or value.strip() in ("", "없음"):
+        return []
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+GENDER_CODES = {"남성": 0, "여성": 1, 0: 0, 1: 1, "0": 0, "1": 1}
 
-    disease_labels = list(symptom_map.keys())
-    symptom_sentences = [" ".join(symptom_map[d]) for d in disease_labels]
-    symptom_vecs = sbert_model.encode(symptom_sentences)
+def _finite_number(value, column: str, positive: bool) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{column} 값이 숫자가 아님: {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"{column} 값 없음")
+    if number < 0 or (positive and number == 0):
+        raise ValueError(f"{column} 값 범위 오류: {value!r}")
+    return number
 
-    scores = cosine_similarity(user_vec, symptom_vecs)[0]
-    best_index = int(np.argmax(scores))
+def item_from_row(keywords, age, gender, height, weight, bmi, chronic, meds) -> dict:
+    """행 하나 → 예측 입력 dict. 필수 값이 없거나 잘못되면 ValueError (사유 메시지)"""
+    symptom_keywords = split_csv_list(keywords)
+    if not symptom_keywords:
+        raise ValueError("symptom_keywords 값 없음")
+    age = _finite_number(age, "Age", positive=False)
+    if not age.is_integer():
+        raise ValueError(f"Age 값이 정수가 아님: {age!r}")
+    if isinstance(gender, str):
+        gender = gender.strip()
+    elif isinstance(gender, float) and math.isnan(gender):
+        raise ValueError("Gender 값 없음")
+    if gender not in GENDER_CODES:
+        raise ValueError(f"Gender 값 오류: {gender!r}")
+    return {
+        "symptom_keywords": symptom_keywords,
+        "age": int(age),
+        "gender": GENDER_CODES[gender],
+        "height": _finite_number(height, "Height_cm", positive=True),
+        "weight": _finite_number(weight, "Weight_kg", positive=True),
+        "bmi": _finite_number(bmi, "BMI", positive=True),
+        "diseases": split_csv_list(chronic),
+        "medications": split_csv_list(meds),
+    }
 
-    return symptom_vecs[best_index]  # ✅ SBERT 벡터 반환
+def validate_frame(df: pd.DataFrame) -> Tuple[List[dict], List[int], List[Tuple[int, str]]]:
+    """
+    행 단위 검증 → (정상 행 입력 dict, 정상 행 위치, [(거부된 행 위치, 사유)])
+    - 위치는 df 안의 0부터 시작하는 순서 (index 값 아님)
+    """
+    items, positions, rejected = [], [], []
+    rows = zip(
+        df["symptom_keywords"], df["Age"], df["Gender"], df["Height_cm"],
+        df["Weight_kg"], df["BMI"], df["chronic_diseases"], df["medications"],
+    )
+    for position, row in enumerate(rows):
+        try:
+            items.append(item_from_row(*row))
+            positions.append(position)
+        except ValueError as exc:
+            rejected.append((position, str(exc)))
+    return items, positions, rejected
+
+def items_from_frame(df: pd.DataFrame) -> List[dict]:
+    """모든 행이 정상이어야 하는 경우 (학습 데이터 평가 / 벤치마크). 잘못된 행이 있으면 ValueError"""
+    items, _, rejected = validate_frame(df)
+    if rejected:
+        position, reason = rejected[0]
+        raise ValueError(f"잘못된 입력 행 {len(rejected)}개 (첫 번째: {position}행, {reason})")
+    return items
+
+# ✅ MLP 입력 행렬 구성 (scaler는 4개 피처로 학습됨)
+def build_mlp_inputs(items: List[dict], artifacts: Optional[ModelArtifacts] = None) -> np.ndarray:
+    artifacts = artifacts or get_artifacts()
+    numeric_input = pd.DataFrame(
+        [[item["age"], item["height"], item["weight"], item["bmi"]] for item in items],
+        columns=["Age", "Height_cm", "Weight_kg", "BMI"]
+    )
+    scaled_numeric = artifacts.scaler.transform(numeric_input)
+
+    gender_vec = np.array([[item["gender"]] for item in items])
+    chronic_vec = artifacts.mlb_chronic.transform([item["diseases"] for item in items])
+    meds_vec = artifacts.mlb_meds.transform([item["medications"] for item in items])
+
+    return np.hstack([scaled_numeric, gender_vec, chronic_vec, meds_vec])
 
 # ✅ 예측 함수 (coarse → fine)
 def predict_coarse_fine(
@@ -74,47 +449,108 @@ def predict_coarse_fine(
     diseases: List[str],
     medications: List[str]
 ) -> dict:
+    item = {
+        "symptom_keywords": symptom_keywords,
+        "age": age,
+        "gender": gender,
+        "height": height,
+        "weight": weight,
+        "bmi": bmi,
+        "diseases": diseases,
+        "medications": medications,
+    }
+    # 단건 예측도 배치 경로를 그대로 사용 → 단건/배치 결과 일치 보장
+    return predict_coarse_fine_batch([item])[0]
+
+# ✅ 배치 예측 함수 (coarse 1회 + coarse 그룹별 fine 1회)
+# items: predict_coarse_fine 인자와 같은 키를 가진 dict 리스트
+def predict_coarse_fine_batch(
+    items: List[dict],
+    artifacts: Optional[ModelArtifacts] = None,
+    observe: bool = True,  # False: 메트릭 기록 생략 (워밍업 등)
+) -> List[dict]:
+    if not items:
+        return []
+
+    # 요청 시작 시점의 아티팩트로 끝까지 처리
+    artifacts = artifacts or get_artifacts()
+    coarse_encoder = artifacts.coarse_encoder
+    fine_registry = artifacts.fine_registry
+
+    timer = metrics.StageTimer()
+
+    # 1. SBERT 증상 벡터 (N, 임베딩 차원)
+    with timer.stage("sbert_encode"):
+        user_vecs = artifacts.embedding_cache.encode([item["symptom_keywords"] for item in items], artifacts.sbert_model)
+    with timer.stage("similarity_search"):
+        sbert_vectors = artifacts.disease_index.best_vectors(user_vecs)
+
+    # 2. MLP 입력 행렬 (N, MLP 차원)
+    with timer.stage("feature_build"):
+        mlp_inputs = build_mlp_inputs(items, artifacts)
+
+    # 3. coarse 예측 (행별 Top-3 추출)
+    # 통합 모델이 있으면 coarse + 모든 fine 헤드를 한 번의 forward 로 계산
+    fused_probs: Dict[str, np.ndarray] = {}
+    if artifacts.fused_model is not None:
+        with timer.stage("fused_forward"):
+            outputs = artifacts.fused_model.predict([mlp_inputs, sbert_vectors], verbose=0)
+        fused_probs = dict(zip(artifacts.fused_heads, outputs))
+        coarse_probs = fused_probs["coarse"]
+    else:
+        with timer.stage("coarse_forward"):
+            coarse_probs = artifacts.model_coarse.predict([mlp_inputs, sbert_vectors], verbose=0)
+    top3_indices = np.argsort(coarse_probs, axis=1)[:, -3:][:, ::-1]
+
+    # 4. coarse 그룹별로 행을 모아 fine 모델을 그룹당 한 번만 실행
+    group_rows: Dict[str, List[int]] = {}
+    for row, indices in enumerate(top3_indices):
+        for coarse_label in coarse_encoder.inverse_transform(indices):
+            coarse_key = COARSE_MAP.get(coarse_label, coarse_label.lower())
+            if coarse_key in fine_registry:
+                group_rows.setdefault(coarse_key, []).append(row)
+
+    fine_labels: Dict[Tuple[str, int], str] = {}
+    for coarse_key, rows in group_rows.items():
+        fine_model, fine_encoder = fine_registry.get(coarse_key)
+        if coarse_key in fused_probs:
+            fine_probs = fused_probs[coarse_key][rows]
+        else:
+            start = time.perf_counter()
+            fine_probs = fine_model.predict([mlp_inputs[rows], sbert_vectors[rows]], verbose=0)
+            if observe:
+                metrics.observe_fine(coarse_key, time.perf_counter() - start)
+        labels = fine_encoder.inverse_transform(np.argmax(fine_probs, axis=1))
+        for row, label in zip(rows, labels):
+            fine_labels[(coarse_key, row)] = label
+
+    # 5. 행별 응답 구성
+    results = []
+    for row, indices in enumerate(top3_indices):
+        predictions = []
+        for coarse_label, score in zip(coarse_encoder.inverse_transform(indices), coarse_probs[row][indices]):
+            coarse_key = COARSE_MAP.get(coarse_label, coarse_label.lower())
+            predictions.append({
+                "coarseLabel": coarse_label,
+                "fineLabel": fine_labels.get((coarse_key, row)),
+                "riskScore": float(score)
+            })
+        results.append({"predictions": predictions, "modelVersion": artifacts.version})
+
+    # 배치 단위 단계 시간은 top-1 coarse 그룹 기준으로 기록 (여러 그룹이면 mixed)
+    if observe:
+        top1_groups = [
+            COARSE_MAP.get(label, label.lower())
+            for label in coarse_encoder.inverse_transform(top3_indices[:, 0])
+        ]
+        metrics.observe_stages(timer.durations, metrics.group_label(top1_groups))
+
+    return results
 
-    # 1. SBERT 증상 벡터
-    sbert_vector = get_best_matching_vector(symptom_keywords).reshape(1, -1)
-
-    # 2. 입력 피처 분리 (scaler는 4개 피처로 학습됨)
-    numeric_input = pd.DataFrame([[age, height, weight, bmi]], columns=["Age", "Height_cm", "Weight_kg", "BMI"])
-    scaled_numeric = scaler.transform(numeric_input)
-
-    gender_vec = np.array([[gender]])
-    chronic_vec = mlb_chronic.transform([diseases])
-    meds_vec = mlb_meds.transform([medications])
-
-    # 3. 최종 MLP 입력 벡터 구성
-    mlp_input = np.hstack([scaled_numeric, gender_vec, chronic_vec, meds_vec])
-
-    # 4. coarse 예측 (Top-3 추출)
-    coarse_probs = model_coarse.predict([mlp_input, sbert_vector])[0]
-    top3_indices = np.argsort(coarse_probs)[-3:][::-1]
-    top3_labels = coarse_encoder.inverse_transform(top3_indices)
-    top3_scores = coarse_probs[top3_indices]
-
-    predictions = []
-    for i in range(3):
-        coarse_label = top3_labels[i]
-        risk_score = float(top3_scores[i])
-
-        fine_label = None
-        coarse_key = COARSE_MAP.get(coarse_label, coarse_label.lower())
-        if coarse_key in FINE_MODEL_MAP:
-            model_path, encoder_path = FINE_MODEL_MAP[coarse_key]
-            fine_model = load_model(f"{BASE_DIR}/models/fine/{model_path}", compile=False)
-            fine_encoder = joblib.load(f"{BASE_DIR}/models/fine/{encoder_path}")
-
-            fine_probs = fine_model.predict([mlp_input, sbert_vector])[0]
-            fine_idx = int(np.argmax(fine_probs))
-            fine_label = fine_encoder.inverse_transform([fine_idx])[0]
-
-        predictions.append({
-            "coarseLabel": coarse_label,
-            "fineLabel": fine_label,
-            "riskScore": risk_score
-        })
-
-    return {"predictions": predictions}
+# ✅ 유사 사례 Top-k 검색 (학습 데이터 임베딩 기준)
+def retrieve_similar_cases(symptom_keywords: List[str], k: int = 5, artifacts: Optional[ModelArtifacts] = None) -> List[dict]:
+    artifacts = artifacts or get_artifacts()
+    if artifacts.case_index is None:
+        raise RuntimeError("유사 사례 인덱스가 없습니다 (leaned_sbert_text_features_final.npy 필요)")
+    query = artifacts.embedding_cache.encode([symptom_keywords], artifacts.sbert_model)[0]
+    return artifacts.case_index.search(query, k)
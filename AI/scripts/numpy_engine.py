@@ -0,0 +1,410 @@
+# 📄 numpy_engine.py
+# Keras(.h5) MLP → 순수 NumPy 추론 엔진
+# - h5py 로 모델 구조(model_config)와 가중치를 직접 읽어 가중치 번들(.npz)로 변환
+# - 변환 시 BatchNormalization 을 인접 Dense 가중치에 접어 넣음 (추론 시 BN 연산 없음)
+# - Dropout 은 추론 시 항등이므로 제거
+# - 지원 레이어: InputLayer, Dense, BatchNormalization, Dropout, Concatenate, Activation
+# - coarse + fine 5개를 입력을 공유하는 다중 출력 그래프 하나로 합친 model_fused.npz / .h5 생성
+#   (fine 헤드들의 첫 Dense 는 가중치를 가로로 이어 붙여 행렬 곱 한 번으로 계산)
+#
+# 실행: python scripts/numpy_engine.py  (models/ 아래 모든 .h5 → 같은 위치 .npz + 통합 모델)
+
+import os
+import sys
+import json
+import hashlib
+import logging
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "tanh": np.tanh,
+}
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS["softmax"] = _softmax
+
+
+# ✅ h5 → 연산 그래프 변환
+def _layer_weights(weights_group, layer_name: str) -> Dict[str, np.ndarray]:
+    group = weights_group[layer_name]
+    weights = {}
+    for weight_name in group.attrs.get("weight_names", []):
+        if isinstance(weight_name, bytes):
+            weight_name = weight_name.decode("utf-8")
+        short = weight_name.split("/")[-1].split(":")[0]  # 'dense/kernel:0' → 'kernel'
+        weights[short] = np.asarray(group[weight_name], dtype=np.float32)
+    return weights
+
+
+def read_keras_h5(h5_path: str) -> dict:
+    """Keras 함수형 모델 .h5 → {'inputs', 'outputs', 'ops', 'arrays'} (BN 폴딩 전)"""
+    import h5py
+
+    with h5py.File(h5_path, "r") as f:
+        config = json.loads(f.attrs["model_config"])["config"]
+        weights_group = f["model_weights"] if "model_weights" in f else f
+
+        inputs = [name for name, _, _ in config["input_layers"]]
+        outputs = [name for name, _, _ in config["output_layers"]]
+        alias: Dict[str, str] = {}  # Dropout 등 항등 레이어 → 입력 텐서
+        dims: Dict[str, int] = {}
+        ops: List[dict] = []
+        arrays: Dict[str, np.ndarray] = {}
+
+        for layer in config["layers"]:
+            name, cls, cfg = layer["name"], layer["class_name"], layer["config"]
+            inbound = [alias.get(node[0], node[0]) for node in layer["inbound_nodes"][0]] if layer["inbound_nodes"] else []
+
+            if cls == "InputLayer":
+                shape = cfg.get("batch_input_shape") or cfg.get("batch_shape")
+                dims[name] = int(shape[-1])
+            elif cls == "Dropout":
+                alias[name] = inbound[0]
+            elif cls == "Dense":
+                w = _layer_weights(weights_group, name)
+                arrays[f"{name}/kernel"] = w["kernel"]
+                arrays[f"{name}/bias"] = w.get("bias", np.zeros(w["kernel"].shape[1], dtype=np.float32))
+                ops.append({"op": "dense", "inputs": inbound, "output": name, "activation": cfg.get("activation", "linear")})
+                dims[name] = int(w["kernel"].shape[1])
+            elif cls == "BatchNormalization":
+                w = _layer_weights(weights_group, name)
+                gamma = w.get("gamma", np.ones_like(w["moving_mean"]))
+                beta = w.get("beta", np.zeros_like(w["moving_mean"]))
+                scale = gamma / np.sqrt(w["moving_variance"] + cfg.get("epsilon", 1e-3))
+                arrays[f"{name}/scale"] = scale.astype(np.float32)
+                arrays[f"{name}/shift"] = (beta - w["moving_mean"] * scale).astype(np.float32)
+                ops.append({"op": "affine", "inputs": inbound, "output": name})
+                dims[name] = dims[inbound[0]]
+            elif cls == "Concatenate":
+                ops.append({"op": "concat", "inputs": inbound, "output": name})
+                dims[name] = sum(dims[t] for t in inbound)
+            elif cls == "Activation":
+                ops.append({"op": "activation", "inputs": inbound, "output": name, "activation": cfg["activation"]})
+                dims[name] = dims[inbound[0]]
+            else:
+                raise ValueError(f"지원하지 않는 레이어: {cls} ({name})")
+
+        outputs = [alias.get(name, name) for name in outputs]
+
+    return {"inputs": inputs, "outputs": outputs, "ops": ops, "arrays": arrays, "dims": dims}
+
+
+# ✅ BatchNormalization 폴딩
+def fold_batch_norm(graph: dict) -> dict:
+    """
+    affine(BN) 연산을 Dense 가중치에 접어 넣는다.
+    1) 바로 앞이 linear Dense 이고 그 출력을 BN 만 쓰면 → 앞 Dense 에 병합
+    2) BN 출력을 Dense 만 소비하면 → 뒤 Dense 의 kernel 행/bias 에 병합
+    3) BN 출력이 Concatenate 로만 들어가고 그 결과를 Dense 만 소비하면 → 해당 행 구간에 병합
+    접을 수 없는 BN 은 affine 연산으로 남는다.
+    """
+    ops, arrays, dims = graph["ops"], graph["arrays"], graph["dims"]
+
+    def producer(tensor):
+        return next((op for op in ops if op["output"] == tensor), None)
+
+    def consumers(tensor):
+        return [op for op in ops if tensor in op["inputs"]]
+
+    def replace_input(op, old, new):
+        op["inputs"] = [new if t == old else t for t in op["inputs"]]
+
+    changed = True
+    while changed:
+        changed = False
+        for bn in [op for op in ops if op["op"] == "affine"]:
+            out = bn["output"]
+            if out in graph["outputs"]:
+                continue
+            scale, shift = arrays[f"{out}/scale"], arrays[f"{out}/shift"]
+            src = bn["inputs"][0]
+            prev = producer(src)
+            users = consumers(out)
+
+            if prev is not None and prev["op"] == "dense" and prev["activation"] == "linear" \
+                    and len(consumers(src)) == 1 and src not in graph["outputs"]:
+                name = prev["output"]
+                arrays[f"{name}/kernel"] = arrays[f"{name}/kernel"] * scale[None, :]
+                arrays[f"{name}/bias"] = arrays[f"{name}/bias"] * scale + shift
+                for user in users:
+                    replace_input(user, out, src)
+            elif users and all(u["op"] == "dense" for u in users):
+                for user in users:
+                    name = user["output"]
+                    kernel = arrays[f"{name}/kernel"]
+                    arrays[f"{name}/bias"] = arrays[f"{name}/bias"] + shift @ kernel
+                    arrays[f"{name}/kernel"] = kernel * scale[:, None]
+                    replace_input(user, out, src)
+            elif len(users) == 1 and users[0]["op"] == "concat" and users[0]["output"] not in graph["outputs"] \
+                    and users[0]["inputs"].count(out) == 1 \
+                    and consumers(users[0]["output"]) \
+                    and all(u["op"] == "dense" for u in consumers(users[0]["output"])):
+                concat = users[0]
+                offset = sum(dims[t] for t in concat["inputs"][:concat["inputs"].index(out)])
+                rows = slice(offset, offset + dims[out])
+                for user in consumers(concat["output"]):
+                    name = user["output"]
+                    kernel = arrays[f"{name}/kernel"].copy()
+                    arrays[f"{name}/bias"] = arrays[f"{name}/bias"] + shift @ kernel[rows]
+                    kernel[rows] = kernel[rows] * scale[:, None]
+                    arrays[f"{name}/kernel"] = kernel
+                replace_input(concat, out, src)
+            else:
+                continue
+
+            ops.remove(bn)
+            del arrays[f"{out}/scale"], arrays[f"{out}/shift"]
+            changed = True
+
+    return graph
+
+
+# ✅ 번들 저장 / 로드
+def save_bundle(graph: dict, path: str) -> None:
+    """임시 파일에 쓴 뒤 교체 (서버 워커들이 동시에 변환해도 쓰다 만 파일을 읽지 않음)"""
+    spec = {key: graph[key] for key in ("inputs", "outputs", "ops", "dims", "heads") if key in graph}
+    tmp_path = f"{os.path.splitext(path)[0]}.tmp-{os.getpid()}-{threading.get_ident()}.npz"
+    np.savez(tmp_path, __graph__=np.array(json.dumps(spec, ensure_ascii=False)), **graph["arrays"])
+    os.replace(tmp_path, path)
+
+
+def export_h5(h5_path: str, out_path: str = None) -> str:
+    """Keras .h5 → BN 폴딩된 NumPy 가중치 번들(.npz)"""
+    out_path = out_path or os.path.splitext(h5_path)[0] + ".npz"
+    save_bundle(fold_batch_norm(read_keras_h5(h5_path)), out_path)
+    return out_path
+
+
+# ✅ coarse + fine 통합 (다중 출력) 그래프
+FUSED_NAME = "model_fused"
+
+
+def _merge_input_dense(graph: dict, heads: List[str]) -> dict:
+    """
+    heads 에 속한 Dense 중 같은 그래프 입력 / 활성화를 쓰는 것들을 하나의 넓은 Dense + split 으로 합친다.
+    (열 단위로 독립인 연산이라 결과는 따로 계산한 것과 같다)
+    """
+    ops, arrays = graph["ops"], graph["arrays"]
+    groups: Dict[tuple, List[dict]] = {}
+    for op in ops:
+        if op["op"] == "dense" and op["inputs"][0] in graph["inputs"] and op["output"].split("/")[0] in heads:
+            groups.setdefault((op["inputs"][0], op["activation"]), []).append(op)
+
+    merged_ops = []
+    for (source, activation), members in groups.items():
+        if len(members) < 2:
+            continue
+        name = f"fused/{source}/{activation}"
+        arrays[f"{name}/kernel"] = np.concatenate([arrays.pop(f"{op['output']}/kernel") for op in members], axis=1)
+        arrays[f"{name}/bias"] = np.concatenate([arrays.pop(f"{op['output']}/bias") for op in members])
+        graph["dims"][name] = int(arrays[f"{name}/bias"].shape[0])
+        merged_ops.append({"op": "dense", "inputs": [source], "output": name, "activation": activation})
+        merged_ops.append({
+            "op": "split",
+            "inputs": [name],
+            "outputs": [op["output"] for op in members],
+            "sizes": [graph["dims"][op["output"]] for op in members],
+        })
+        for op in members:
+            ops.remove(op)
+
+    graph["ops"] = merged_ops + ops
+    return graph
+
+
+def fuse_graphs(graphs: Dict[str, dict], merge_heads: Optional[List[str]] = None) -> dict:
+    """
+    입력이 같은 여러 그래프 → 출력이 헤드 순서대로 나오는 그래프 하나
+    graphs: {헤드 이름: BN 폴딩된 그래프}. 입력은 위치 기준으로 공유 (첫 그래프의 입력 이름 사용)
+    """
+    first = next(iter(graphs.values()))
+    inputs = list(first["inputs"])
+    fused = {"inputs": inputs, "outputs": [], "ops": [], "arrays": {}, "dims": {name: first["dims"][name] for name in inputs}, "heads": []}
+
+    for head, graph in graphs.items():
+        if [graph["dims"][name] for name in graph["inputs"]] != [fused["dims"][name] for name in inputs]:
+            raise ValueError(f"입력 차원이 다른 모델은 합칠 수 없습니다: {head}")
+        rename = dict(zip(graph["inputs"], inputs))
+
+        def tensor(name, head=head, rename=rename):
+            return rename.get(name, f"{head}/{name}")
+
+        for op in graph["ops"]:
+            fused["ops"].append(dict(op, inputs=[tensor(t) for t in op["inputs"]], output=tensor(op["output"])))
+        for key, value in graph["arrays"].items():
+            fused["arrays"][f"{head}/{key}"] = value
+        for name, dim in graph["dims"].items():
+            if name not in rename:
+                fused["dims"][tensor(name)] = dim
+        fused["outputs"].append(tensor(graph["outputs"][0]))
+        fused["heads"].append(head)
+
+    return _merge_input_dense(fused, merge_heads if merge_heads is not None else fused["heads"])
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_fused_sources(models_dir: str) -> Dict[str, str]:
+    """{헤드: models_dir 기준 .h5 상대 경로}. coarse 가 첫 헤드, fine 은 model_fine_<키>.h5 순서"""
+    sources = {"coarse": "model_coarse.h5"}
+    for name in sorted(os.listdir(os.path.join(models_dir, "fine"))):
+        if name.startswith("model_fine_") and name.endswith(".h5"):
+            sources[name[len("model_fine_"):-len(".h5")]] = f"fine/{name}"
+    return sources
+
+
+def _export_fused_keras(models_dir: str, sources: Dict[str, str], out_path: str) -> None:
+    """Keras 백엔드용 통합 모델 (.h5): 각 모델을 공유 입력에 연결한 다중 출력 함수형 모델"""
+    from tensorflow.keras.layers import Input
+    from tensorflow.keras.models import Model, load_model
+
+    models = {}
+    for head, rel_path in sources.items():
+        model = load_model(os.path.join(models_dir, rel_path), compile=False)
+        model._name = f"{head}_model"  # 하위 모델 이름 중복 방지
+        models[head] = model
+
+    first = next(iter(models.values()))
+    inputs = [Input(shape=tensor.shape[1:], name=tensor.name.split(":")[0]) for tensor in first.inputs]
+    fused = Model(inputs, [model(inputs) for model in models.values()], name=FUSED_NAME)
+    fused.save(out_path)
+
+
+def export_fused(models_dir: str = f"{BASE_DIR}/models", sources: Optional[Dict[str, str]] = None, keras: bool = True) -> List[str]:
+    """
+    coarse + fine 통합 모델 저장
+    - model_fused.npz : NumPy 백엔드용 (각 .h5 를 BN 폴딩 후 합침, fine 헤드 첫 Dense 병합)
+    - model_fused.h5  : Keras 백엔드용 (TensorFlow 가 설치된 경우)
+    - model_fused.json: 헤드 순서 + 원본 .h5 체크섬 (원본이 바뀌면 서버가 통합 모델을 쓰지 않음)
+    """
+    sources = sources or default_fused_sources(models_dir)
+    graphs = {head: fold_batch_norm(read_keras_h5(os.path.join(models_dir, rel))) for head, rel in sources.items()}
+    # coarse 헤드는 단독 모델과 같은 연산 그대로 (coarse 확률 = riskScore 가 비트 단위로 같도록)
+    fused = fuse_graphs(graphs, merge_heads=list(sources)[1:])
+
+    written = [os.path.join(models_dir, f"{FUSED_NAME}.npz")]
+    save_bundle(fused, written[0])
+
+    if keras:
+        try:
+            _export_fused_keras(models_dir, sources, os.path.join(models_dir, f"{FUSED_NAME}.h5"))
+            written.append(os.path.join(models_dir, f"{FUSED_NAME}.h5"))
+        except ImportError:
+            pass  # TensorFlow 없음 → NumPy 통합 모델만
+
+    manifest = {
+        "heads": list(sources),
+        "sources": {head: {"path": rel, "sha256": file_sha256(os.path.join(models_dir, rel))} for head, rel in sources.items()},
+        # 통합 모델 파일 자체의 체크섬 (서버는 mtime 이 아니라 이 값으로 .npz / .h5 를 확인)
+        "outputs": {os.path.basename(path): file_sha256(path) for path in written},
+    }
+    with open(os.path.join(models_dir, f"{FUSED_NAME}.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    written.append(os.path.join(models_dir, f"{FUSED_NAME}.json"))
+    return written
+
+
+def read_fused_manifest(models_dir: str = f"{BASE_DIR}/models") -> Optional[dict]:
+    """통합 모델 매니페스트. 없거나 원본 .h5 가 통합 이후 바뀌었으면 None"""
+    path = os.path.join(models_dir, f"{FUSED_NAME}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    for source in manifest["sources"].values():
+        source_path = os.path.join(models_dir, source["path"])
+        if not os.path.exists(source_path) or file_sha256(source_path) != source["sha256"]:
+            logger.warning(
+                "⚠️ 통합 모델 이후 원본 모델이 바뀌어 통합 모델을 사용하지 않습니다 (python scripts/numpy_engine.py 로 다시 생성)",
+                extra={"source": source["path"]},
+            )
+            return None
+    return manifest
+
+
+class NumpyModel:
+    """Keras Model.predict 와 같은 호출 방식의 NumPy forward-pass 엔진"""
+
+    def __init__(self, spec: dict, arrays: Dict[str, np.ndarray]):
+        self.inputs: List[str] = spec["inputs"]
+        self.outputs: List[str] = spec["outputs"]
+        self.ops: List[dict] = spec["ops"]
+        self.dims: Dict[str, int] = spec.get("dims", {})
+        self.heads: List[str] = spec.get("heads", [])
+        self.arrays = arrays
+
+    def predict(self, inputs: Union[np.ndarray, List[np.ndarray]], **kwargs) -> Union[np.ndarray, List[np.ndarray]]:
+        if not isinstance(inputs, (list, tuple)):
+            inputs = [inputs]
+        tensors = {name: np.asarray(x, dtype=np.float32) for name, x in zip(self.inputs, inputs)}
+
+        for op in self.ops:
+            kind = op["op"]
+            if kind == "dense":
+                name = op["output"]
+                x = tensors[op["inputs"][0]] @ self.arrays[f"{name}/kernel"] + self.arrays[f"{name}/bias"]
+                tensors[name] = ACTIVATIONS[op["activation"]](x)
+            elif kind == "concat":
+                tensors[op["output"]] = np.concatenate([tensors[t] for t in op["inputs"]], axis=-1)
+            elif kind == "split":
+                parts = np.split(tensors[op["inputs"][0]], np.cumsum(op["sizes"])[:-1], axis=-1)
+                tensors.update(zip(op["outputs"], parts))
+            elif kind == "affine":
+                name = op["output"]
+                tensors[name] = tensors[op["inputs"][0]] * self.arrays[f"{name}/scale"] + self.arrays[f"{name}/shift"]
+            elif kind == "activation":
+                tensors[op["output"]] = ACTIVATIONS[op["activation"]](tensors[op["inputs"][0]])
+
+        results = [tensors[name] for name in self.outputs]
+        return results[0] if len(results) == 1 else results
+
+    __call__ = predict
+
+
+def load_numpy_model(path: str) -> NumpyModel:
+    with np.load(path, allow_pickle=False) as data:
+        spec = json.loads(str(data["__graph__"]))
+        arrays = {key: data[key] for key in data.files if key != "__graph__"}
+    return NumpyModel(spec, arrays)
+
+
+# ✅ models/ 아래 모든 .h5 변환
+def export_all(models_dir: str = f"{BASE_DIR}/models") -> List[str]:
+    exported = []
+    for root, _, files in os.walk(models_dir):
+        for name in sorted(files):
+            if name.endswith(".h5") and not name.startswith(FUSED_NAME):
+                out_path = export_h5(os.path.join(root, name))
+                print(f"✅ NumPy 번들 저장 완료: {out_path}")
+                exported.append(out_path)
+    return exported
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for h5_path in sys.argv[1:]:
+            print(f"✅ NumPy 번들 저장 완료: {export_h5(h5_path)}")
+    else:
+        export_all()
+        for path in export_fused():
+            print(f"✅ 통합 모델 저장 완료: {path}")
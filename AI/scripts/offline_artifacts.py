@@ -0,0 +1,100 @@
+# 📄 offline_artifacts.py
+# 네트워크 / 학습된 가중치 없이 추론 경로를 돌리기 위한 대체 아티팩트
+# - HashingEncoder: SBERT 대신 쓰는 작은 결정적 인코더 (문자 n-gram 해싱 → 768차원)
+# - random_model_like: 저장소의 .h5 에서 읽은 그래프(실제 구조, BN 폴딩)에 랜덤 초기화 가중치를 채운 NumpyModel
+#   (.npz 는 저장소에 없는 파생 파일이라 쓰지 않음 → 새로 clone 한 상태에서도 동작, TensorFlow 불필요)
+# - build_offline_artifacts: 위 둘 + 실제 scaler / MLB / 라벨 인코더로 ModelArtifacts 구성
+# 벤치마크 / 부하 테스트 / 평가 스크립트의 --offline 옵션에서 사용 (결과 값 자체는 의미 없음)
+
+import os
+import zlib
+import tempfile
+import numpy as np
+from typing import List
+
+import joblib
+
+from scripts.embedding_cache import EmbeddingCache
+from scripts.embedding_index import DiseaseEmbeddingIndex
+from scripts.fine_registry import FineModelRegistry
+from scripts.numpy_engine import NumpyModel, fold_batch_norm, read_keras_h5
+
+OFFLINE_ENCODER_NAME = "offline-hashing-encoder"
+
+
+class HashingEncoder:
+    """SentenceTransformer.encode 와 같은 호출 방식의 해싱 인코더"""
+
+    def __init__(self, dim: int = 768, ngram: int = 2):
+        self.dim = dim
+        self.ngram = ngram
+
+    def _features(self, sentence: str) -> List[str]:
+        features = []
+        for word in sentence.split():
+            features.append(word)
+            features.extend(word[i:i + self.ngram] for i in range(max(len(word) - self.ngram + 1, 0)))
+        return features
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        vectors = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            for feature in self._features(sentence):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def random_model_like(h5_path: str, seed: int = 0) -> NumpyModel:
+    """.h5 의 그래프 구조는 그대로, 가중치는 Glorot uniform 랜덤 초기화 (bias 0)"""
+    rng = np.random.default_rng(seed)
+    graph = fold_batch_norm(read_keras_h5(h5_path))
+    spec = {key: graph[key] for key in ("inputs", "outputs", "ops", "dims") if key in graph}
+    shapes = {key: value.shape for key, value in graph["arrays"].items()}
+
+    arrays = {}
+    for key, shape in shapes.items():
+        if key.endswith("/kernel"):
+            limit = np.sqrt(6.0 / (shape[0] + shape[1]))
+            arrays[key] = rng.uniform(-limit, limit, size=shape).astype(np.float32)
+        elif key.endswith("/scale"):
+            arrays[key] = np.ones(shape, dtype=np.float32)
+        else:
+            arrays[key] = np.zeros(shape, dtype=np.float32)
+    return NumpyModel(spec, arrays)
+
+
+def build_offline_artifacts(seed: int = 0, embedding_cache_size: int = 4096, cache_dir: str = None):
+    """ModelArtifacts (HashingEncoder + 랜덤 가중치 모델). scaler / MLB / 라벨 인코더는 models/ 의 실제 파일 사용"""
+    from scripts.model_util import BASE_DIR, FINE_MODEL_MAP, SYMPTOM_MAP_PATH, ModelArtifacts
+
+    encoder = HashingEncoder()
+    fine_seeds = {model_file: seed + i + 1 for i, (model_file, _) in enumerate(FINE_MODEL_MAP.values())}
+    fine_registry = FineModelRegistry(
+        FINE_MODEL_MAP,
+        model_dir=f"{BASE_DIR}/models/fine",
+        model_loader=lambda path: random_model_like(path, fine_seeds[os.path.basename(path)]),
+        encoder_loader=joblib.load,
+    )
+    disease_index = DiseaseEmbeddingIndex.load_or_build(
+        SYMPTOM_MAP_PATH,
+        OFFLINE_ENCODER_NAME,
+        encoder,
+        cache_dir=cache_dir or os.path.join(tempfile.gettempdir(), "ai_offline_disease_index"),
+    )
+
+    return ModelArtifacts(
+        model_coarse=random_model_like(f"{BASE_DIR}/models/model_coarse.h5", seed),
+        coarse_encoder=joblib.load(f"{BASE_DIR}/models/coarse_label_encoder.pkl"),
+        scaler=joblib.load(f"{BASE_DIR}/models/scaler.pkl"),
+        mlb_chronic=joblib.load(f"{BASE_DIR}/models/mlb_chronic.pkl"),
+        mlb_meds=joblib.load(f"{BASE_DIR}/models/mlb_meds.pkl"),
+        fine_registry=fine_registry,
+        sbert_model=encoder,
+        disease_index=disease_index,
+        embedding_cache=EmbeddingCache(embedding_cache_size),
+        version=f"offline-{seed}",
+    )
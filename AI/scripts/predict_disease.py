@@ -6,10 +6,6 @@
 """
 
 import numpy as np
-import joblib
-from tensorflow.keras.models import load_model
-from sentence_transformers import SentenceTransformer
-from sklearn.preprocessing import StandardScaler, MultiLabelBinarizer
 
 # 위험도 계산 함수
 def calculate_risk_score(input_dict, confidence):
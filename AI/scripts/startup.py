@@ -0,0 +1,104 @@
+# 📄 startup.py
+# AI 서버 기동 서브시스템
+# - ParallelLoader: 서로 독립적인 아티팩트를 스레드 풀에서 동시에 로드 (의존 관계 지원)
+# - StartupState: 기동 상태(starting / ready / failed) + 아티팩트별 로드 시간 보고
+
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class ParallelLoader:
+    """
+    이름이 붙은 로드 작업을 동시에 실행한다.
+    depends_on 으로 지정한 작업 결과는 위치 인자로 전달된다.
+    (예: SBERT 모델 로드 → 질병 임베딩 인덱스 생성)
+    after 로 지정한 작업은 끝나기만 기다리고 결과는 전달하지 않는다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._tasks: List[Tuple[str, Callable[..., Any], Sequence[str], Sequence[str]]] = []
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        depends_on: Sequence[str] = (),
+        after: Sequence[str] = (),
+    ) -> "ParallelLoader":
+        self._tasks.append((name, fn, tuple(depends_on), tuple(after)))
+        return self
+
+    def run(self) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """(이름 → 결과, 이름 → 로드 시간(초)) 반환. 하나라도 실패하면 예외 전파"""
+        timings: Dict[str, float] = {}
+        futures: Dict[str, Future] = {}
+
+        # 의존 작업을 기다리는 스레드가 풀을 막지 않도록 작업 수만큼 워커 확보
+        workers = self.max_workers or max(1, len(self._tasks))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="startup") as pool:
+            def run_task(name, fn, deps, waits):
+                for dep in waits:
+                    futures[dep].result()
+                args = [futures[dep].result() for dep in deps]
+                start = time.perf_counter()
+                result = fn(*args)
+                timings[name] = round(time.perf_counter() - start, 4)
+                return result
+
+            for name, fn, deps, waits in self._tasks:
+                unknown = [dep for dep in (*deps, *waits) if dep not in futures]
+                if unknown:
+                    raise ValueError(f"'{name}' 의 의존 작업이 먼저 등록되어야 합니다: {unknown}")
+                futures[name] = pool.submit(run_task, name, fn, deps, waits)
+
+            results = {name: future.result() for name, future in futures.items()}
+
+        return results, timings
+
+
+class StartupState:
+    """readiness/liveness 판단용 기동 상태"""
+
+    def __init__(self):
+        self.status = "starting"
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+        self._ready = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self, timings: Dict[str, float]) -> None:
+        self.timings = dict(timings)
+        self.status = "ready"
+        self.ready_at = time.time()
+        self._ready.set()
+
+    def mark_failed(self, error: Exception) -> None:
+        self.status = "failed"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def to_dict(self) -> dict:
+        elapsed = (self.ready_at or time.time()) - self.started_at
+        return {
+            "status": self.status,
+            "error": self.error,
+            "elapsed_seconds": round(elapsed, 3),
+            "timings": self.timings,
+        }
+
+    def report(self) -> str:
+        """아티팩트별 로드 시간 표 (느린 순)"""
+        lines = [f"⏱️ 기동 시간 보고 ({self.status}, 총 {self.to_dict()['elapsed_seconds']}초)"]
+        for name, seconds in sorted(self.timings.items(), key=lambda kv: kv[1], reverse=True):
+            lines.append(f"   - {name:<24} {seconds:>8.3f}s")
+        return "\n".join(lines)
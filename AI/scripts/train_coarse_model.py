@@ -5,11 +5,9 @@
 - coarse 레벨 (감기, 감염, 소화기, 호흡기, 심혈관)
 """
 
+import os
 import json
 import numpy as np
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler, MultiLabelBinarizer
 from sklearn.utils.class_weight import compute_class_weight
 from sklearn.metrics import classification_report, confusion_matrix
 
@@ -23,81 +21,38 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
 
+from numpy_engine import default_fused_sources, export_fused, export_h5
+from artifact_bundle import write_bundle
+from feature_cache import load_or_build_features
+
 # ✅ 데이터 로드
-CSV_PATH = "./data/raw/leaned_train_dataset.csv"
 SBERT_PATH = "./data/processed/leaned_sbert_text_features_final.npy"
 
+# 전처리(파싱 / scaler / MLB / 라벨 인코딩 / 분할)는 fine 학습과 공유하는 피처 캐시에서 로드
 print("📄 데이터 로딩 중...")
-df = pd.read_csv(CSV_PATH, encoding="utf-8-sig")
-sbert_text_features = np.load(SBERT_PATH)[:len(df)]
-
-# ✅ 전처리
-coarse_map = {
-    "감기": ["급성 기관지염", "급성 비인두염", "급성 인두염", "상기도 감염"],
-    "감염": ["급성 장염", "간염", "요로감염"],
-    "소화기": ["위염", "위식도역류질환(GERD)", "소화성 궤양", "췌장염", "과민성 대장증후군"],
-    "호흡기": ["폐렴", "천식", "만성 폐쇄성 폐질환(COPD)"],
-    "심혈관": ["심부전", "협심증", "빈혈"]
-}
-
-# coarse 라벨 생성
-def map_coarse(name):
-    for k, v in coarse_map.items():
-        if name in v:
-            return k
-    return None
-
-df["disease_name"] = df["disease_name"].apply(lambda x: x[0] if isinstance(x, list) else x)
-df["coarse_label"] = df["disease_name"].apply(map_coarse)
-df.dropna(subset=["coarse_label"], inplace=True)
-df.reset_index(drop=True, inplace=True)
-
-# 수치 정규화
-scaler = StandardScaler()
-numeric_cols = ["Age", "Height_cm", "Weight_kg", "BMI"]
-df[numeric_cols] = scaler.fit_transform(df[numeric_cols])
-
-# 범주형 인코딩
-gender = df["Gender"].map({"남성": 1, "여성": 0}).fillna(0).values.reshape(-1, 1)
-df["chronic_diseases"] = df["chronic_diseases"].apply(lambda x: x.split(',') if isinstance(x, str) and x != "없음" else [])
-df["medications"] = df["medications"].apply(lambda x: x.split(',') if isinstance(x, str) and x != "없음" else [])
-mlb_chronic = MultiLabelBinarizer()
-mlb_meds = MultiLabelBinarizer()
-chronic_matrix = mlb_chronic.fit_transform(df["chronic_diseases"])
-meds_matrix = mlb_meds.fit_transform(df["medications"])
-
-# 최종 MLP 피처
-mlp_features = np.concatenate([
-    df[numeric_cols].values,
-    gender,
-    chronic_matrix,
-    meds_matrix
-], axis=1)
-text_features = sbert_text_features.astype(np.float32)
+features = load_or_build_features()
+sbert_text_features = np.load(SBERT_PATH, mmap_mode="r")
+
+# 최종 MLP 피처 (수치 정규화 + 성별 + 기저질환 / 복용약 멀티핫)
+mlp_features = features.X_mlp
+text_features = np.asarray(sbert_text_features[features.rows], dtype=np.float32)
+scaler = features.scaler
+mlb_chronic = features.mlb_chronic
+mlb_meds = features.mlb_meds
 
 # coarse 라벨 인코딩
-y_label_encoder = LabelEncoder()
-df["coarse_encoded"] = y_label_encoder.fit_transform(df["coarse_label"])
-y = to_categorical(df["coarse_encoded"])
-
-# 데이터 분할
-X_mlp = mlp_features
-X_text = text_features
-X_train_val_mlp, X_test_mlp, X_train_val_text, X_test_text, y_train_val, y_test = train_test_split(
-    X_mlp, X_text, y,
-    test_size=0.15,
-    stratify=df["coarse_encoded"],
-    random_state=42
-)
-X_train_mlp, X_val_mlp, X_train_text, X_val_text, y_train, y_val = train_test_split(
-    X_train_val_mlp, X_train_val_text, y_train_val,
-    test_size=0.1765,
-    stratify=np.argmax(y_train_val, axis=1),
-    random_state=42
-)
+y_label_encoder = features.coarse_label_encoder
+coarse_encoded = np.asarray(features.coarse_encoded)
+y = to_categorical(coarse_encoded)
+
+# 데이터 분할 (train 70% / val 15% / test 15%, coarse 라벨 층화)
+train_idx, val_idx, test_idx = features.coarse_split
+X_train_mlp, X_val_mlp, X_test_mlp = (mlp_features[i] for i in (train_idx, val_idx, test_idx))
+X_train_text, X_val_text, X_test_text = (text_features[i] for i in (train_idx, val_idx, test_idx))
+y_train, y_val, y_test = (y[i] for i in (train_idx, val_idx, test_idx))
 
 # class weight
-class_weights = compute_class_weight(class_weight='balanced', classes=np.unique(df["coarse_encoded"]), y=df["coarse_encoded"])
+class_weights = compute_class_weight(class_weight='balanced', classes=np.unique(coarse_encoded), y=coarse_encoded)
 class_weights_dict = {i: w for i, w in enumerate(class_weights)}
 
 # coarse 모델 정의 및 학습
@@ -154,9 +109,22 @@ print(classification_report(y_true, y_pred, target_names=y_label_encoder.classes
 print("💾 coarse 모델 저장 중...")
 model_coarse.save("./models/model_coarse.h5")
 print("✅ coarse 모델 저장 완료")
+export_h5("./models/model_coarse.h5")
+print("✅ coarse NumPy 번들 저장 완료: model_coarse.npz")
 
 
 joblib.dump(y_label_encoder, "models/coarse_label_encoder.pkl")
 joblib.dump(scaler, "models/scaler.pkl")
 joblib.dump(mlb_chronic, "models/mlb_chronic.pkl")
 joblib.dump(mlb_meds, "models/mlb_meds.pkl")
+
+# ✅ coarse + fine 통합 모델 다시 생성 (coarse 만 재학습해도 통합 모델이 새 coarse 가중치를 쓰도록)
+if os.path.isdir("./models/fine") and len(default_fused_sources("./models")) > 1:
+    print("\n🔗 통합 모델 저장 중...")
+    for path in export_fused("./models"):
+        print(f"✅ 통합 모델 저장 완료: {os.path.basename(path)}")
+else:
+    print("ℹ️ fine 모델이 아직 없어 통합 모델은 train_fine_models.py 실행 시 생성됩니다")
+
+# ✅ 서빙용 통합 아티팩트 번들 (가중치 + 전처리기, models/bundle/<버전>)
+print(f"📦 아티팩트 번들 저장 완료: {write_bundle()}")
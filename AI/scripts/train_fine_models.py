@@ -3,16 +3,24 @@
 📦 coarse 그룹별 fine 질병 분류 모델 학습 스크립트
 - coarse 그룹: 감기, 감염, 소화기, 호흡기, 심혈관
 - fine_config.json 기반으로 개별 모델 설정 및 학습 진행
+- --workers N: 그룹들을 프로세스 풀에서 동시에 학습 (프로세스별 TensorFlow 스레드 수 = 코어 수 ÷ N)
+  · 그룹별 학습 로그는 logs/fine/<그룹>.log 로, 지표는 logs/fine/<그룹>.json 으로 저장
+- 그룹별 시드 = --seed + fine_config 순서 (실행 방식과 무관하게 같은 그룹은 같은 시드)
+- 끝나면 그룹별 지표 요약 출력 + logs/fine/summary.json
+
+실행:
+  python scripts/train_fine_models.py
+  python scripts/train_fine_models.py --workers 5
 """
 
 import json
+import time
+import argparse
 import numpy as np
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler, MultiLabelBinarizer
-from sklearn.utils.class_weight import compute_class_weight
+from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report
 
+import tensorflow as tf
 from tensorflow.keras.models import Model
 from tensorflow.keras.layers import Input, Dense, Dropout, Concatenate
 from tensorflow.keras.optimizers import Adam
@@ -21,13 +29,19 @@ from tensorflow.keras.utils import to_categorical
 from focal_loss import SparseCategoricalFocalLoss
 import joblib
 import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from numpy_engine import export_h5, export_fused
+from artifact_bundle import write_bundle
+from feature_cache import load_or_build_features
 
 # ✅ 경로 설정
-CSV_PATH = "./data/raw/leaned_train_dataset.csv"
 SBERT_PATH = "./data/processed/leaned_sbert_text_features_final.npy"
 CONFIG_PATH = "./data/fine_config.json"
 SAVE_DIR = "./models/fine"
-os.makedirs(SAVE_DIR, exist_ok=True)
+LOG_DIR = "./logs/fine"
 
 # ✅ 한글 그룹명을 영문 파일명으로 매핑
 GROUP_NAME_MAP = {
@@ -38,120 +52,194 @@ GROUP_NAME_MAP = {
     "심혈관": "cardio"
 }
 
-# ✅ 데이터 로딩 및 전처리
-df = pd.read_csv(CSV_PATH, encoding="utf-8-sig")
-df["disease_name"] = df["disease_name"].apply(lambda x: x[0] if isinstance(x, list) else x)
-sbert_features = np.load(SBERT_PATH)[:len(df)]
-
-# coarse 라벨
-coarse_map = {
-    "감기": ["급성 기관지염", "급성 비인두염", "급성 인두염", "상기도 감염"],
-    "감염": ["급성 장염", "간염", "요로감염"],
-    "소화기": ["위염", "위식도역류질환(GERD)", "소화성 궤양", "췌장염", "과민성 대장증후군"],
-    "호흡기": ["폐렴", "천식", "만성 폐쇄성 폐질환(COPD)"],
-    "심혈관": ["심부전", "협심증", "빈혈"]
-}
-
-def map_coarse(name):
-    for k, v in coarse_map.items():
-        if name in v:
-            return k
-    return None
-
-df["coarse_label"] = df["disease_name"].apply(map_coarse)
-df.dropna(subset=["coarse_label"], inplace=True)
-df.reset_index(drop=True, inplace=True)
-
-# 수치 + 범주형 전처리
-numeric_cols = ["Age", "Height_cm", "Weight_kg", "BMI"]
-df[numeric_cols] = StandardScaler().fit_transform(df[numeric_cols])
-df["chronic_diseases"] = df["chronic_diseases"].apply(lambda x: x.split(',') if isinstance(x, str) and x != "없음" else [])
-df["medications"] = df["medications"].apply(lambda x: x.split(',') if isinstance(x, str) and x != "없음" else [])
-gender = df["Gender"].map({"남성": 1, "여성": 0}).fillna(0).values.reshape(-1, 1)
-mlb_chronic = MultiLabelBinarizer()
-mlb_meds = MultiLabelBinarizer()
-X_mlp = np.concatenate([
-    df[numeric_cols].values,
-    gender,
-    mlb_chronic.fit_transform(df["chronic_diseases"]),
-    mlb_meds.fit_transform(df["medications"])
-], axis=1)
-X_text = sbert_features.astype(np.float32)
-
-# config 로딩
-with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-    fine_config = json.load(f)
-
-loss_map = {
-    "categorical_crossentropy": "categorical_crossentropy",
-    "focal": SparseCategoricalFocalLoss(gamma=2.0)
-}
-
-# 🔁 coarse 그룹별 반복 학습
-fine_label_encoders = {}
 
-for group in fine_config:
-    config = fine_config[group]
-    df_sub = df[df["coarse_label"] == group].copy()
-    df_sub["fine_label"] = df_sub["disease_name"]
-
-    label_encoder = LabelEncoder()
-    df_sub["fine_encoded"] = label_encoder.fit_transform(df_sub["fine_label"])
-    fine_label_encoders[group] = label_encoder
-
-    y = to_categorical(df_sub["fine_encoded"]) if config["output_type"] == "onehot" else df_sub["fine_encoded"].values
-    idx = df_sub.index
-    X_mlp_group = X_mlp[idx]
-    X_text_group = X_text[idx]
-
-    X_train_mlp, X_val_mlp, X_train_text, X_val_text, y_train, y_val = train_test_split(
-        X_mlp_group, X_text_group, y,
-        test_size=0.15,
-        stratify=df_sub["fine_encoded"],
-        random_state=42
-    )
-
-    mlp_input = Input(shape=(X_train_mlp.shape[1],))
+def build_model(mlp_dim: int, text_dim: int, output_dim: int, loss):
+    mlp_input = Input(shape=(mlp_dim,))
     x1 = Dense(64, activation='relu')(mlp_input)
     x1 = Dropout(0.2)(x1)
 
-    text_input = Input(shape=(X_train_text.shape[1],))
+    text_input = Input(shape=(text_dim,))
     x2 = Dense(128, activation='relu')(text_input)
     x2 = Dropout(0.3)(x2)
 
     x = Concatenate()([x1, x2])
     x = Dense(128, activation='relu')(x)
     x = Dropout(0.3)(x)
-    output = Dense(y.shape[1] if config["output_type"] == "onehot" else len(label_encoder.classes_), activation='softmax')(x)
+    output = Dense(output_dim, activation='softmax')(x)
 
     model = Model(inputs=[mlp_input, text_input], outputs=output)
     model.compile(
         optimizer=Adam(0.0005),
-        loss=loss_map[config["loss"]],
+        loss=loss,
         metrics=["accuracy"]
     )
+    return model
+
 
-    model.fit(
+# ✅ 그룹 하나 학습 → 모델 / 인코더 저장 후 지표 반환 (워커 프로세스에서도 호출)
+def train_group(group: str, config: dict, seed: int, verbose: int = 1) -> dict:
+    start = time.perf_counter()
+    tf.keras.utils.set_random_seed(seed)  # python / numpy / tensorflow 시드
+
+    # coarse 학습과 같은 피처 캐시 (같은 scaler / MLB 로 만든 MLP 피처 + 그룹별 분할 인덱스)
+    features = load_or_build_features()
+    train_idx, val_idx = features.fine_split(group)
+    X_mlp = features.X_mlp
+    sbert_features = np.load(SBERT_PATH, mmap_mode="r")
+    rows = np.asarray(features.rows)
+
+    label_encoder = LabelEncoder()
+    label_encoder.fit(features.disease_names[features.group_rows(group)])
+
+    y_train = label_encoder.transform(features.disease_names[train_idx])
+    y_val = label_encoder.transform(features.disease_names[val_idx])
+    if config["output_type"] == "onehot":
+        num_classes = len(label_encoder.classes_)
+        y_train, y_val = to_categorical(y_train, num_classes), to_categorical(y_val, num_classes)
+
+    X_train_mlp, X_val_mlp = X_mlp[train_idx], X_mlp[val_idx]
+    X_train_text = np.asarray(sbert_features[rows[train_idx]], dtype=np.float32)
+    X_val_text = np.asarray(sbert_features[rows[val_idx]], dtype=np.float32)
+
+    loss_map = {
+        "categorical_crossentropy": "categorical_crossentropy",
+        "focal": SparseCategoricalFocalLoss(gamma=2.0)
+    }
+    model = build_model(X_train_mlp.shape[1], X_train_text.shape[1], len(label_encoder.classes_), loss_map[config["loss"]])
+
+    history = model.fit(
         [X_train_mlp, X_train_text], y_train,
         validation_data=([X_val_mlp, X_val_text], y_val),
         epochs=30,
         batch_size=64,
         callbacks=[EarlyStopping(patience=5, restore_best_weights=True)],
-        verbose=1
+        verbose=verbose
     )
 
-    y_pred = np.argmax(model.predict([X_val_mlp, X_val_text]), axis=1)
+    y_pred = np.argmax(model.predict([X_val_mlp, X_val_text], verbose=verbose), axis=1)
     y_true = np.argmax(y_val, axis=1) if config["output_type"] == "onehot" else y_val
 
     print(f"\n📊 {group} 그룹 fine 분류 결과:")
     print(classification_report(y_true, y_pred, target_names=label_encoder.classes_))
+    report = classification_report(y_true, y_pred, target_names=label_encoder.classes_, output_dict=True)
 
     file_key = GROUP_NAME_MAP[group]  # ✅ 영문 이름 사용
     model.save(f"{SAVE_DIR}/model_fine_{file_key}.h5")
     print(f"✅ 모델 저장 완료: model_fine_{file_key}.h5")
-
-print("\n💾 fine 인코더 저장 중...")
-for group, encoder in fine_label_encoders.items():
-    file_key = GROUP_NAME_MAP[group]
-    joblib.dump(encoder, f"{SAVE_DIR}/fine_label_encoder_{file_key}.pkl")
+    export_h5(f"{SAVE_DIR}/model_fine_{file_key}.h5")
+    print(f"✅ NumPy 번들 저장 완료: model_fine_{file_key}.npz")
+    joblib.dump(label_encoder, f"{SAVE_DIR}/fine_label_encoder_{file_key}.pkl")
     print(f"✅ {group} → 저장 완료: fine_label_encoder_{file_key}.pkl")
+
+    return {
+        "group": group,
+        "key": file_key,
+        "seed": seed,
+        "classes": len(label_encoder.classes_),
+        "train_rows": len(train_idx),
+        "val_rows": len(val_idx),
+        "epochs": len(history.history["loss"]),
+        "val_accuracy": round(float(report["accuracy"]), 4),
+        "macro_f1": round(float(report["macro avg"]["f1-score"]), 4),
+        "seconds": round(time.perf_counter() - start, 1),
+        "report": report,
+    }
+
+
+# ✅ 워커 프로세스: TensorFlow 스레드 수 제한 (첫 연산 전에 설정) + 출력은 그룹별 로그 파일로
+def init_worker(threads: int) -> None:
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def train_group_logged(group: str, config: dict, seed: int, log_dir: str) -> dict:
+    log_path = os.path.join(log_dir, f"{GROUP_NAME_MAP[group]}.log")
+    with open(log_path, "w", encoding="utf-8") as log:
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = sys.stderr = log
+        try:
+            metrics = train_group(group, config, seed, verbose=2)  # 로그 파일에는 진행 막대 대신 epoch 당 한 줄
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+    metrics["threads"] = tf.config.threading.get_intra_op_parallelism_threads()
+    metrics["log"] = log_path
+    return metrics
+
+
+def save_metrics(metrics: dict, log_dir: str) -> None:
+    with open(os.path.join(log_dir, f"{metrics['key']}.json"), "w", encoding="utf-8") as f:
+        json.dump(metrics, f, ensure_ascii=False, indent=2)
+
+
+def print_summary(results: list, wall_seconds: float) -> None:
+    print(f"\n📋 fine 학습 요약 (총 {wall_seconds:.1f}s, 그룹 학습 시간 합 {sum(r['seconds'] for r in results):.1f}s)")
+    print(f"   {'그룹':<8}{'클래스':>6}{'epoch':>7}{'val acc':>9}{'macro F1':>10}{'시간(s)':>9}")
+    for r in results:
+        print(f"   {r['group']:<8}{r['classes']:>6}{r['epochs']:>7}{r['val_accuracy']:>9.4f}{r['macro_f1']:>10.4f}{r['seconds']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1, help="동시에 학습할 그룹 수 (1 = 현재 프로세스에서 순서대로)")
+    parser.add_argument("--threads", type=int, default=0, help="워커별 TensorFlow 스레드 수 (0 = 코어 수 ÷ 워커 수)")
+    parser.add_argument("--seed", type=int, default=42, help="기준 시드 (그룹별 시드 = 기준 + fine_config 순서)")
+    parser.add_argument("--log-dir", default=LOG_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    os.makedirs(args.log_dir, exist_ok=True)
+
+    # config 로딩
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        fine_config = json.load(f)
+    seeds = {group: args.seed + i for i, group in enumerate(fine_config)}
+
+    # 워커들이 동시에 만들지 않도록 피처 캐시를 먼저 준비
+    load_or_build_features()
+
+    started = time.perf_counter()
+    results = []
+    workers = min(args.workers, len(fine_config))
+    if workers <= 1:
+        # 🔁 coarse 그룹별 반복 학습
+        for group, config in fine_config.items():
+            metrics = train_group(group, config, seeds[group])
+            save_metrics(metrics, args.log_dir)
+            results.append(metrics)
+    else:
+        # TensorFlow 는 fork 후 안전하지 않으므로 spawn, 코어를 워커끼리 나눠 사용
+        threads = args.threads or max(1, (os.cpu_count() or 1) // workers)
+        print(f"🧵 fine 그룹 {len(fine_config)}개를 워커 {workers}개로 학습 (워커당 스레드 {threads}, 로그: {args.log_dir})")
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=ctx, initializer=init_worker, initargs=(threads,)) as pool:
+            futures = {
+                pool.submit(train_group_logged, group, config, seeds[group], args.log_dir): group
+                for group, config in fine_config.items()
+            }
+            for future in as_completed(futures):
+                metrics = future.result()
+                save_metrics(metrics, args.log_dir)
+                results.append(metrics)
+                print(f"✅ {metrics['group']} 완료 ({metrics['seconds']}s, val acc {metrics['val_accuracy']:.4f})")
+        results.sort(key=lambda r: list(fine_config).index(r["group"]))
+
+    wall_seconds = time.perf_counter() - started
+    print_summary(results, wall_seconds)
+    with open(os.path.join(args.log_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "workers": workers,
+            "wall_seconds": round(wall_seconds, 1),
+            "groups": [{k: v for k, v in r.items() if k != "report"} for r in results],
+        }, f, ensure_ascii=False, indent=2)
+
+    # ✅ coarse + fine 통합 모델 (서버가 한 번의 forward 로 coarse / fine 확률 계산)
+    print("\n🔗 통합 모델 저장 중...")
+    for path in export_fused():
+        print(f"✅ 통합 모델 저장 완료: {os.path.basename(path)}")
+
+    # ✅ 서빙용 통합 아티팩트 번들 (가중치 + 전처리기, models/bundle/<버전>)
+    print(f"📦 아티팩트 번들 저장 완료: {write_bundle()}")
+
+
+if __name__ == "__main__":
+    main()
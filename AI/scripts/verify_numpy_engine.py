@@ -0,0 +1,102 @@
+# verify_numpy_engine.py
+"""
+🧪 NumPy 추론 엔진 골든 출력 검증 스크립트
+- leaned_train_dataset.csv 행(시드 고정 샘플)으로 입력을 만들어 Keras(.h5) 출력과 NumPy 번들(.npz) 출력 비교
+  · MLP 입력: 서버와 같은 경로(items_from_frame → build_mlp_inputs)로 저장된 scaler / MLB 를 적용한 실제 피처 범위
+  · SBERT 입력: 오프라인 HashingEncoder 임베딩 (SBERT 다운로드 / 네트워크 불필요)
+- .npz 는 임시 디렉터리에 현재 변환 코드로 새로 만듦 → models/ 를 건드리지 않고, 오래된 .npz 가 아니라 변환기 자체를 검증
+- coarse + fine 통합 그래프도 헤드별로 단독 Keras 모델 출력과 비교
+- 모든 모델의 최대 절대 오차가 허용치(--atol) 이내이고 argmax 가 같으면 통과, 실패 시 종료 코드 1
+- TensorFlow, models/ (.h5 + scaler / MLB), 학습 CSV 만 있으면 되므로 배포 단계 / CI 에서 그대로 실행
+
+실행: python scripts/verify_numpy_engine.py [--rows 512] [--atol 1e-5] [--seed 0]
+"""
+
+import os
+import sys
+import glob
+import argparse
+import tempfile
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.model_util import build_mlp_inputs, items_from_frame
+from scripts.numpy_engine import export_h5, fold_batch_norm, fuse_graphs, load_numpy_model, read_keras_h5, save_bundle
+from scripts.offline_artifacts import HashingEncoder
+
+CSV_PATH = f"{BASE_DIR}/data/raw/leaned_train_dataset.csv"
+
+
+# ✅ CSV 행 → (MLP 입력, SBERT 입력)
+def build_inputs(rows: int, seed: int):
+    df = pd.read_csv(CSV_PATH, encoding="utf-8-sig")
+    df = df.sample(n=min(rows, len(df)), random_state=seed).reset_index(drop=True)
+    items = items_from_frame(df)
+
+    preprocessors = SimpleNamespace(
+        scaler=joblib.load(f"{BASE_DIR}/models/scaler.pkl"),
+        mlb_chronic=joblib.load(f"{BASE_DIR}/models/mlb_chronic.pkl"),
+        mlb_meds=joblib.load(f"{BASE_DIR}/models/mlb_meds.pkl"),
+    )
+    mlp_input = build_mlp_inputs(items, preprocessors).astype(np.float32)
+    text_input = HashingEncoder().encode([" ".join(item["symptom_keywords"]) for item in items])
+    return mlp_input, np.asarray(text_input, dtype=np.float32)
+
+
+def compare(name: str, expected: np.ndarray, actual: np.ndarray, atol: float) -> bool:
+    max_err = float(np.abs(expected - actual).max())
+    same_argmax = bool((expected.argmax(axis=1) == actual.argmax(axis=1)).all())
+    ok = max_err <= atol and same_argmax
+    status = "✅" if ok else "❌"
+    print(f"{status} {name}: max_abs_err={max_err:.2e}, argmax 일치={same_argmax}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=512)
+    parser.add_argument("--atol", type=float, default=1e-5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from tensorflow.keras.models import load_model
+
+    coarse_path = f"{BASE_DIR}/models/model_coarse.h5"
+    fine_paths = sorted(glob.glob(f"{BASE_DIR}/models/fine/model_fine_*.h5"))
+    coarse = load_model(coarse_path, compile=False)
+    mlp_input, text_input = build_inputs(args.rows, args.seed)
+
+    failed = False
+    expected = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for h5_path in [coarse_path] + fine_paths:
+            name = os.path.basename(h5_path)
+            model = coarse if h5_path == coarse_path else load_model(h5_path, compile=False)
+            expected[h5_path] = model.predict([mlp_input, text_input], verbose=0)
+            npz_path = export_h5(h5_path, os.path.join(tmp_dir, os.path.splitext(name)[0] + ".npz"))
+            actual = load_numpy_model(npz_path).predict([mlp_input, text_input])
+            failed |= not compare(name, expected[h5_path], actual, args.atol)
+
+        # 통합 그래프 (export_fused 와 같은 구성: coarse 헤드는 그대로, fine 헤드 첫 Dense 병합)
+        if fine_paths:
+            heads = {"coarse": coarse_path}
+            heads.update({os.path.basename(p)[len("model_fine_"):-len(".h5")]: p for p in fine_paths})
+            graphs = {head: fold_batch_norm(read_keras_h5(path)) for head, path in heads.items()}
+            fused_path = os.path.join(tmp_dir, "model_fused.npz")
+            save_bundle(fuse_graphs(graphs, merge_heads=list(heads)[1:]), fused_path)
+            outputs = load_numpy_model(fused_path).predict([mlp_input, text_input])
+            for (head, path), actual in zip(heads.items(), outputs):
+                failed |= not compare(f"model_fused[{head}]", expected[path], actual, args.atol)
+
+    print(f"\n{'❌ 검증 실패' if failed else '✅ 전체 통과'} ({len(mlp_input)}행, seed={args.seed}, atol={args.atol})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
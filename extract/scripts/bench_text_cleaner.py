@@ -0,0 +1,90 @@
+# bench_text_cleaner.py
+"""
+⏱️ 조사/어미 제거 마이크로 벤치마크
+- 기존 구현(반복마다 JOSA / EOMI 정렬 + endswith 전수 검사)을 이 파일에 그대로 두고
+  현재 remove_josa_and_eomi(접미사 트라이 + lru_cache)와 결과 / 토큰당 처리 시간 비교
+  · trie: 캐시 없이 트라이만 (처음 보는 토큰)
+  · trie+cache: 같은 표현이 반복되는 실제 요청 흐름 (캐시 hit)
+- 토큰: SYMPTOM_MAPPING 한글 표현 + token_sets 단어에 조사/어미를 붙인 것 (시드 고정)
+
+실행 (extract/ 에서):
+  python scripts/bench_text_cleaner.py
+  python scripts/bench_text_cleaner.py --tokens 100000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.korean_rules import JOSA, EOMI
+from utils.symptom_mapping import SYMPTOM_MAPPING
+from utils.text_cleaner import remove_josa_and_eomi
+
+
+# ✅ 기존 구현 (비교 기준, trace 호출 제외)
+def legacy_remove_josa_and_eomi(token: str) -> str:
+    while True:
+        original = token
+        for j in sorted(JOSA, key=len, reverse=True):
+            if token.endswith(j):
+                token = token[: -len(j)]
+                break
+        for e in sorted(EOMI, key=len, reverse=True):
+            if token.endswith(e):
+                token = token[: -len(e)]
+                break
+        if token == original:
+            break
+    return token
+
+
+def build_tokens(n: int, seed: int):
+    rng = random.Random(seed)
+    words = {w for m in SYMPTOM_MAPPING.values() for phrase in m["ko"] for w in phrase.split()}
+    words |= {w for m in SYMPTOM_MAPPING.values() for ts in m.get("token_sets", []) for part in ("part1", "part2")
+              for w in ts[part]}
+    words = sorted(words)
+    endings = [""] + JOSA + EOMI
+    vocab = sorted(words + [w + rng.choice(endings) + rng.choice(endings) for w in words for _ in range(3)] + JOSA + EOMI)
+    return vocab, [rng.choice(vocab) for _ in range(n)]
+
+
+def per_token_us(fn, tokens, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for token in tokens:
+            fn(token)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / len(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    vocab, tokens = build_tokens(args.tokens, args.seed)
+    trie_only = remove_josa_and_eomi.__wrapped__
+    diffs = [(t, legacy_remove_josa_and_eomi(t), trie_only(t)) for t in vocab if legacy_remove_josa_and_eomi(t) != trie_only(t)]
+    for token, expected, actual in diffs[:10]:
+        print(f"❌ {token!r}: 기존={expected!r} 현재={actual!r}")
+    print(f"📄 서로 다른 토큰 {len(vocab):,}개: {'✅ 결과 일치' if not diffs else f'❌ 불일치 {len(diffs):,}건'}")
+
+    legacy = per_token_us(legacy_remove_josa_and_eomi, tokens)
+    trie = per_token_us(trie_only, tokens)
+    remove_josa_and_eomi.cache_clear()
+    cached = per_token_us(remove_josa_and_eomi, tokens)
+    print(f"⏱️ 토큰당 처리 시간 ({len(tokens):,}토큰): 기존 {legacy:.2f}µs / trie {trie:.2f}µs ({legacy / trie:.1f}x) / "
+          f"trie+cache {cached:.2f}µs ({legacy / cached:.1f}x)")
+    print(f"💾 캐시: {remove_josa_and_eomi.cache_info()}")
+    sys.exit(1 if diffs else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# check_matcher_equivalence.py
+"""
+🧪 증상 추출 매처 동등성 검사
+- 기존 구현(증상마다 키워드 부분 문자열 검사 + 문장 전체 detect_time)을 이 파일에 그대로 두고
+  현재 extract_combined_symptoms(Aho-Corasick 한 번 스캔 + 위치 기반 시간 매칭)와 결과를 비교
+- 코퍼스: SYMPTOM_MAPPING 한/영 표현, 토큰 조합용 단어, '몸살', 시간 표현을 무작위로 이어 붙인 문장 (시드 고정)
+  · 언어별 시간 표현이 0~1개인 문장(증상 표현 안의 '밤에', 'night' 포함) → 결과가 완전히 같아야 함
+  · 시간 표현이 여러 개인 문장은 의도적으로 달라지므로(가까운 시간 표현을 붙임) 차이 건수만 따로 출력
+- 두 구현의 문장당 처리 시간(키워드 매칭 단계 / 전체)도 함께 출력
+
+실행 (extract/ 에서):
+  python scripts/check_matcher_equivalence.py
+  python scripts/check_matcher_equivalence.py --sentences 20000 --seed 7
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.symptom_service import (
+    COMPOSITE_SYMPTOMS,
+    EN_MATCHER,
+    KO_MATCHER,
+    TIME_KEYWORDS,
+    extract_combined_symptoms,
+)
+from utils.symptom_mapping import SYMPTOM_MAPPING
+from utils.text_cleaner import clean_and_tokenize
+
+FILLERS_KO = ["어제부터", "요즘", "계속", "갑자기", "그리고", "좀", "많이", "너무", "며칠째"]
+FILLERS_EN = ["since yesterday", "and", "lately", "a lot", "I have", "really"]
+
+
+# ✅ 기존 구현 (비교 기준)
+def legacy_detect_time(text: str, lang: str) -> Optional[str]:
+    return next((v for k, v in TIME_KEYWORDS[lang].items() if k in text), None)
+
+
+def legacy_extract(text_ko: str, text_en: str) -> List[Dict[str, str]]:
+    results = []
+    tokens_ko = clean_and_tokenize(text_ko)
+    for symptom, mapping in SYMPTOM_MAPPING.items():
+        if any(keyword in text_ko for keyword in mapping["ko"]):
+            results.append({"symptom": symptom, "time": legacy_detect_time(text_ko, "ko")})
+            continue
+        if any(keyword in text_en for keyword in mapping["en"]):
+            results.append({"symptom": symptom, "time": legacy_detect_time(text_en, "en")})
+            continue
+        for token_set in mapping.get("token_sets", []):
+            part1_match = [tok for tok in tokens_ko if tok in token_set["part1"]]
+            part2_match = [tok for tok in tokens_ko if tok in token_set["part2"]]
+            if part1_match and part2_match:
+                results.append({"symptom": symptom, "time": legacy_detect_time(text_ko, "ko")})
+                break
+
+    for keyword, mapped in COMPOSITE_SYMPTOMS.items():
+        if keyword in text_ko:
+            for symptom in mapped:
+                if not any(r["symptom"] == symptom for r in results):
+                    results.append({"symptom": symptom, "time": legacy_detect_time(text_ko, "ko")})
+
+    seen, unique = set(), []
+    for item in results:
+        key = (item["symptom"], item["time"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+# ✅ 코퍼스 생성
+def time_mentions(text: str, lang: str) -> int:
+    return sum(text.count(k) for k in TIME_KEYWORDS[lang])
+
+
+def build_corpus(n: int, seed: int, max_times: int = 2):
+    """(시간 표현 0~1개 문장 쌍, 여러 개 문장 쌍)"""
+    rng = random.Random(seed)
+    ko_phrases = [kw for m in SYMPTOM_MAPPING.values() for kw in m["ko"]] + list(COMPOSITE_SYMPTOMS)
+    en_phrases = [kw for m in SYMPTOM_MAPPING.values() for kw in m["en"]]
+    token_words = [f"{w}{rng.choice(['', '가', '이', '요', '고', '어요'])}"
+                   for m in SYMPTOM_MAPPING.values() for ts in m.get("token_sets", []) for part in ("part1", "part2")
+                   for w in ts[part]]
+    times_ko, times_en = list(TIME_KEYWORDS["ko"]), list(TIME_KEYWORDS["en"])
+
+    def sentence(pools, fillers, times, n_parts):
+        parts = [rng.choice(rng.choice(pools)) for _ in range(n_parts)]
+        parts += rng.sample(fillers, rng.randint(0, 2))
+        parts += [rng.choice(times) for _ in range(rng.randint(0, max_times))]
+        rng.shuffle(parts)
+        return " ".join(parts)
+
+    single, multi = [], []
+    for _ in range(n):
+        k = rng.randint(1, 4)
+        text_ko = sentence([ko_phrases, token_words], FILLERS_KO, times_ko, k)
+        text_en = sentence([en_phrases], FILLERS_EN, times_en, rng.randint(0, k)) if rng.random() < 0.8 else text_ko
+        if max(time_mentions(text_ko, "ko"), time_mentions(text_en, "en")) <= 1:
+            single.append((text_ko, text_en))
+        else:
+            multi.append((text_ko, text_en))
+    # 경계 사례
+    single += [("", ""), ("몸살", ""), ("밤에 몸살", "body aches at night"), ("열", "fever"), ("night cough", "night cough")]
+    return single, multi
+
+
+def compare(corpus):
+    diffs = []
+    for text_ko, text_en in corpus:
+        expected, actual = legacy_extract(text_ko, text_en), extract_combined_symptoms(text_ko, text_en)
+        if expected != actual:
+            diffs.append((text_ko, text_en, expected, actual))
+    return diffs
+
+
+# ✅ 키워드 단계만 (토큰화 / 토큰 조합 제외)
+def legacy_keyword_stage(text_ko: str, text_en: str) -> None:
+    for mapping in SYMPTOM_MAPPING.values():
+        if any(keyword in text_ko for keyword in mapping["ko"]):
+            legacy_detect_time(text_ko, "ko")
+        elif any(keyword in text_en for keyword in mapping["en"]):
+            legacy_detect_time(text_en, "en")
+
+
+def keyword_stage(text_ko: str, text_en: str) -> None:
+    matches_ko, matches_en = KO_MATCHER.scan(text_ko), EN_MATCHER.scan(text_en)
+    for symptom in SYMPTOM_MAPPING:
+        if symptom in matches_ko.symptoms:
+            matches_ko.time_near(matches_ko.symptoms[symptom])
+        elif symptom in matches_en.symptoms:
+            matches_en.time_near(matches_en.symptoms[symptom])
+
+
+def per_sentence_us(fn, corpus, repeat: int = 3) -> float:
+    """repeat 회 중 최솟값 (첫 회는 워밍업 포함)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text_ko, text_en in corpus:
+            fn(text_ko, text_en)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / len(corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus, multi = build_corpus(args.sentences, args.seed)
+    diffs = compare(corpus)
+    print(f"📄 동등성 코퍼스 {len(corpus):,}문장 (언어별 시간 표현 0~1개)")
+    for text_ko, text_en, expected, actual in diffs[:10]:
+        print(f"❌ ko={text_ko!r} en={text_en!r}\n   기존={expected}\n   현재={actual}")
+    print(f"{'✅ 결과 일치' if not diffs else f'❌ 불일치 {len(diffs):,}건'}")
+
+    print(f"ℹ️ 시간 표현 여러 개 코퍼스 {len(multi):,}문장: 위치 기반 시간 매칭으로 달라진 문장 {len(compare(multi)):,}건 (의도된 차이)")
+
+    print(f"⏱️ 문장당 키워드 매칭: 기존 {per_sentence_us(legacy_keyword_stage, corpus):.1f}µs / "
+          f"현재 {per_sentence_us(keyword_stage, corpus):.1f}µs")
+    print(f"⏱️ 문장당 전체 추출: 기존 {per_sentence_us(legacy_extract, corpus):.1f}µs / "
+          f"현재 {per_sentence_us(extract_combined_symptoms, corpus):.1f}µs")
+    sys.exit(1 if diffs else 0)
+
+
+if __name__ == "__main__":
+    main()
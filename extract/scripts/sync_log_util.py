@@ -0,0 +1,58 @@
+# sync_log_util.py
+"""
+🔁 utils/log_util.py 동기화
+- 원본은 AI/scripts/log_util.py (두 서비스가 각자 디렉터리/가상환경에서 실행되어 같은 모듈을 import 할 수 없음)
+- 원본의 '원본 파일' 안내 줄만 복사본 안내로 바꿔 utils/log_util.py 에 그대로 씀
+- --check: 쓰지 않고 비교만, 다르면 종료 코드 1 (커밋 전 / CI 확인용)
+
+실행 (extract/ 에서):
+  python scripts/sync_log_util.py
+  python scripts/sync_log_util.py --check
+"""
+
+import os
+import sys
+import argparse
+
+EXTRACT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(os.path.dirname(EXTRACT_DIR), "AI", "scripts", "log_util.py")
+TARGET_PATH = os.path.join(EXTRACT_DIR, "utils", "log_util.py")
+
+SOURCE_NOTE_PREFIX = "# ⚠️ 원본 파일:"
+COPY_NOTE = "# ⚠️ 복사본: 원본은 AI/scripts/log_util.py → 여기서 수정하지 말고 원본 수정 후 extract/ 에서 python scripts/sync_log_util.py\n"
+
+
+def render() -> str:
+    with open(SOURCE_PATH, encoding="utf-8") as f:
+        lines = f.readlines()
+    notes = [i for i, line in enumerate(lines) if line.startswith(SOURCE_NOTE_PREFIX)]
+    if len(notes) != 1:
+        raise SystemExit(f"❌ 원본에서 '{SOURCE_NOTE_PREFIX}' 안내 줄을 찾을 수 없습니다: {SOURCE_PATH}")
+    lines[notes[0]] = COPY_NOTE
+    return "".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI/scripts/log_util.py → extract/utils/log_util.py 동기화")
+    parser.add_argument("--check", action="store_true", help="쓰지 않고 비교만 (다르면 종료 코드 1)")
+    args = parser.parse_args()
+
+    expected = render()
+    current = None
+    if os.path.exists(TARGET_PATH):
+        with open(TARGET_PATH, encoding="utf-8") as f:
+            current = f.read()
+
+    if current == expected:
+        print("✅ utils/log_util.py 가 원본과 같습니다")
+        return
+    if args.check:
+        print("❌ utils/log_util.py 가 원본(AI/scripts/log_util.py)과 다릅니다 → python scripts/sync_log_util.py")
+        sys.exit(1)
+    with open(TARGET_PATH, "w", encoding="utf-8") as f:
+        f.write(expected)
+    print(f"✅ utils/log_util.py 갱신 완료 (원본: {SOURCE_PATH})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,40 @@
-from fastapi import FastAPI
+import time
+import logging
+from typing import Optional
+
+from fastapi import FastAPI, Header
 from models.request_model import TextRequest
-from services.translator_service import translate_to_english
+from services.translator_service import close_translator, get_translator, translate_to_english
 from services.symptom_service import extract_combined_symptoms
 from utils.text_cleaner import clean_text
+from utils.log_util import setup_logging, request_trace, trace, elapsed_ms
+
+# JSON 구조화 로그 (백그라운드 스레드에서 출력, LOG_LEVEL / LOG_SAMPLE_RATES)
+setup_logging("extract")
+logger = logging.getLogger("extract_server")
 
 app = FastAPI()
 
 
+# X-Debug-Trace: 1 헤더를 보낸 요청만 단계별/증상별 상세 로그 출력
 @app.post("/extract")
-async def extract_symptoms(request: TextRequest):
-    original_text = request.text
-    cleaned_text = clean_text(original_text)
-    translated = translate_to_english(cleaned_text)
-
-    results = extract_combined_symptoms(cleaned_text, translated)
-    print("✅ original:", original_text)
-    print("✅ cleaned:", cleaned_text)
-    print("✅ translated:", translated)
-    print("✅ results:", results)
+async def extract_symptoms(request: TextRequest, debug_trace: Optional[str] = Header(None, alias="X-Debug-Trace")):
+    start = time.perf_counter()
+    with request_trace(debug_trace == "1"):
+        original_text = request.text
+        cleaned_text = clean_text(original_text)
+        # 번역 실패 / 서킷 브레이커 open 이면 "" → 한글만으로 추출
+        translated = await translate_to_english(cleaned_text)
+
+        results = extract_combined_symptoms(cleaned_text, translated)
+        trace(logger, "✅ 추출 완료", original=original_text, cleaned=cleaned_text, translated=translated, results=results)
+    translator = get_translator()
+    logger.info("extract", extra={
+        "symptoms": len(results),
+        "latency_ms": elapsed_ms(start),
+        "translation_backend": translator.backend.name,
+        "translation_breaker": translator.breaker.state,
+    })
     return {
         "original": original_text,
         "cleaned": cleaned_text,
@@ -26,6 +43,23 @@ async def extract_symptoms(request: TextRequest):
     }
 
 
+# 번역 백엔드 / 서킷 브레이커 상태, 번역 캐시 hit / miss 카운터
+@app.get("/translation/stats")
+async def translation_stats():
+    return get_translator().stats_snapshot()
+
+
+# 번역기(백엔드 + 번역 캐시)는 import 가 아니라 서버 시작 시 생성 → 설정 오류는 시작 시점에 드러남
+@app.on_event("startup")
+async def open_translator():
+    get_translator()
+
+
+@app.on_event("shutdown")
+async def shutdown_translator():
+    await close_translator()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,7 +1,12 @@
-from typing import List, Dict, Optional
+import logging
+from typing import List, Dict
+from utils.log_util import trace
 from utils.symptom_mapping import SYMPTOM_MAPPING
+from utils.symptom_matcher import KeywordMatcher, KeywordMatches, TokenSetIndex
 from utils.text_cleaner import clean_and_tokenize
 
+logger = logging.getLogger(__name__)
+
 TIME_KEYWORDS = {
     "ko": {
         "아침": "morning",
@@ -19,66 +24,70 @@ TIME_KEYWORDS = {
     },
 }
 
+# 여러 증상으로 분해되는 복합 증상 키워드
+COMPOSITE_SYMPTOMS = {
+    "몸살": ["오한", "근육통", "피로", "미열"],
+}
+
+# ✅ 서버 시작 시 한 번 컴파일: 언어별 증상/시간(/복합 증상) 키워드 오토마톤
+KO_MATCHER = KeywordMatcher(SYMPTOM_MAPPING, TIME_KEYWORDS["ko"], "ko", COMPOSITE_SYMPTOMS)
+EN_MATCHER = KeywordMatcher(SYMPTOM_MAPPING, TIME_KEYWORDS["en"], "en")
+# ✅ token_sets 역색인 + 결과 순서(SYMPTOM_MAPPING 순서)
+TOKEN_SET_INDEX = TokenSetIndex(SYMPTOM_MAPPING)
+SYMPTOM_ORDER = {symptom: i for i, symptom in enumerate(SYMPTOM_MAPPING)}
+
 
 def extract_combined_symptoms(text_ko: str, text_en: str) -> List[Dict[str, str]]:
-    print(f"\n🔵 [Step 1] 원문(ko): {text_ko}")
-    print(f"🔵 [Step 2] 번역(en): {text_en}")
+    # 증상별 상세 로그는 X-Debug-Trace 요청에서만 출력 (utils/log_util.py)
+    trace(logger, "🔵 [Step 1-2] 원문/번역", text_ko=text_ko, text_en=text_en)
 
     results = []
     tokens_ko = clean_and_tokenize(text_ko)
     tokens_en = clean_and_tokenize(text_en.lower())
 
-    print(f"\n🟡 [Step 3] Tokenized (ko): {tokens_ko}")
-    print(f"🟡 [Step 4] Tokenized (en): {tokens_en}")
+    trace(logger, "🟡 [Step 3-4] 정제 후 토큰", tokens_ko=tokens_ko, tokens_en=tokens_en)
 
-    # ✅ 정제 후 토큰 출력 추가
-    print(f"\n🟡 [Step 4-1] 정제 후 토큰 (ko): {[t for t in tokens_ko]}")
-    print(f"🟡 [Step 4-2] 정제 후 토큰 (en): {[t for t in tokens_en]}")
+    # 한글/영어 문장을 각각 한 번씩만 훑어서 모든 키워드 위치 수집
+    matches_ko = KO_MATCHER.scan(text_ko)
+    matches_en = EN_MATCHER.scan(text_en)
+    trace(logger, "🔍 [키워드 매칭]", ko=matches_ko, en=matches_en)
 
-    for symptom, mapping in SYMPTOM_MAPPING.items():
-        # 1️⃣ 한글 키워드 직접 매칭
-        if any(keyword in text_ko for keyword in mapping["ko"]):
-            print(f"✅ [KO match] '{symptom}' matched by keyword in: {mapping['ko']}")
-            results.append({"symptom": symptom, "time": detect_time(text_ko, "ko")})
-            continue
+    # 토큰 조합: 요청 토큰을 역색인에서 한 번씩 조회
+    token_matches = TOKEN_SET_INDEX.match(tokens_ko)
+    trace(logger, "🔍 [TokenSet 검사]", matches=token_matches)
+
+    # 매칭된 증상만 SYMPTOM_MAPPING 순서로 처리 (우선순위: 한글 키워드 > 영어 키워드 > 토큰 조합)
+    candidates = set(matches_ko.symptoms) | set(matches_en.symptoms) | set(token_matches)
+    for symptom in sorted(candidates, key=SYMPTOM_ORDER.__getitem__):
+        # 1️⃣ 한글 키워드 직접 매칭 (시간: 키워드와 가장 가까운 시간 표현)
+        if symptom in matches_ko.symptoms:
+            spans = matches_ko.symptoms[symptom]
+            trace(logger, "✅ [KO match]", symptom=symptom, spans=spans)
+            results.append({"symptom": symptom, "time": matches_ko.time_near(spans)})
 
         # 2️⃣ 영어 키워드 직접 매칭
-        if any(keyword in text_en for keyword in mapping["en"]):
-            print(f"✅ [EN match] '{symptom}' matched by keyword in: {mapping['en']}")
-            results.append({"symptom": symptom, "time": detect_time(text_en, "en")})
-            continue
+        elif symptom in matches_en.symptoms:
+            spans = matches_en.symptoms[symptom]
+            trace(logger, "✅ [EN match]", symptom=symptom, spans=spans)
+            results.append({"symptom": symptom, "time": matches_en.time_near(spans)})
 
         # 3️⃣ 토큰 기반 조합식 매칭
-        for token_set in mapping.get("token_sets", []):
-            part1_match = [tok for tok in tokens_ko if tok in token_set["part1"]]
-            part2_match = [tok for tok in tokens_ko if tok in token_set["part2"]]
-            print(
-                f"🔍 [DEBUG] {symptom} token_sets 검사 - part1: {part1_match}, part2: {part2_match}"
-            )
-            if part1_match and part2_match:
-                print(
-                    f"✅ [TokenSet match] '{symptom}' matched by part1: {part1_match}, part2: {part2_match}"
-                )
-                results.append({"symptom": symptom, "time": detect_time(text_ko, "ko")})
-                break
+        else:
+            part1_match, part2_match = token_matches[symptom]
+            trace(logger, "✅ [TokenSet match]", symptom=symptom, part1=part1_match, part2=part2_match)
+            results.append({"symptom": symptom, "time": matches_ko.text_time()})
 
     # 🔹 복합 증상 (e.g., 몸살) 분해 처리
-    composite = handle_composite_symptoms(text_ko, results)
+    composite = handle_composite_symptoms(matches_ko, results)
     if composite:
-        print(
-            f"✅ [Composite] Added symptoms from '몸살': {[s['symptom'] for s in composite]}"
-        )
+        trace(logger, "✅ [Composite] '몸살' 분해", symptoms=[s["symptom"] for s in composite])
         results += composite
 
     final = deduplicate_results(results)
-    print(f"\n🟢 [Step 5] 최종 추출 결과: {final}")
+    trace(logger, "🟢 [Step 5] 최종 추출 결과", results=final)
     return final
 
 
-def detect_time(text: str, lang: str) -> Optional[str]:
-    return next((v for k, v in TIME_KEYWORDS[lang].items() if k in text), None)
-
-
 def deduplicate_results(results: List[Dict[str, str]]) -> List[Dict[str, str]]:
     seen = set()
     unique = []
@@ -91,20 +100,23 @@ def deduplicate_results(results: List[Dict[str, str]]) -> List[Dict[str, str]]:
 
 
 def handle_composite_symptoms(
-    text_ko: str, existing_results: List[Dict[str, str]]
+    matches_ko: KeywordMatches, existing_results: List[Dict[str, str]]
 ) -> List[Dict[str, str]]:
     """
     '몸살'처럼 여러 증상으로 분해 가능한 복합 증상을 처리합니다.
+    (COMPOSITE_SYMPTOMS 키워드는 KO_MATCHER 가 증상 키워드와 같은 패스에서 찾음)
     """
     composite_symptoms = []
 
     # 🔹 몸살 → 오한, 근육통, 피로, 미열
-    if "몸살" in text_ko:
-        mapped = ["오한", "근육통", "피로", "미열"]
+    for keyword, mapped in COMPOSITE_SYMPTOMS.items():
+        spans = matches_ko.composites.get(keyword)
+        if not spans:
+            continue
         for symptom in mapped:
             if not any(r["symptom"] == symptom for r in existing_results):
                 composite_symptoms.append(
-                    {"symptom": symptom, "time": detect_time(text_ko, "ko")}
+                    {"symptom": symptom, "time": matches_ko.time_near(spans)}
                 )
 
     return composite_symptoms
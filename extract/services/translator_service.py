@@ -1,11 +1,279 @@
-from googletrans import Translator
+# 📄 translator_service.py
+# 한 → 영 번역 (비동기, 백엔드 교체 가능)
+# - TRANSLATION_BACKEND=google (기본): httpx AsyncClient 연결 풀 + 타임아웃 + 동시 요청 수 제한
+# - TRANSLATION_BACKEND=offline: SYMPTOM_MAPPING 한/영 표현 쌍으로 만든 결정적 대체 번역 (테스트, 외부망 없는 배포)
+# - 서킷 브레이커: 연속 실패가 쌓이면 일정 시간 번역을 건너뛰고 "" 반환 → 한글만으로 증상 추출
+# - 번역 캐시 (utils/translation_cache.py): 같은 문장은 메모리 LRU / SQLite 에서 바로 반환 (브레이커 open 중에도)
 
-translator = Translator()
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, Optional
 
+import httpx
 
-def translate_to_english(text: str) -> str:
-    try:
-        result = translator.translate(text, src="ko", dest="en")
-        return result.text
-    except Exception:
-        return text  # 번역 실패 시 원문 반환
+from services.symptom_service import TIME_KEYWORDS
+from utils.symptom_mapping import SYMPTOM_MAPPING
+from utils.symptom_matcher import AhoCorasick
+from utils.translation_cache import TranslationCache
+
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)  # 요청마다 남는 httpx INFO 로그 제외
+
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "google")
+TRANSLATION_TIMEOUT = float(os.getenv("TRANSLATION_TIMEOUT", "3"))
+TRANSLATION_MAX_CONCURRENCY = int(os.getenv("TRANSLATION_MAX_CONCURRENCY", "16"))
+TRANSLATION_BREAKER_FAILURES = int(os.getenv("TRANSLATION_BREAKER_FAILURES", "5"))
+TRANSLATION_BREAKER_RESET = float(os.getenv("TRANSLATION_BREAKER_RESET", "30"))
+
+# 번역 캐시 (TRANSLATION_CACHE=0 이면 끔, TRANSLATION_CACHE_PATH="" 이면 메모리 단계만)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSLATION_CACHE = os.getenv("TRANSLATION_CACHE", "1") != "0"
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", f"{BASE_DIR}/cache/translations.sqlite3")
+TRANSLATION_CACHE_MEMORY_SIZE = int(os.getenv("TRANSLATION_CACHE_MEMORY_SIZE", "4096"))
+TRANSLATION_CACHE_DISK_SIZE = int(os.getenv("TRANSLATION_CACHE_DISK_SIZE", "100000"))
+TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600)))
+
+GOOGLE_TRANSLATE_URL = "https://translate.googleapis.com/translate_a/single"
+
+
+class TranslationBackend:
+    """번역 백엔드 인터페이스"""
+
+    name = "base"
+
+    async def translate(self, text: str) -> str:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """Google 번역 공개 엔드포인트 (googletrans 와 같은 서비스), 연결 풀 재사용"""
+
+    name = "google"
+
+    def __init__(self, timeout: float = TRANSLATION_TIMEOUT, max_connections: int = TRANSLATION_MAX_CONCURRENCY):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # 이벤트 루프 안에서 처음 쓸 때 생성
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def translate(self, text: str) -> str:
+        response = await self._get_client().get(
+            GOOGLE_TRANSLATE_URL,
+            params={"client": "gtx", "sl": "ko", "tl": "en", "dt": "t", "q": text},
+        )
+        response.raise_for_status()
+        # [[["번역문", "원문", ...], ...], ...] → 문장 조각 이어 붙이기
+        return "".join(part[0] for part in response.json()[0] if part and part[0])
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class OfflineTranslationBackend(TranslationBackend):
+    """SYMPTOM_MAPPING 한글 표현 → 같은 증상의 첫 번째 영어 표현 (+ 시간 표현) 치환. 외부 호출 없음, 결정적"""
+
+    name = "offline"
+
+    def __init__(self, mapping: Dict[str, dict] = SYMPTOM_MAPPING, time_keywords: Dict[str, str] = TIME_KEYWORDS["ko"]):
+        pairs: Dict[str, str] = {}
+        for entry in mapping.values():
+            if entry["en"]:
+                for phrase in entry["ko"]:
+                    pairs.setdefault(phrase, entry["en"][0])
+        for phrase, value in time_keywords.items():
+            pairs.setdefault(phrase, value)
+        self._automaton = AhoCorasick(pairs.items())
+
+    async def translate(self, text: str) -> str:
+        # 왼쪽부터, 시작 위치가 같으면 가장 긴 표현 (겹치는 표현은 건너뜀)
+        hits = sorted(self._automaton.iter(text), key=lambda hit: (hit[0], hit[0] - hit[1]))
+        words, position = [], 0
+        for start, end, english in hits:
+            if start >= position:
+                words.append(english)
+                position = end
+        return " ".join(words)
+
+
+class CircuitBreaker:
+    """연속 실패 failure_threshold 회 → open (reset_seconds 동안 호출 차단) → half_open (시험 호출 1건) → 성공 시 closed"""
+
+    def __init__(
+        self,
+        failure_threshold: int = TRANSLATION_BREAKER_FAILURES,
+        reset_seconds: float = TRANSLATION_BREAKER_RESET,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.clock() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """시험 호출이 성공/실패 판정 없이 끝난 경우 (대기열 타임아웃, 요청 취소) 다음 요청이 다시 시험하도록"""
+        self._trial = False
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("translation_breaker_closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+            logger.warning("translation_breaker_open", extra={"failures": self.failures, "reset_seconds": self.reset_seconds})
+            self.opened_at = self.clock()
+            self._trial = False
+
+
+class Translator:
+    """백엔드 + 번역 캐시 + 동시 요청 수 제한 + 서킷 브레이커. 번역하지 못하면 "" (한글만으로 추출)"""
+
+    def __init__(
+        self,
+        backend: TranslationBackend,
+        breaker: Optional[CircuitBreaker] = None,
+        max_concurrency: int = TRANSLATION_MAX_CONCURRENCY,
+        queue_timeout: float = TRANSLATION_TIMEOUT,
+        cache: Optional[TranslationCache] = None,
+    ):
+        self.backend = backend
+        self.breaker = breaker or CircuitBreaker()
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {"ok": 0, "failed": 0, "skipped": 0, "queue_timeout": 0}
+
+    async def translate(self, text: str) -> str:
+        if not text:
+            return ""
+        if self.cache is not None:
+            cached = await self.cache.aget(self.backend.name, text)
+            if cached is not None:
+                return cached
+        if not self.breaker.allow():
+            self.stats["skipped"] += 1
+            return ""
+
+        # 이벤트 루프 안에서 처음 쓸 때 생성 (python 3.9 의 Semaphore 는 생성 시점 루프에 묶임)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            # 로컬 대기열 포화는 백엔드 장애가 아니므로 브레이커에 반영하지 않음
+            self.stats["queue_timeout"] += 1
+            self.breaker.release_trial()
+            logger.warning("translation_queue_timeout", extra={"max_concurrency": self.max_concurrency})
+            return ""
+
+        try:
+            result = await self.backend.translate(text)
+        except asyncio.CancelledError:
+            self.breaker.release_trial()
+            raise
+        except Exception as exc:
+            self.stats["failed"] += 1
+            self.breaker.record_failure()
+            logger.warning("translation_failed", extra={"backend": self.backend.name, "error": repr(exc)})
+            return ""
+        finally:
+            self._semaphore.release()
+
+        self.stats["ok"] += 1
+        self.breaker.record_success()
+        if self.cache is not None and result:
+            await self.cache.aput(self.backend.name, text, result)
+        return result
+
+    def stats_snapshot(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "breaker": self.breaker.state,
+            "requests": dict(self.stats),
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def build_translator(backend: str = TRANSLATION_BACKEND) -> Translator:
+    backends = {"google": GoogleTranslateBackend, "offline": OfflineTranslationBackend}
+    if backend not in backends:
+        raise ValueError(f"지원하지 않는 TRANSLATION_BACKEND: {backend} (google | offline)")
+    cache = None
+    # offline 백엔드는 이미 로컬·결정적이라 캐시하지 않음
+    if TRANSLATION_CACHE and backend != "offline":
+        cache = TranslationCache(
+            TRANSLATION_CACHE_PATH or None,
+            memory_size=TRANSLATION_CACHE_MEMORY_SIZE,
+            disk_size=TRANSLATION_CACHE_DISK_SIZE,
+            ttl_seconds=TRANSLATION_CACHE_TTL,
+        )
+    return Translator(backends[backend](), cache=cache)
+
+
+# import 시점에는 만들지 않음 (cache/ 디렉터리 생성, SQLite 연결 없음)
+# → 서버 startup 이벤트 또는 첫 호출에서 생성
+_translator: Optional[Translator] = None
+_translator_lock = threading.Lock()
+
+
+def get_translator() -> Translator:
+    global _translator
+    if _translator is None:
+        with _translator_lock:
+            if _translator is None:
+                _translator = build_translator()
+    return _translator
+
+
+async def close_translator() -> None:
+    global _translator
+    with _translator_lock:
+        current, _translator = _translator, None
+    if current is not None:
+        await current.aclose()
+
+
+async def translate_to_english(text: str) -> str:
+    return await get_translator().translate(text)
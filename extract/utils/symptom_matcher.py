@@ -0,0 +1,151 @@
+# 📄 symptom_matcher.py
+# SYMPTOM_MAPPING 키워드 다중 패턴 매칭 (Aho-Corasick)
+# - 서버 시작 시 언어별로 한 번 컴파일 → 요청마다 문장을 한 번만 훑어 모든 증상/시간/복합 증상 키워드 위치를 찾음
+# - 시간 표현은 문장 전체에서 찾지 않고, 증상 키워드와 가장 가까운 위치의 것을 붙임
+# - token_sets 조합식은 역색인(토큰 → 증상/token set/part)으로 요청 토큰만 한 번씩 조회
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+Span = Tuple[int, int]  # [start, end)
+
+
+class AhoCorasick:
+    """문자 단위 Aho-Corasick 오토마톤. iter(text) → (start, end, 값), 끝 위치 순"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, object]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, object]]] = [[]]  # 노드에서 끝나는 (패턴 길이, 값)
+
+        for pattern, value in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                child = self._goto[node].get(ch)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][ch] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = child
+            self._out[node].append((len(pattern), value))
+
+        # 실패 링크 (BFS): 실패 노드는 항상 더 얕으므로 출력 목록을 미리 합쳐 둠
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for ch, child in self._goto[node].items():
+                pending.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, object]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, value in out[node]:
+                yield i + 1 - length, i + 1, value
+
+
+def span_gap(a: Span, b: Span) -> int:
+    """두 구간 사이 글자 수 (겹치면 0)"""
+    return max(0, b[0] - a[1], a[0] - b[1])
+
+
+class KeywordMatches:
+    """문장 하나의 매칭 결과: 증상 / 복합 증상 키워드별 위치, 시간 표현 위치"""
+
+    def __init__(self):
+        self.symptoms: Dict[str, List[Span]] = {}
+        self.composites: Dict[str, List[Span]] = {}
+        self.times: List[Tuple[Span, str, int]] = []  # (위치, 시간대, 우선순위 = TIME_KEYWORDS 순서)
+
+    def time_near(self, spans: Sequence[Span]) -> Optional[str]:
+        """키워드 위치에서 가장 가까운 시간 표현 (거리가 같으면 TIME_KEYWORDS 순서). 없으면 None"""
+        if not self.times or not spans:
+            return None
+        _, value, _ = min(
+            self.times,
+            key=lambda t: (min(span_gap(t[0], span) for span in spans), t[2]),
+        )
+        return value
+
+    def text_time(self) -> Optional[str]:
+        """위치 정보가 없는 매칭(토큰 조합)용: 문장에 있는 시간 표현 중 TIME_KEYWORDS 순서가 가장 앞선 것"""
+        if not self.times:
+            return None
+        return min(self.times, key=lambda t: t[2])[1]
+
+    def __repr__(self) -> str:  # trace 로그 출력용
+        times = [(span, value) for span, value, _ in self.times]
+        return f"KeywordMatches(symptoms={self.symptoms}, composites={self.composites}, times={times})"
+
+
+class KeywordMatcher:
+    """언어 하나의 증상 키워드 + 시간 키워드 + 복합 증상 키워드를 묶은 오토마톤"""
+
+    def __init__(
+        self,
+        mapping: Mapping[str, dict],
+        time_keywords: Mapping[str, str],
+        lang: str,
+        composites: Iterable[str] = (),
+    ):
+        patterns = [(kw, ("symptom", symptom)) for symptom, entry in mapping.items() for kw in entry[lang]]
+        patterns += [(kw, ("time", value, i)) for i, (kw, value) in enumerate(time_keywords.items())]
+        patterns += [(kw, ("composite", kw)) for kw in composites]
+        self.lang = lang
+        self.patterns = len(patterns)
+        self._automaton = AhoCorasick(patterns)
+
+    def scan(self, text: str) -> KeywordMatches:
+        matches = KeywordMatches()
+        for start, end, value in self._automaton.iter(text):
+            kind = value[0]
+            if kind == "symptom":
+                matches.symptoms.setdefault(value[1], []).append((start, end))
+            elif kind == "time":
+                matches.times.append(((start, end), value[1], value[2]))
+            else:
+                matches.composites.setdefault(value[1], []).append((start, end))
+        return matches
+
+
+class TokenSetIndex:
+    """token_sets 역색인: 토큰 → [(증상, token set 번호, part 번호)]. 증상이 늘어도 요청당 비용은 토큰 수에 비례"""
+
+    def __init__(self, mapping: Mapping[str, dict]):
+        self._index: Dict[str, List[Tuple[str, int, int]]] = {}
+        for symptom, entry in mapping.items():
+            for set_id, token_set in enumerate(entry.get("token_sets", [])):
+                for part, key in enumerate(("part1", "part2")):
+                    for token in dict.fromkeys(token_set[key]):
+                        self._index.setdefault(token, []).append((symptom, set_id, part))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def match(self, tokens: Iterable[str]) -> Dict[str, Tuple[List[str], List[str]]]:
+        """part1 / part2 가 모두 채워진 token set 이 있는 증상 → (part1 토큰, part2 토큰). 증상별 첫 번째 token set 기준"""
+        parts: Dict[Tuple[str, int], Tuple[List[str], List[str]]] = {}
+        for token in tokens:
+            for symptom, set_id, part in self._index.get(token, ()):
+                parts.setdefault((symptom, set_id), ([], []))[part].append(token)
+
+        matched: Dict[str, Tuple[List[str], List[str]]] = {}
+        for (symptom, _), (part1, part2) in sorted(parts.items(), key=lambda item: item[0][1]):
+            if part1 and part2 and symptom not in matched:
+                matched[symptom] = (part1, part2)
+        return matched
@@ -1,6 +1,50 @@
+import os
 import re
-from typing import List
+import logging
+from functools import lru_cache
+from typing import Iterable, List
 from utils.korean_rules import JOSA, EOMI
+from utils.log_util import trace
+
+logger = logging.getLogger(__name__)
+
+# 조사/어미 제거 결과 메모 (같은 표현이 요청마다 반복되므로 원형 토큰 → 핵심 단어 캐시)
+STEM_CACHE_SIZE = int(os.getenv("STEM_CACHE_SIZE", "10000"))
+
+# 한 글자여도 토큰으로 남길 단어
+TOKEN_WHITELIST = {"배", "피", "열", "목", "속", "눈", "귀", "코", "팔", "위", "몸"}
+
+_END = ""  # 트라이 노드의 '여기서 끝나는 접미사 있음' 표시 (글자 키와 겹치지 않음)
+
+
+class SuffixTrie:
+    """접미사를 뒤집어 넣은 트라이. 토큰 끝에서 한 번 거슬러 올라가며 가장 긴 접미사를 찾음"""
+
+    def __init__(self, suffixes: Iterable[str]):
+        self._root: dict = {}
+        for suffix in suffixes:
+            if not suffix:
+                continue
+            node = self._root
+            for ch in reversed(suffix):
+                node = node.setdefault(ch, {})
+            node[_END] = True
+
+    def longest(self, token: str) -> int:
+        """token 끝에 붙은 가장 긴 접미사 길이 (없으면 0)"""
+        node, best = self._root, 0
+        for i in range(len(token) - 1, -1, -1):
+            node = node.get(token[i])
+            if node is None:
+                break
+            if _END in node:
+                best = len(token) - i
+        return best
+
+
+# ✅ korean_rules.py 에서 한 번 컴파일
+JOSA_TRIE = SuffixTrie(JOSA)
+EOMI_TRIE = SuffixTrie(EOMI)
 
 
 def clean_text(text: str) -> str:
@@ -8,27 +52,20 @@ def clean_text(text: str) -> str:
     return re.sub(r"[^\w\sㄱ-힣]", "", text).strip()
 
 
+@lru_cache(maxsize=STEM_CACHE_SIZE)
 def remove_josa_and_eomi(token: str) -> str:
     """
     조사, 어미 등을 반복적으로 제거해서 핵심 단어를 반환
     예: '배가요' → '배', '아프고' → '아프'
+    (한 바퀴: 가장 긴 조사 제거 → 가장 긴 어미 제거, 더 이상 줄지 않을 때까지)
     """
 
     while True:
         original = token
-        print(f"🧪 [정제 전] {token}", end=" → ")
-        for j in sorted(JOSA, key=len, reverse=True):
-            if token.endswith(j):
-                token = token[: -len(j)]
-                break
-        for e in sorted(EOMI, key=len, reverse=True):
-            if token.endswith(e):
-                token = token[: -len(e)]
-                break
+        token = token[: len(token) - JOSA_TRIE.longest(token)]
+        token = token[: len(token) - EOMI_TRIE.longest(token)]
         if token == original:
-            break
-        print(f"[정제 후] {token}")
-    return token
+            return token
 
 
 def clean_and_tokenize(text: str) -> List[str]:
@@ -38,12 +75,7 @@ def clean_and_tokenize(text: str) -> List[str]:
     cleaned = clean_text(text)
     raw_tokens = cleaned.split()
 
-    whitelist = {"배", "피", "열", "목", "속", "눈", "귀", "코", "팔", "위", "몸"}
-    tokens: List[str] = []
-
-    for token in raw_tokens:
-        stripped = remove_josa_and_eomi(token)
-        if len(stripped) > 1 or stripped in whitelist:
-            tokens.append(stripped)
+    stems = [remove_josa_and_eomi(token) for token in raw_tokens]
+    trace(logger, "🧪 [조사/어미 제거]", before=raw_tokens, after=stems)
 
-    return tokens
+    return [stem for stem in stems if len(stem) > 1 or stem in TOKEN_WHITELIST]
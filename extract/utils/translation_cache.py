@@ -0,0 +1,207 @@
+# 📄 translation_cache.py
+# 번역 결과 2단계 캐시 (정제한 한글 문장 → 영어)
+# - 1단계: 프로세스 내 LRU (OrderedDict, 개수 제한)
+# - 2단계: SQLite 파일 (서버 재시작 후에도 유지, 개수 제한 → 오래 안 쓴 것부터 삭제)
+# - 두 단계 모두 TTL: 저장 후 ttl_seconds 가 지나면 miss 로 보고 다시 번역
+# - 키: (백엔드 이름, 정제한 한글 문장) → 백엔드를 바꿔도 다른 백엔드 결과를 쓰지 않음
+# - async 핸들러에서는 aget / aput: 메모리 단계는 바로, SQLite 단계는 asyncio.to_thread 로 실행 (이벤트 루프를 막지 않음)
+# - 여러 워커 프로세스가 같은 SQLite 파일을 써도 됨: 행 수는 COUNT_REFRESH_WRITES 회 저장마다, 정리 직전에 다시 셈
+
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+COUNT_REFRESH_WRITES = 256  # 다른 프로세스가 추가한 행을 반영하려고 실제 행 수를 다시 세는 주기 (저장 횟수)
+
+
+class TranslationCache:
+    def __init__(
+        self,
+        path: Optional[str],
+        memory_size: int = 4096,
+        disk_size: int = 100_000,
+        ttl_seconds: float = 30 * 24 * 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()  # 키 → (번역문, 만료 시각)
+        self._lock = threading.Lock()  # 메모리 단계 + 카운터
+        self._db_lock = threading.Lock()  # SQLite 연결 (메모리 조회가 디스크 작업을 기다리지 않도록 분리)
+        # expired: TTL 이 지나 miss 가 된 조회 수, evictions: 개수 제한으로 SQLite 에서 지운 행 수
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_rows = 0  # SQLite 행 수 추정치 (이 프로세스의 저장/삭제 반영, 주기적으로 실제 값으로 갱신)
+        self._writes_since_count = 0
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")  # 다른 워커가 쓰는 중이면 기다림
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " backend TEXT NOT NULL, source TEXT NOT NULL, translated TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (backend, source))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed_at)")
+            self._disk_rows = self._count_rows()
+
+    # ✅ 동기 API (스크립트 / 스레드에서 사용)
+    def get(self, backend: str, text: str) -> Optional[str]:
+        key = (backend, text)
+        now = self.clock()
+        found, expired = self._memory_get(key, now)
+        if found is not None:
+            return found
+        row = self._disk_get(key, now) if self._conn is not None else None
+        return self._finish_get(key, row, expired, now)
+
+    def put(self, backend: str, text: str, translated: str) -> None:
+        key = (backend, text)
+        now = self.clock()
+        expires_at = self._memory_put(key, translated, now)
+        if self._conn is not None:
+            self._disk_put(key, translated, expires_at, now)
+
+    # ✅ async API (이벤트 루프 안에서 사용)
+    async def aget(self, backend: str, text: str) -> Optional[str]:
+        key = (backend, text)
+        now = self.clock()
+        found, expired = self._memory_get(key, now)
+        if found is not None:
+            return found
+        row = await asyncio.to_thread(self._disk_get, key, now) if self._conn is not None else None
+        return self._finish_get(key, row, expired, now)
+
+    async def aput(self, backend: str, text: str, translated: str) -> None:
+        key = (backend, text)
+        now = self.clock()
+        expires_at = self._memory_put(key, translated, now)
+        if self._conn is not None:
+            await asyncio.to_thread(self._disk_put, key, translated, expires_at, now)
+
+    # ✅ 1단계: 메모리
+    def _memory_get(self, key: Tuple[str, str], now: float) -> Tuple[Optional[str], bool]:
+        """(hit 이면 번역문, 만료된 항목이 있었는지)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None, False
+            if entry[1] > now:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return entry[0], False
+            del self._memory[key]
+            return None, True
+
+    def _memory_put(self, key: Tuple[str, str], translated: str, now: float) -> float:
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, translated, expires_at)
+            self.counters["writes"] += 1
+        return expires_at
+
+    def _remember(self, key: Tuple[str, str], translated: str, expires_at: float) -> None:
+        self._memory[key] = (translated, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _finish_get(self, key: Tuple[str, str], row: Optional[Tuple[str, float]], expired: bool, now: float) -> Optional[str]:
+        """SQLite 조회 결과 반영: hit 이면 메모리로 올림, 아니면 miss 집계"""
+        with self._lock:
+            if row is not None and row[1] > now:
+                self._remember(key, row[0], row[1])
+                self.counters["disk_hits"] += 1
+                return row[0]
+            if expired or row is not None:
+                self.counters["expired"] += 1
+            self.counters["misses"] += 1
+            return None
+
+    # ✅ 2단계: SQLite (to_thread 로 실행될 수 있음)
+    def _disk_get(self, key: Tuple[str, str], now: float) -> Optional[Tuple[str, float]]:
+        """(번역문, 만료 시각). 만료된 행은 지우고 그대로 반환 (만료 집계용)"""
+        with self._db_lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT translated, expires_at FROM translations WHERE backend = ? AND source = ?", key
+            ).fetchone()
+            if row is not None and row[1] > now:
+                self._conn.execute(
+                    "UPDATE translations SET accessed_at = ? WHERE backend = ? AND source = ?", (now, *key)
+                )
+            elif row is not None:
+                deleted = self._conn.execute("DELETE FROM translations WHERE backend = ? AND source = ?", key).rowcount
+                self._disk_rows -= deleted
+            return row
+
+    def _disk_put(self, key: Tuple[str, str], translated: str, expires_at: float, now: float) -> None:
+        with self._db_lock:
+            if self._conn is None:
+                return
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO translations (backend, source, translated, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (*key, translated, expires_at, now),
+            ).rowcount
+            if inserted:
+                self._disk_rows += 1
+                self._writes_since_count += 1
+            else:
+                self._conn.execute(
+                    "UPDATE translations SET translated = ?, expires_at = ?, accessed_at = ? WHERE backend = ? AND source = ?",
+                    (translated, expires_at, now, *key),
+                )
+            if self._writes_since_count >= COUNT_REFRESH_WRITES:
+                self._disk_rows = self._count_rows()
+            if self._disk_rows > self.disk_size:
+                self._evict_disk(now)
+
+    def _count_rows(self) -> int:
+        self._writes_since_count = 0
+        return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def _evict_disk(self, now: float) -> None:
+        """만료된 행 먼저, 그래도 넘치면 오래 안 쓴 행부터 삭제 (제한의 90% 까지 줄여 매번 삭제하지 않음)"""
+        evicted = self._conn.execute("DELETE FROM translations WHERE expires_at <= ?", (now,)).rowcount
+        rows = self._count_rows()  # 다른 프로세스가 추가/삭제한 행까지 반영된 실제 행 수
+        target = int(self.disk_size * 0.9)
+        if rows > target:
+            evicted += self._conn.execute(
+                "DELETE FROM translations WHERE rowid IN"
+                " (SELECT rowid FROM translations ORDER BY accessed_at LIMIT ?)",
+                (rows - target,),
+            ).rowcount
+            rows = self._count_rows()
+        self._disk_rows = rows
+        with self._lock:
+            self.counters["evictions"] += evicted
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round((lookups - self.counters["misses"]) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_rows if self._conn is not None else None,
+                "path": self.path,
+            }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None